@@ -11,6 +11,11 @@ INPUT_FILE="albums.txt"
 DELAY=0
 DEFAULT_SERVICE="deezer"
 DRY_RUN=false
+SKIP_OWNED=false
+REQUEUE=false
+
+# Resolves from a batch run yield to interactive (hotkey) resolves for Deezer's quota
+export DEEMIXKIT_PRIORITY="${DEEMIXKIT_PRIORITY:-batch}"
 
 # Colors for output
 GREEN='\033[0;32m'
@@ -31,6 +36,8 @@ Options:
     -d, --delay SECONDS   Delay between resolver calls (default: 10)
     -s, --service SERVICE Service to use: deezer or spotify (default: deezer)
     -n, --dry-run         Show what would be downloaded without downloading
+    -o, --skip-owned      Skip albums already in your collection (collection matcher index)
+    -r, --requeue         Queue albums the download ledger already has queued, downloading, done or failed
     -h, --help            Show this help message
 
 File Format:
@@ -68,6 +75,14 @@ while [[ $# -gt 0 ]]; do
             DRY_RUN=true
             shift
             ;;
+        -o|--skip-owned)
+            SKIP_OWNED=true
+            shift
+            ;;
+        -r|--requeue)
+            REQUEUE=true
+            shift
+            ;;
         -h|--help)
             show_help
             exit 0
@@ -92,16 +107,43 @@ if [ ! -f "$INPUT_FILE" ]; then
     exit 1
 fi
 
+SOURCE_FILE="$INPUT_FILE"
+
+# Collapse lines naming the same album (spelling, edition suffixes) so each is resolved once
+DUPLICATES=0
+DEDUPED_FILE=$(mktemp)
+trap 'rm -f "$DEDUPED_FILE" "$FILTERED_FILE" "$QUERIES_FILE"' EXIT
+if python3 "$SCRIPT_DIR/../scripts/dedupe-batch.py" "$INPUT_FILE" > "$DEDUPED_FILE" 2>/dev/null; then
+    BEFORE=$(grep -v "^#" "$INPUT_FILE" | grep -v "^[[:space:]]*$" | wc -l | tr -d ' ')
+    AFTER=$(grep -v "^#" "$DEDUPED_FILE" | grep -v "^[[:space:]]*$" | wc -l | tr -d ' ')
+    DUPLICATES=$((BEFORE - AFTER))
+    INPUT_FILE="$DEDUPED_FILE"
+else
+    echo -e "${YELLOW}Warning: Could not check for duplicate albums, resolving every line${NC}"
+fi
+
+# Drop albums already in the collection before resolving anything
+if [ "$SKIP_OWNED" = true ]; then
+    FILTERED_FILE=$(mktemp)
+    echo -e "${BLUE}Checking collection for owned albums...${NC}"
+    if ! python3 "$SCRIPT_DIR/../scripts/skip-owned.py" "$INPUT_FILE" > "$FILTERED_FILE"; then
+        echo -e "${RED}Error: Could not check collection${NC}"
+        exit 1
+    fi
+    INPUT_FILE="$FILTERED_FILE"
+    echo ""
+fi
+
 # Count total lines (excluding comments and empty lines)
 TOTAL=$(grep -v "^#" "$INPUT_FILE" | grep -v "^[[:space:]]*$" | wc -l | tr -d ' ')
 
 if [ "$TOTAL" -eq 0 ]; then
-    echo -e "${RED}Error: No albums found in '$INPUT_FILE'${NC}"
+    echo -e "${RED}Error: No albums found in '$SOURCE_FILE'${NC}"
     exit 1
 fi
 
 echo -e "${BLUE}=== Batch Downloader ===${NC}"
-echo -e "File: ${YELLOW}$INPUT_FILE${NC}"
+echo -e "File: ${YELLOW}$SOURCE_FILE${NC}"
 echo -e "Albums to process: ${YELLOW}$TOTAL${NC}"
 echo -e "Service: ${YELLOW}$DEFAULT_SERVICE${NC}"
 echo -e "Resolver delay: ${YELLOW}${DELAY}s${NC} between calls"
@@ -136,6 +178,9 @@ COUNT=0
 SUCCESS=0
 FAILED=0
 
+# Parsed "Artist - Album" queries, resolved together below
+QUERIES_FILE=$(mktemp)
+
 # Read file line by line
 while IFS= read -r line || [ -n "$line" ]; do
     # Skip comments and empty lines
@@ -171,43 +216,87 @@ while IFS= read -r line || [ -n "$line" ]; do
     ARTIST=$(echo "$ARTIST" | xargs)
     ALBUM=$(echo "$ALBUM" | xargs)
 
-    echo -e "${BLUE}[$COUNT/$TOTAL]${NC} Resolving: ${YELLOW}$ARTIST${NC} - ${YELLOW}$ALBUM${NC}"
-
     if [ "$DRY_RUN" = true ]; then
+        echo -e "${BLUE}[$COUNT/$TOTAL]${NC} Resolving: ${YELLOW}$ARTIST${NC} - ${YELLOW}$ALBUM${NC}"
         echo -e "  ${GREEN}[DRY RUN]${NC} Would resolve: $ARTIST - $ALBUM"
+        echo ""
         SUCCESS=$((SUCCESS + 1))
     else
-        # Run resolver and extract URL
-        RESOLVER_OUTPUT=$(python3 "$RESOLVER" --band "$ARTIST" --album "$ALBUM" --no-clipboard 2>&1)
+        echo "$ARTIST - $ALBUM" >> "$QUERIES_FILE"
+    fi
 
-        # Extract just the URL from output (supports both Deezer and Spotify)
-        URL=$(echo "$RESOLVER_OUTPUT" | grep -E 'https://(www\.)?deezer\.com/album/[0-9]+|https://open\.spotify\.com/album/[a-zA-Z0-9]+' | head -1)
+done < "$INPUT_FILE"
 
+# Resolve the queries with one resolver process, which writes one JSON record per query in
+# order (--format jsonl). With a delay, every query gets its own run so the delay can be kept.
+# Resolver errors stay on the console (stderr).
+resolve_queries() {
+    if [ "$DELAY" = "0" ]; then
+        python3 "$RESOLVER" --format jsonl < "$QUERIES_FILE"
+        return
+    fi
+    local first=true query
+    while IFS= read -r query; do
+        if [ "$first" = false ]; then
+            echo -e "  ${BLUE}Waiting ${DELAY}s before next resolver...${NC}" >&2
+            sleep "$DELAY"
+        fi
+        first=false
+        printf '%s\n' "$query" | python3 "$RESOLVER" --format jsonl
+    done < "$QUERIES_FILE"
+}
+
+QUERY_COUNT=$(wc -l < "$QUERIES_FILE" | tr -d ' ')
+if [ "$QUERY_COUNT" -gt 0 ]; then
+    INDEX=0
+    while IFS= read -r URL && IFS= read -r QUERY <&3; do
+        INDEX=$((INDEX + 1))
+        echo -e "${BLUE}[$INDEX/$QUERY_COUNT]${NC} Resolving: ${YELLOW}$QUERY${NC}"
+
+        # kit-output.py writes an empty line (and the reason, on stderr) for a failed query
         if [ -n "$URL" ]; then
             echo -e "  ${GREEN}✓${NC} Found: $URL"
             ALL_URLS+=("$URL")
             SUCCESS=$((SUCCESS + 1))
-
-            # Delay before next resolver call (but not after the last one)
-            if [ $COUNT -lt $TOTAL ]; then
-                echo -e "  ${BLUE}Waiting ${DELAY}s before next resolver...${NC}"
-                sleep "$DELAY"
-            fi
         else
             echo -e "  ${RED}✗${NC} Failed to resolve"
             FAILED=$((FAILED + 1))
         fi
-    fi
+        echo ""
+    done 3< "$QUERIES_FILE" < <(resolve_queries | python3 "$SCRIPT_DIR/../scripts/kit-output.py" --keep-failed)
 
-    echo ""
+    # Queries left without a record (the resolver stopped early) failed too
+    FAILED=$((FAILED + QUERY_COUNT - INDEX))
+fi
 
-done < "$INPUT_FILE"
+# Drop albums the download ledger already has in hand (queued by an earlier run, downloading,
+# done or failed); a ledger error keeps every URL
+LEDGER="$SCRIPT_DIR/../scripts/kit-ledger.py"
+SKIPPED=0
+if [ ${#ALL_URLS[@]} -gt 0 ] && [ "$REQUEUE" = false ]; then
+    if NEW_URLS=$(printf '%s\n' "${ALL_URLS[@]}" | python3 "$LEDGER" filter 2>/dev/null); then
+        SKIPPED=${#ALL_URLS[@]}
+        ALL_URLS=()
+        while IFS= read -r URL; do
+            [ -n "$URL" ] && ALL_URLS+=("$URL")
+        done <<< "$NEW_URLS"
+        SKIPPED=$((SKIPPED - ${#ALL_URLS[@]}))
+    else
+        echo -e "${YELLOW}Warning: Could not check the download ledger, queueing every album${NC}"
+    fi
+fi
 
 # Summary
 echo -e "${BLUE}=== Summary ===${NC}"
 echo -e "Total processed: ${YELLOW}$TOTAL${NC}"
 echo -e "${GREEN}Successful: $SUCCESS${NC}"
 echo -e "${RED}Failed: $FAILED${NC}"
+if [ "$DUPLICATES" -gt 0 ]; then
+    echo -e "Duplicates collapsed: ${YELLOW}$DUPLICATES${NC} (resolver requests saved)"
+fi
+if [ "$SKIPPED" -gt 0 ]; then
+    echo -e "Skipped: ${YELLOW}$SKIPPED${NC} albums already queued, downloading, done or failed (-r to queue them again)"
+fi
 
 if [ "$DRY_RUN" = false ] && [ ${#ALL_URLS[@]} -gt 0 ]; then
     # Join all URLs with newlines
@@ -216,6 +305,7 @@ if [ "$DRY_RUN" = false ] && [ ${#ALL_URLS[@]} -gt 0 ]; then
     echo ""
     echo -e "${BLUE}=== Copying to Clipboard ===${NC}"
     echo "$ALL_URLS_JOINED" | pbcopy
+    echo "$ALL_URLS_JOINED" | python3 "$LEDGER" queued --source batch-downloader
     echo -e "${GREEN}✓${NC} Copied ${#ALL_URLS[@]} album URLs to clipboard!"
 
     # Paste to Deemix
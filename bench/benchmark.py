@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+End-to-End Benchmark Suite for DeemixKit
+
+Runs every resolver entry point against the local mock API server and
+reports throughput and p50/p99 latency per entry point, plus the number of
+API requests each run makes. Results can be saved and compared against a
+baseline so regressions show up before they ship.
+
+Each entry point is measured twice. Cold runs each get a fresh process and
+an empty HOME, so every run goes through the API (searches, pagination) as
+a first run does. Warm runs share one HOME that a warmup run has filled,
+so they measure the cache path (catalog, album details, tokens) and are
+reported as NAME-warm. Every run gets its own download ledger, so albums
+one run queues are never skipped by the next. Nothing leaks into your real
+configuration.
+
+Usage:
+    python3 bench/benchmark.py
+    python3 bench/benchmark.py --runs 30 --latency 50 --json results.json
+    python3 bench/benchmark.py --baseline results.json --max-regression 0.2
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import argparse
+import tempfile
+import subprocess
+import importlib.util
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+
+# Entry point name -> command line (relative to the repo root)
+SCENARIOS = {
+    'deezer-resolver': ['deezer/deezer-resolver.py', '--band', 'Metallica',
+                        '--album', 'Master of Puppets', '--no-clipboard'],
+    'spotify-resolver': ['spotify/spotify-resolver.py', '--band', 'Pink Floyd',
+                         '--album', 'The Wall', '--no-clipboard'],
+    'global-resolver': ['global/global-resolver.py', 'https://www.deezer.com/track/3135556', '--no-clipboard'],
+    'global-resolver-spotify': ['global/global-resolver.py',
+                                'https://open.spotify.com/track/4uLU6hMCjMI75M1A2tKUQC', '--no-clipboard'],
+    'playlist-downloader': ['playlist/playlist-downloader.py',
+                            'https://www.deezer.com/playlist/908622995', '--no-clipboard'],
+    'playlist-downloader-spotify': ['playlist/playlist-downloader.py',
+                                    'https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M', '--no-clipboard'],
+    'discography-resolver': ['discography/discography-resolver.py', '--band', 'Radiohead',
+                             '--album', 'OK Computer'],
+}
+
+
+def load_mock_server():
+    """Load bench/mock-api-server.py (the file name contains dashes)."""
+    spec = importlib.util.spec_from_file_location("mock_api_server", BENCH_DIR / "mock-api-server.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["mock_api_server"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def make_home() -> Path:
+    """Create an isolated HOME with mock Spotify credentials."""
+    home = Path(tempfile.mkdtemp(prefix="deemixkit-bench-"))
+    creds_dir = home / ".config" / "deemixkit"
+    creds_dir.mkdir(parents=True)
+    with open(creds_dir / "credentials.json", 'w') as f:
+        json.dump({'spotify': {'client_id': 'bench', 'client_secret': 'bench'}}, f)
+    return home
+
+
+def server_requests(base_url: str) -> int:
+    with urllib.request.urlopen(f"{base_url}/_stats", timeout=5) as response:
+        return json.load(response).get('total', 0)
+
+
+def run_once(command: List[str], env: Dict[str, str], home: Optional[Path] = None) -> Dict[str, Any]:
+    """Run one entry point invocation in home (a fresh one, removed afterwards, when None) and time it."""
+    fresh = home is None
+    home = make_home() if fresh else home
+    # A shared ledger would hold every album back after the first run (see kit-ledger)
+    env = dict(env, HOME=str(home), DEEMIXKIT_LEDGER=str(home / f"ledger-{uuid.uuid4().hex}.db"))
+    try:
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable] + command, cwd=ROOT, env=env,
+                                capture_output=True, text=True, timeout=120)
+        elapsed = time.perf_counter() - started
+    finally:
+        if fresh:
+            shutil.rmtree(home, ignore_errors=True)
+    ok = result.returncode == 0 and 'https://' in result.stdout
+    return {'elapsed': elapsed, 'ok': ok, 'stderr': result.stderr[-500:]}
+
+
+def run_scenario(name: str, command: List[str], base_url: str, env_vars: Dict[str, str],
+                 runs: int, concurrency: int, warmup: int, warm: bool = False) -> Dict[str, Any]:
+    """
+    Benchmark one entry point and summarize its timings.
+
+    Cold runs (the default) each start from an empty HOME. With warm, all
+    runs share one HOME that the warmup runs (at least one) have filled.
+    """
+    home = make_home() if warm else None
+    env = dict(os.environ, **env_vars)
+
+    try:
+        for _ in range(max(warmup, 1) if warm else warmup):
+            run_once(command, env, home)
+
+        requests_before = server_requests(base_url)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(lambda _: run_once(command, env, home), range(runs)))
+        wall = time.perf_counter() - started
+        requests_made = server_requests(base_url) - requests_before
+    finally:
+        if home is not None:
+            shutil.rmtree(home, ignore_errors=True)
+
+    timings = [r['elapsed'] for r in results if r['ok']]
+    failures = [r for r in results if not r['ok']]
+    return {
+        'name': f"{name}-warm" if warm else name,
+        'runs': runs,
+        'failures': len(failures),
+        'last_error': failures[-1]['stderr'] if failures else None,
+        'throughput': len(timings) / wall if wall else 0.0,
+        'p50_ms': percentile(timings, 50) * 1000,
+        'p99_ms': percentile(timings, 99) * 1000,
+        'mean_ms': (sum(timings) / len(timings) * 1000) if timings else 0.0,
+        'requests_per_run': requests_made / runs if runs else 0.0,
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Return a message for every entry point whose p50 or p99 regressed beyond max_regression."""
+    regressions = []
+    for result in results:
+        previous = baseline.get(result['name'])
+        if not previous:
+            continue
+        for metric in ('p50_ms', 'p99_ms'):
+            if previous[metric] and result[metric] > previous[metric] * (1 + max_regression):
+                regressions.append(f"{result['name']}: {metric} {previous[metric]:.0f} -> {result[metric]:.0f} ms")
+        if result['requests_per_run'] > previous.get('requests_per_run', result['requests_per_run']):
+            regressions.append(f"{result['name']}: requests/run {previous['requests_per_run']:.1f} -> "
+                               f"{result['requests_per_run']:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark DeemixKit entry points against the mock API server",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Entry points:
+  {', '.join(SCENARIOS)}
+
+Examples:
+  %(prog)s
+  %(prog)s --only deezer-resolver --runs 50
+  %(prog)s --cache cold              # Only runs that go through the API
+  %(prog)s --latency 80 --page-size 10 --json results.json
+  %(prog)s --baseline results.json   # Exit 1 on regressions
+        """
+    )
+    parser.add_argument('--runs', type=int, default=10, help='Runs per entry point (default: 10)')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed warmup runs (default: 1)')
+    parser.add_argument('--concurrency', type=int, default=1, help='Parallel runs (default: 1)')
+    parser.add_argument('--only', action='append', choices=sorted(SCENARIOS), help='Benchmark only this entry point')
+    parser.add_argument('--cache', choices=['cold', 'warm', 'both'], default='both',
+                        help='Runs from an empty HOME, from a warmed-up one, or both (default: both)')
+    parser.add_argument('--latency', type=float, default=20, help='Mock latency per request in ms (default: 20)')
+    parser.add_argument('--jitter', type=float, default=0, help='Random extra latency in ms')
+    parser.add_argument('--page-size', type=int, default=25, help='Mock pagination size (default: 25)')
+    parser.add_argument('--quota', type=int, default=0, help='Mock requests per 5s before quota errors (0: off)')
+    parser.add_argument('--json', type=str, help='Write results to this file')
+    parser.add_argument('--baseline', type=str, help='Compare against results saved with --json')
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help='Allowed slowdown vs. baseline as a fraction (default: 0.2)')
+
+    args = parser.parse_args()
+
+    mock = load_mock_server()
+    server = mock.start_server(latency=args.latency / 1000, jitter=args.jitter / 1000,
+                               page_size=args.page_size, quota=args.quota, fixtures_dir=None)
+    env_vars = mock.tool_environment(server.base_url)
+    print(f"Mock API on {server.base_url} (latency {args.latency:.0f} ms, page size {args.page_size})",
+          file=sys.stderr)
+
+    results = []
+    try:
+        for name in args.only or SCENARIOS:
+            print(f"Benchmarking {name}...", file=sys.stderr)
+            for warm in {'cold': [False], 'warm': [True], 'both': [False, True]}[args.cache]:
+                results.append(run_scenario(name, SCENARIOS[name], server.base_url, env_vars,
+                                            args.runs, args.concurrency, args.warmup, warm))
+    finally:
+        server.shutdown()
+
+    print()
+    print(f"{'Entry point':<34} {'runs/s':>7} {'p50 ms':>8} {'p99 ms':>8} {'req/run':>8} {'fail':>5}")
+    for result in results:
+        print(f"{result['name']:<34} {result['throughput']:>7.2f} {result['p50_ms']:>8.0f} "
+              f"{result['p99_ms']:>8.0f} {result['requests_per_run']:>8.1f} {result['failures']:>5}")
+
+    for result in results:
+        if result['last_error']:
+            print(f"\n{result['name']} failed:\n{result['last_error']}", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({result['name']: result for result in results}, f, indent=2)
+        print(f"\nResults written to {args.json}", file=sys.stderr)
+
+    exit_code = 1 if any(result['failures'] for result in results) else 0
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.max_regression)
+        if regressions:
+            print("\nRegressions:", file=sys.stderr)
+            for message in regressions:
+                print(f"  {message}", file=sys.stderr)
+            exit_code = 1
+        else:
+            print("\nNo regressions against baseline", file=sys.stderr)
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Stand-in Key-Value Server for DeemixKit
+
+A small in-memory server speaking the subset of the Redis protocol that
+kit-cache's networked backend uses, so several tool processes can share a
+cache and a rate budget in tests without a Redis installation.
+
+Supports: PING, AUTH, SELECT, GET, MGET, SET (EX/PX), DEL, INCR, DECR, EXPIRE,
+PEXPIRE, TTL, TIME, DBSIZE, FLUSHALL.
+
+Point the tools at it with:
+    DEEMIXKIT_CACHE=redis://127.0.0.1:6399/0
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import sys
+import time
+import argparse
+import threading
+import socketserver
+from typing import Optional, List
+
+DEFAULT_PORT = 6399
+
+
+class KeyValueStore:
+    """Values with optional expiry, one dict per database number."""
+
+    def __init__(self):
+        self.databases = {}
+        self.lock = threading.Lock()
+        self.commands = 0
+
+    def db(self, number: int) -> dict:
+        return self.databases.setdefault(number, {})
+
+    def lookup(self, db: dict, key: bytes) -> Optional[bytes]:
+        """Value of key, dropping it when expired (caller holds the lock)."""
+        entry = db.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del db[key]
+            return None
+        return value
+
+
+class RESPHandler(socketserver.StreamRequestHandler):
+    """One client connection; commands are answered in order, so pipelining works."""
+
+    def handle(self):
+        self.db_number = 0
+        while True:
+            try:
+                command = self.read_command()
+            except (ConnectionError, ValueError):
+                return
+            if command is None:
+                return
+            try:
+                reply = self.execute(command)
+            except (ValueError, IndexError):
+                reply = b"-ERR syntax error\r\n"
+            self.wfile.write(reply)
+
+    def read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            # Inline command, as typed into telnet
+            return line.split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    @staticmethod
+    def bulk(value: Optional[bytes]) -> bytes:
+        return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+    @staticmethod
+    def integer(value: int) -> bytes:
+        return b":%d\r\n" % value
+
+    def execute(self, command: List[bytes]) -> bytes:
+        store = self.server.store
+        name = command[0].upper().decode()
+        args = command[1:]
+        with store.lock:
+            store.commands += 1
+            db = store.db(self.db_number)
+
+            if name == 'PING':
+                return b"+PONG\r\n"
+            if name == 'AUTH':
+                return b"+OK\r\n"
+            if name == 'SELECT':
+                self.db_number = int(args[0])
+                return b"+OK\r\n"
+            if name == 'TIME':
+                now = time.time()
+                seconds = str(int(now)).encode()
+                micros = str(int((now % 1) * 1e6)).encode()
+                return b"*2\r\n" + self.bulk(seconds) + self.bulk(micros)
+            if name == 'GET':
+                return self.bulk(store.lookup(db, args[0]))
+            if name == 'MGET':
+                return b"*%d\r\n" % len(args) + b''.join(self.bulk(store.lookup(db, key)) for key in args)
+            if name == 'SET':
+                expires_at = None
+                options = [arg.upper() for arg in args[2::2]]
+                for option, value in zip(options, args[3::2]):
+                    if option == b'EX':
+                        expires_at = time.time() + int(value)
+                    elif option == b'PX':
+                        expires_at = time.time() + int(value) / 1000
+                db[args[0]] = (args[1], expires_at)
+                return b"+OK\r\n"
+            if name == 'DEL':
+                return self.integer(sum(1 for key in args if db.pop(key, None) is not None))
+            if name in ('INCR', 'DECR'):
+                value = store.lookup(db, args[0])
+                number = int(value or 0) + (1 if name == 'INCR' else -1)
+                expires_at = db[args[0]][1] if value is not None else None
+                db[args[0]] = (str(number).encode(), expires_at)
+                return self.integer(number)
+            if name in ('EXPIRE', 'PEXPIRE'):
+                value = store.lookup(db, args[0])
+                if value is None:
+                    return self.integer(0)
+                seconds = int(args[1]) / (1000 if name == 'PEXPIRE' else 1)
+                db[args[0]] = (value, time.time() + seconds)
+                return self.integer(1)
+            if name == 'TTL':
+                if store.lookup(db, args[0]) is None:
+                    return self.integer(-2)
+                expires_at = db[args[0]][1]
+                return self.integer(-1 if expires_at is None else int(expires_at - time.time()))
+            if name == 'DBSIZE':
+                return self.integer(len(db))
+            if name == 'FLUSHALL':
+                store.databases.clear()
+                return b"+OK\r\n"
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
+
+
+class KeyValueServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, store: KeyValueStore):
+        super().__init__(address, RESPHandler)
+        self.store = store
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="In-memory stand-in for the Redis server behind DEEMIXKIT_CACHE",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                        # Listen on 127.0.0.1:6399
+  %(prog)s --port 6400 --host 0.0.0.0
+        """
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+
+    args = parser.parse_args()
+
+    server = KeyValueServer((args.host, args.port), KeyValueStore())
+    print(f"Key-value server listening on {args.host}:{args.port}", file=sys.stderr)
+    print(f"export DEEMIXKIT_CACHE=redis://{args.host}:{args.port}/0")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{server.store.commands} commands served", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
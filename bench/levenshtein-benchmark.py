@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Edit Distance Microbenchmark for DeemixKit
+
+Times the similarity check behind CollectionMatcher._fuzzy_match on the name
+pairs a lookup actually compares: every query artist against every indexed
+artist, indexed artists against each other, misspelled artist names against
+the real ones, and album titles against owned ones. Three implementations
+are compared:
+
+  full     the original full-matrix Levenshtein (kept here as the reference)
+  banded   bounded_levenshtein: Ukkonen band, two rows, early exit
+  backend  levenshtein_within: rapidfuzz or python-Levenshtein when installed
+
+Every implementation must give the same match verdict on every pair.
+
+Usage:
+    python3 bench/levenshtein-benchmark.py
+    python3 bench/levenshtein-benchmark.py --collection /Volumes/Eksternal/Audio --pairs 50000
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import importlib.util
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+
+THRESHOLDS = {'artist': 0.90, 'album': 0.85}
+
+
+def load_module(module_file: Path):
+    """Load a DeemixKit module by path (the file names contain dashes)."""
+    module_name = module_file.stem.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def full_matrix_distance(str1: str, str2: str) -> int:
+    """The Levenshtein distance as _fuzzy_match computed it before the banded version."""
+    len1, len2 = len(str1), len(str2)
+    d = [[0] * (len2 + 1) for _ in range(len1 + 1)]
+    for i in range(len1 + 1):
+        d[i][0] = i
+    for j in range(len2 + 1):
+        d[0][j] = j
+    for i in range(1, len1 + 1):
+        for j in range(1, len2 + 1):
+            cost = 0 if str1[i-1] == str2[j-1] else 1
+            d[i][j] = min(d[i-1][j] + 1, d[i][j-1] + 1, d[i-1][j-1] + cost)
+    return d[len1][len2]
+
+
+def allowed_distance(len1: int, len2: int, threshold: float) -> int:
+    """Largest distance whose similarity still reaches threshold (mirrors _fuzzy_match)."""
+    max_len = max(len1, len2)
+    max_distance = int((1 - threshold) * max_len)
+    while max_distance >= 0 and 1 - (max_distance / max_len) < threshold:
+        max_distance -= 1
+    while 1 - ((max_distance + 1) / max_len) >= threshold:
+        max_distance += 1
+    return max_distance
+
+
+def name_pairs(matcher, queries: List[Dict[str, str]], limit: int, seed: int) -> List[Tuple[str, str, float]]:
+    """
+    Pairs that reach the edit distance step of _fuzzy_match during real lookups.
+
+    Pairs that the exact, containment or length checks settle first are left
+    out, since no implementation of the distance is involved there.
+    """
+    normalize = matcher._normalize_text
+    artists = list(matcher.collection_cache)
+    albums = [album for artist in artists for album in matcher.collection_cache[artist]]
+    pairs = []
+
+    def consider(str1: str, str2: str, threshold: float):
+        if not str1 or not str2 or str1 == str2 or str1 in str2 or str2 in str1:
+            return
+        if abs(len(str1) - len(str2)) > max(len(str1), len(str2)) * 0.3:
+            return
+        pairs.append((str1, str2, threshold))
+
+    # Near-duplicate artists in the collection are the pairs that do match
+    by_length = sorted(artists, key=len)
+    for i, artist in enumerate(by_length):
+        for other in by_length[i + 1:]:
+            if len(other) > len(artist) / 0.7:
+                break
+            consider(artist, other, THRESHOLDS['artist'])
+
+    rng = random.Random(seed)
+    for query in queries:
+        artist = normalize(query['artist'])
+        # A one-letter misspelling, the kind of pair the fuzzy match exists for
+        if len(artist) > 1:
+            i = rng.randrange(len(artist))
+            consider(artist[:i] + rng.choice('aeiourst') + artist[i + 1:], artist, THRESHOLDS['artist'])
+        for cached_artist in artists:
+            consider(artist, cached_artist, THRESHOLDS['artist'])
+        album = normalize(query['album'])
+        for cached_album in random.Random(album).sample(albums, min(len(albums), 200)):
+            consider(album, cached_album, THRESHOLDS['album'])
+
+    rng.shuffle(pairs)
+    return pairs[:limit]
+
+
+def time_verdicts(check: Callable[[str, str, int], bool], pairs, min_seconds: float) -> Tuple[float, List[bool]]:
+    """Run check over every pair (repeating until min_seconds) and return (pairs/s, verdicts)."""
+    limits = [allowed_distance(len(a), len(b), threshold) for a, b, threshold in pairs]
+    verdicts = [check(a, b, k) for (a, b, _), k in zip(pairs, limits)]
+    started = time.perf_counter()
+    done = 0
+    while True:
+        for (a, b, _), k in zip(pairs, limits):
+            check(a, b, k)
+        done += len(pairs)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            break
+    return done / elapsed, verdicts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the full-matrix and banded edit distance on collection name pairs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s
+  %(prog)s --collection /Volumes/Eksternal/Audio --pairs 50000
+  %(prog)s --json levenshtein.json
+        """
+    )
+    parser.add_argument('--collection', type=str,
+                        help='Music collection to take names from (default: a synthetic 2000-album collection)')
+    parser.add_argument('--albums', type=int, default=2000, help='Size of the synthetic collection (default: 2000)')
+    parser.add_argument('--queries', type=int, default=50, help='Lookup queries to build pairs from (default: 50)')
+    parser.add_argument('--pairs', type=int, default=20000, help='Maximum name pairs to time (default: 20000)')
+    parser.add_argument('--min-seconds', type=float, default=1.0,
+                        help='Minimum time spent per implementation (default: 1)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    parser.add_argument('--json', type=str, help='Write results to this file')
+
+    args = parser.parse_args()
+
+    matcher_module = load_module(ROOT / "scripts" / "rileys-collection-matcher.py")
+    generator = load_module(BENCH_DIR / "synthetic-collection.py")
+
+    workdir = None
+    if args.collection:
+        collection = Path(args.collection).expanduser()
+    else:
+        workdir = Path(tempfile.mkdtemp(prefix="deemixkit-levenshtein-"))
+        collection = workdir / "collection"
+        print(f"Generating {args.albums} albums in {collection}...", file=sys.stderr)
+        generator.generate_collection(collection, args.albums, args.seed, tracks_per_album=1)
+
+    try:
+        with redirect_stdout(open(os.devnull, 'w')):
+            matcher = matcher_module.CollectionMatcher(str(collection))
+        truth = [{'artist': record.artist, 'album': record.album, 'title': record.album, 'year': record.year}
+                 for albums in matcher.collection_cache.values() for record in albums.values()]
+        queries = generator.make_queries(truth, args.queries, seed=args.seed)
+        pairs = name_pairs(matcher, queries, args.pairs, args.seed)
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if not pairs:
+        print("Error: no name pairs reach the edit distance step", file=sys.stderr)
+        sys.exit(1)
+
+    # Load the C backend now so its import is not timed
+    matcher_module.levenshtein_within('a', 'b', 1)
+    backend = matcher_module._levenshtein_backend
+    implementations = {
+        'full': lambda a, b, k: full_matrix_distance(a, b) <= k,
+        'banded': lambda a, b, k: matcher_module.bounded_levenshtein(a, b, k) <= k,
+    }
+    if backend is not matcher_module.bounded_levenshtein:
+        implementations['backend'] = lambda a, b, k: backend(a, b, k) <= k
+
+    print(f"Timing {len(pairs)} name pairs...", file=sys.stderr)
+    results = []
+    reference = None
+    for name, check in implementations.items():
+        pairs_per_sec, verdicts = time_verdicts(check, pairs, args.min_seconds)
+        if reference is None:
+            reference = verdicts
+        results.append({
+            'implementation': name,
+            'pairs_per_sec': round(pairs_per_sec, 1),
+            'matches': sum(verdicts),
+            'disagreements': sum(1 for got, want in zip(verdicts, reference) if got != want),
+        })
+
+    print()
+    print(f"{'implementation':<16} {'pairs/s':>12} {'speedup':>8} {'matches':>8} {'disagree':>9}")
+    for result in results:
+        speedup = result['pairs_per_sec'] / results[0]['pairs_per_sec']
+        print(f"{result['implementation']:<16} {result['pairs_per_sec']:>12.0f} {speedup:>7.1f}x "
+              f"{result['matches']:>8} {result['disagreements']:>9}")
+    if 'backend' not in implementations:
+        print("\n(no rapidfuzz or python-Levenshtein installed; backend column skipped)", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'pairs': len(pairs), 'results': results}, f, indent=2)
+        print(f"\nResults written to {args.json}", file=sys.stderr)
+
+    if any(result['disagreements'] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+CollectionMatcher Scaling Benchmark for DeemixKit
+
+Generates synthetic collections of growing size and reports, for each size,
+how long CollectionMatcher takes to scan, how much memory its index holds,
+and how many lookups per second is_album_in_collection and
+filter_existing_albums sustain. Lookup answers are checked against the
+generator's ground truth so speedups that change results are caught.
+
+Usage:
+    python3 bench/matcher-benchmark.py
+    python3 bench/matcher-benchmark.py --sizes 10000,100000,500000 --queries 200
+    python3 bench/matcher-benchmark.py --sizes 10000 --keep /tmp/collections --json matcher.json
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import importlib.util
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, Any, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+
+
+def load_module(module_file: Path):
+    """Load a DeemixKit module by path (the file names contain dashes)."""
+    module_name = module_file.stem.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def deep_sizeof(obj: Any) -> int:
+    """Approximate bytes held by obj and everything it references, counting shared objects once."""
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, '__dict__') and not isinstance(item, type):
+            stack.append(vars(item))
+        elif hasattr(item, '__slots__'):
+            stack.extend(getattr(item, slot) for slot in item.__slots__ if hasattr(item, slot))
+    return total
+
+
+def timed_lookups(matcher, queries: List[Dict[str, str]], min_seconds: float) -> Dict[str, float]:
+    """Run is_album_in_collection over queries (repeating until min_seconds) and check the answers."""
+    started = time.perf_counter()
+    lookups = 0
+    wrong = 0
+    while True:
+        for query in queries:
+            found = matcher.is_album_in_collection(query['artist'], query['album'], query['year'])
+            if lookups < len(queries) and found != query['expected']:
+                wrong += 1
+            lookups += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            break
+    return {
+        'lookups_per_sec': lookups / elapsed,
+        'accuracy': 1 - wrong / len(queries),
+    }
+
+
+def benchmark_size(matcher_module, generator, size: int, workdir: Path, args) -> Dict[str, Any]:
+    """Generate (or reuse) a collection of size albums and benchmark the matcher on it."""
+    collection = workdir / f"collection-{size}-seed{args.seed}"
+    truth_file = collection.with_suffix('.truth.json')
+
+    if truth_file.exists():
+        with open(truth_file, 'r') as f:
+            truth = json.load(f)
+    else:
+        print(f"Generating {size} albums in {collection}...", file=sys.stderr)
+        if collection.exists():
+            shutil.rmtree(collection)
+        truth = generator.generate_collection(collection, size, args.seed, args.tracks)
+        with open(truth_file, 'w') as f:
+            json.dump(truth, f)
+
+    queries = generator.make_queries(truth, args.queries, args.hit_ratio, args.seed)
+
+    print(f"Scanning {size} albums...", file=sys.stderr)
+    with redirect_stdout(open(os.devnull, 'w')):
+        started = time.perf_counter()
+        matcher = matcher_module.CollectionMatcher(str(collection))
+        scan_seconds = time.perf_counter() - started
+
+    stats = matcher.get_collection_stats()
+    index_bytes = deep_sizeof(matcher.collection_cache)
+
+    # Time startup from the saved JSON index and from the mmapped snapshot
+    index_file = workdir / f"index-{size}.json"
+    snapshot_file = workdir / f"index-{size}.snap"
+    matcher.index_file, matcher.snapshot_file = index_file, snapshot_file
+    matcher.save_index()
+    matcher.save_snapshot()
+    load_ms = {}
+    with redirect_stdout(open(os.devnull, 'w')):
+        for name, options in (('index', {'index_file': str(index_file)}),
+                              ('snapshot', {'snapshot_file': str(snapshot_file)})):
+            started = time.perf_counter()
+            matcher_module.CollectionMatcher(str(collection), **options)
+            load_ms[name] = (time.perf_counter() - started) * 1000
+
+    print(f"Timing lookups ({len(queries)} queries)...", file=sys.stderr)
+    lookups = timed_lookups(matcher, queries, args.min_seconds)
+
+    started = time.perf_counter()
+    new_albums, existing_albums = matcher.filter_existing_albums(queries, workers=args.workers)
+    filter_seconds = time.perf_counter() - started
+
+    return {
+        'albums': len(truth),
+        'indexed_albums': stats['total_albums'],
+        'indexed_artists': stats['total_artists'],
+        'scan_seconds': round(scan_seconds, 3),
+        'index_mb': round(index_bytes / 1024 / 1024, 2),
+        'bytes_per_album': round(index_bytes / max(1, stats['total_albums'])),
+        'index_load_ms': round(load_ms['index'], 1),
+        'snapshot_load_ms': round(load_ms['snapshot'], 2),
+        'lookups_per_sec': round(lookups['lookups_per_sec'], 1),
+        'accuracy': round(lookups['accuracy'], 4),
+        'filter_albums_per_sec': round(len(queries) / filter_seconds, 1) if filter_seconds else None,
+        'filter_existing': len(existing_albums),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark CollectionMatcher against synthetic collections of growing size",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s
+  %(prog)s --sizes 10000,100000,500000 --queries 200
+  %(prog)s --keep /tmp/collections   # Reuse generated collections across runs
+  %(prog)s --queries 2000 --workers 1  # filter/s without worker processes
+        """
+    )
+    parser.add_argument('--sizes', type=str, default='1000,10000',
+                        help='Comma-separated collection sizes in albums (default: 1000,10000)')
+    parser.add_argument('--queries', type=int, default=500, help='Lookup queries per size (default: 500)')
+    parser.add_argument('--hit-ratio', type=float, default=0.5, help='Share of queries that are owned (default: 0.5)')
+    parser.add_argument('--min-seconds', type=float, default=1.0,
+                        help='Minimum time spent timing lookups per size (default: 1)')
+    parser.add_argument('--workers', type=int,
+                        help='Worker processes for filter_existing_albums (default: one per CPU)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    parser.add_argument('--tracks', type=int, default=2, help='Audio stubs per album (default: 2)')
+    parser.add_argument('--keep', type=str, help='Generate collections here and keep them for later runs')
+    parser.add_argument('--json', type=str, help='Write results to this file')
+
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    matcher_module = load_module(ROOT / "scripts" / "rileys-collection-matcher.py")
+    generator = load_module(BENCH_DIR / "synthetic-collection.py")
+
+    if args.keep:
+        workdir = Path(args.keep).expanduser()
+        workdir.mkdir(parents=True, exist_ok=True)
+    else:
+        workdir = Path(tempfile.mkdtemp(prefix="deemixkit-matcher-"))
+
+    results = []
+    try:
+        for size in sizes:
+            results.append(benchmark_size(matcher_module, generator, size, workdir, args))
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    print(f"{'albums':>8} {'artists':>8} {'scan s':>8} {'index MB':>9} {'B/album':>8} {'json ms':>8} "
+          f"{'snap ms':>8} {'lookups/s':>10} {'filter/s':>9} {'accuracy':>9}")
+    for result in results:
+        print(f"{result['albums']:>8} {result['indexed_artists']:>8} {result['scan_seconds']:>8.2f} "
+              f"{result['index_mb']:>9.1f} {result['bytes_per_album']:>8} {result['index_load_ms']:>8.0f} "
+              f"{result['snapshot_load_ms']:>8.1f} {result['lookups_per_sec']:>10.0f} "
+              f"{result['filter_albums_per_sec']:>9.0f} {result['accuracy']:>9.1%}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+Mock Deezer/Spotify API Server for DeemixKit
+
+A local stand-in for the Deezer and Spotify Web APIs, so the resolvers can
+be benchmarked and regression-tested offline. Responses come from recorded
+fixtures when present and from a deterministic synthetic catalog otherwise.
+
+Serves, under one port:
+    /deezer/...            search/album, artist/{id}, artist/{id}/albums,
+                           album/{id}, playlist/{id}, playlist/{id}/tracks,
+                           track/{id}
+    /spotify/v1/...        search, playlists/{id}, playlists/{id}/tracks,
+                           artists/{id}/albums, tracks/{id}
+    /spotify-accounts/...  api/token
+
+Point the tools at it with:
+    DEEMIXKIT_DEEZER_API=http://127.0.0.1:8765/deezer
+    DEEMIXKIT_SPOTIFY_API=http://127.0.0.1:8765/spotify
+    DEEMIXKIT_SPOTIFY_ACCOUNTS=http://127.0.0.1:8765/spotify-accounts
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+import urllib.parse
+import urllib.request
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+DEFAULT_PORT = 8765
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# Real API hosts, used when recording fixtures
+UPSTREAM = {
+    'deezer': "https://api.deezer.com",
+    'spotify': "https://api.spotify.com",
+    'spotify-accounts': "https://accounts.spotify.com",
+}
+
+DEEZER_QUOTA_ERROR = {"error": {"type": "Exception", "message": "Quota limit exceeded", "code": 4}}
+SPOTIFY_QUOTA_ERROR = {"error": {"status": 429, "message": "API rate limit exceeded"}}
+
+BASE62 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+RECORD_TYPES = ['album', 'album', 'ep', 'single', 'album', 'single']
+
+
+def spotify_id(number: int) -> str:
+    """Encode a number as a 22-character Spotify-style base62 id."""
+    chars = []
+    while number:
+        number, rem = divmod(number, 62)
+        chars.append(BASE62[rem])
+    return ''.join(reversed(chars)).rjust(22, '0')
+
+
+def spotify_number(item_id: str) -> int:
+    """Decode a Spotify-style id back into its number (stable hash for foreign ids)."""
+    if all(c in BASE62 for c in item_id) and item_id.startswith('0'):
+        number = 0
+        for c in item_id:
+            number = number * 62 + BASE62.index(c)
+        return number
+    return stable_number(item_id)
+
+
+def stable_number(text: str, modulo: int = 900000) -> int:
+    """Map text to a stable positive number."""
+    return int(hashlib.sha1(text.lower().encode('utf-8')).hexdigest()[:8], 16) % modulo + 1000
+
+
+class SyntheticCatalog:
+    """Deterministic fake catalog: the same ids always produce the same data."""
+
+    def __init__(self, albums_per_artist: int = 40, tracks_per_playlist: int = 200):
+        self.albums_per_artist = albums_per_artist
+        self.tracks_per_playlist = tracks_per_playlist
+
+    def artist(self, artist_id: int) -> Dict[str, Any]:
+        return {'id': artist_id, 'name': f"Artist {artist_id}", 'type': 'artist'}
+
+    def artist_albums(self, artist_id: int) -> List[Dict[str, Any]]:
+        """Albums of an artist, newest first (like Deezer's default ordering)."""
+        albums = []
+        for k in range(self.albums_per_artist):
+            album_id = artist_id * 1000 + (self.albums_per_artist - k)
+            albums.append({
+                'id': album_id,
+                'title': f"Album {album_id}",
+                'record_type': RECORD_TYPES[album_id % len(RECORD_TYPES)],
+                'release_date': f"{2025 - k // 2}-{(album_id % 12) + 1:02d}-01",
+                'type': 'album'
+            })
+        return albums
+
+    def album(self, album_id: int) -> Dict[str, Any]:
+        rng = random.Random(album_id)
+        artist_id = album_id // 1000
+        nb_tracks = rng.randint(6, 14)
+        tracks = [{'id': album_id * 100 + n, 'title': f"Track {n}", 'duration': rng.randint(120, 420),
+                   'readable': album_id % 53 != 0} for n in range(1, nb_tracks + 1)]
+        return {
+            'id': album_id,
+            'title': f"Album {album_id}",
+            'artist': self.artist(artist_id),
+            'record_type': RECORD_TYPES[album_id % len(RECORD_TYPES)],
+            'release_date': f"{2000 + album_id % 25}-01-01",
+            'available': album_id % 97 != 0,
+            'nb_tracks': nb_tracks,
+            'duration': sum(track['duration'] for track in tracks),
+            'tracks': {'data': tracks},
+            'type': 'album'
+        }
+
+    def album_summary(self, album_id: int) -> Dict[str, Any]:
+        return {'id': album_id, 'title': f"Album {album_id}", 'type': 'album',
+                'record_type': RECORD_TYPES[album_id % len(RECORD_TYPES)]}
+
+    def search_albums(self, query: str) -> List[Dict[str, Any]]:
+        """The first hit carries the queried text as its title, like a good search would."""
+        artist_id = stable_number(query)
+        albums = []
+        for k, album in enumerate(self.artist_albums(artist_id)[:25]):
+            album = dict(album, artist=self.artist(artist_id))
+            if k == 0:
+                album['title'] = query
+            albums.append(album)
+        return albums
+
+    def playlist_tracks(self, playlist_id: int) -> List[Dict[str, Any]]:
+        rng = random.Random(playlist_id)
+        tracks = []
+        for n in range(self.tracks_per_playlist):
+            artist_id = rng.randint(1000, 1000 + self.tracks_per_playlist // 2)
+            album_id = artist_id * 1000 + rng.randint(1, self.albums_per_artist)
+            tracks.append({
+                'id': playlist_id * 1000 + n,
+                'title': f"Track {n}",
+                'artist': self.artist(artist_id),
+                'album': self.album_summary(album_id)
+            })
+        return tracks
+
+    def track(self, track_id: int) -> Dict[str, Any]:
+        album_id = (track_id // 100) or 1001
+        return {'id': track_id, 'title': f"Track {track_id}", 'album': self.album_summary(album_id),
+                'artist': self.artist(album_id // 1000)}
+
+    # Spotify shapes are derived from the same catalog
+    def spotify_album(self, album: Dict[str, Any], artist_id: int) -> Dict[str, Any]:
+        album_type = 'single' if album.get('record_type') == 'single' else 'album'
+        return {
+            'id': spotify_id(album['id']),
+            'name': album['title'],
+            'album_type': album_type,
+            'release_date': album.get('release_date', ''),
+            'artists': [{'id': spotify_id(artist_id), 'name': f"Artist {artist_id}"}]
+        }
+
+
+class MockAPIServer(ThreadingHTTPServer):
+    """HTTP server holding the catalog, fixture store, latency and quota settings."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], latency: float = 0.0, jitter: float = 0.0,
+                 page_size: int = 25, quota: int = 0, quota_window: float = 5.0,
+                 fixtures_dir: Optional[Path] = None, record: bool = False,
+                 catalog: Optional[SyntheticCatalog] = None):
+        super().__init__(address, MockAPIHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.page_size = page_size
+        self.quota = quota
+        self.quota_window = quota_window
+        self.fixtures_dir = Path(fixtures_dir) if fixtures_dir else None
+        self.record = record
+        self.catalog = catalog or SyntheticCatalog()
+        self.lock = threading.Lock()
+        self.recent = defaultdict(deque)
+        self.stats = defaultdict(int)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def over_quota(self, service: str) -> bool:
+        """Sliding-window request counter per service."""
+        if not self.quota:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            window = self.recent[service]
+            while window and now - window[0] > self.quota_window:
+                window.popleft()
+            if len(window) >= self.quota:
+                return True
+            window.append(now)
+            return False
+
+    def count(self, route: str) -> None:
+        with self.lock:
+            self.stats[route] += 1
+            self.stats['total'] += 1
+
+
+class MockAPIHandler(BaseHTTPRequestHandler):
+    """Routes requests to fixtures or the synthetic catalog."""
+
+    server: MockAPIServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.handle_request()
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length', 0))
+        if length:
+            self.rfile.read(length)
+        self.handle_request()
+
+    def send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def handle_request(self) -> None:
+        parsed = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+
+        if parsed.path == '/_stats':
+            with self.server.lock:
+                stats = dict(self.server.stats)
+            return self.send_json(200, stats)
+        if parsed.path == '/_reset':
+            with self.server.lock:
+                self.server.stats.clear()
+                self.server.recent.clear()
+            return self.send_json(200, {'ok': True})
+
+        match = re.match(r'^/(deezer|spotify-accounts|spotify)(/.*)$', parsed.path)
+        if not match:
+            return self.send_json(404, {'error': {'message': f"Unknown path {parsed.path}"}})
+        service, path = match.groups()
+
+        route = re.sub(r'/(?:\d+|[0-9A-Za-z]{22})(?=/|$)', '/{id}', f"{service}{path}")
+        self.server.count(route)
+
+        delay = self.server.latency + random.uniform(0, self.server.jitter)
+        if delay:
+            time.sleep(delay)
+
+        if service != 'spotify-accounts' and self.server.over_quota(service):
+            if service == 'deezer':
+                # Deezer reports quota errors with HTTP 200 and an error object
+                return self.send_json(200, DEEZER_QUOTA_ERROR)
+            return self.send_json(429, SPOTIFY_QUOTA_ERROR,
+                                  {'Retry-After': str(int(self.server.quota_window))})
+
+        fixture = self.load_fixture(service, path, query)
+        if fixture is not None:
+            return self.send_json(fixture.get('status', 200), self.rebase(fixture['body']))
+
+        try:
+            status, body = self.synthesize(service, path, query)
+        except (ValueError, KeyError) as e:
+            status, body = 400, {'error': {'message': str(e)}}
+        self.send_json(status, body)
+
+    # Fixtures
+
+    def fixture_file(self, service: str, path: str, query: Dict[str, str]) -> Optional[Path]:
+        if not self.server.fixtures_dir:
+            return None
+        key = f"{self.command} {path}?{urllib.parse.urlencode(sorted(query.items()))}"
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return self.server.fixtures_dir / service / f"{digest}.json"
+
+    def load_fixture(self, service: str, path: str, query: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        fixture_file = self.fixture_file(service, path, query)
+        if fixture_file is None:
+            return None
+        if fixture_file.exists():
+            with open(fixture_file, 'r') as f:
+                return json.load(f)
+        if self.server.record:
+            return self.record_fixture(fixture_file, service, path, query)
+        return None
+
+    def record_fixture(self, fixture_file: Path, service: str, path: str,
+                       query: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Fetch the request from the real API and store it for replay."""
+        url = f"{UPSTREAM[service]}{path}"
+        if query:
+            url += '?' + urllib.parse.urlencode(query)
+        headers = {key: self.headers[key] for key in ('Authorization', 'Content-Type') if self.headers.get(key)}
+        request = urllib.request.Request(url, headers=headers, method=self.command)
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                status, body = response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            status, body = e.code, {'error': {'message': str(e)}}
+        except (urllib.error.URLError, json.JSONDecodeError) as e:
+            print(f"Record failed for {url}: {e}", file=sys.stderr)
+            return None
+
+        fixture = {'request': f"{self.command} {path}", 'query': query, 'status': status, 'body': body}
+        fixture_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(fixture_file, 'w') as f:
+            json.dump(fixture, f, indent=2)
+        return fixture
+
+    def rebase(self, body: Any) -> Any:
+        """Point recorded 'next' links at this server instead of the real API."""
+        text = json.dumps(body)
+        for service, upstream in UPSTREAM.items():
+            text = text.replace(upstream, f"{self.server.base_url}/{service}")
+        return json.loads(text)
+
+    # Synthetic responses
+
+    def page(self, items: List[Any], service: str, path: str, query: Dict[str, str]) -> Tuple[List[Any], Optional[str]]:
+        """Slice items like the real API and build the next-page link."""
+        if service == 'deezer':
+            start = int(query.get('index', 0))
+        else:
+            start = int(query.get('offset', 0))
+        limit = min(int(query.get('limit', self.server.page_size)), self.server.page_size)
+        chunk = items[start:start + limit]
+
+        next_url = None
+        if start + limit < len(items):
+            next_query = dict(query, limit=str(limit))
+            next_query['index' if service == 'deezer' else 'offset'] = str(start + limit)
+            next_url = f"{self.server.base_url}/{service}{path}?{urllib.parse.urlencode(next_query)}"
+        return chunk, next_url
+
+    def synthesize(self, service: str, path: str, query: Dict[str, str]) -> Tuple[int, Any]:
+        catalog = self.server.catalog
+        parts = path.strip('/').split('/')
+
+        if service == 'spotify-accounts':
+            if parts == ['api', 'token']:
+                return 200, {'access_token': 'mock-access-token', 'token_type': 'Bearer', 'expires_in': 3600}
+
+        elif service == 'deezer':
+            if parts == ['search', 'album']:
+                items, next_url = self.page(catalog.search_albums(query.get('q', '')), service, path, query)
+                return 200, {'data': items, 'total': len(items), **({'next': next_url} if next_url else {})}
+            if len(parts) == 2 and parts[0] == 'artist':
+                return 200, catalog.artist(int(parts[1]))
+            if len(parts) == 3 and parts[0] == 'artist' and parts[2] == 'albums':
+                albums = catalog.artist_albums(int(parts[1]))
+                items, next_url = self.page(albums, service, path, query)
+                return 200, {'data': items, 'total': len(albums), **({'next': next_url} if next_url else {})}
+            if len(parts) == 2 and parts[0] == 'album':
+                return 200, catalog.album(int(parts[1]))
+            if len(parts) == 2 and parts[0] == 'playlist':
+                return 200, {'id': int(parts[1]), 'title': f"Playlist {parts[1]}",
+                             'nb_tracks': catalog.tracks_per_playlist}
+            if len(parts) == 3 and parts[0] == 'playlist' and parts[2] == 'tracks':
+                tracks = catalog.playlist_tracks(int(parts[1]))
+                items, next_url = self.page(tracks, service, path, query)
+                return 200, {'data': items, 'total': len(tracks), **({'next': next_url} if next_url else {})}
+            if len(parts) == 2 and parts[0] == 'track':
+                return 200, catalog.track(int(parts[1]))
+
+        elif service == 'spotify':
+            if self.command == 'GET' and not self.headers.get('Authorization', '').startswith('Bearer '):
+                return 401, {'error': {'status': 401, 'message': 'No token provided'}}
+            parts = parts[1:] if parts and parts[0] == 'v1' else parts
+            api_path = path
+
+            if parts == ['search']:
+                q = query.get('q', '')
+                albums = [catalog.spotify_album(album, album['artist']['id']) for album in catalog.search_albums(q)]
+                items, next_url = self.page(albums, service, api_path, query)
+                return 200, {'albums': {'items': items, 'next': next_url, 'total': len(albums)}}
+            if len(parts) == 2 and parts[0] == 'playlists':
+                return 200, {'id': parts[1], 'name': f"Playlist {parts[1]}"}
+            if len(parts) == 3 and parts[0] == 'playlists' and parts[2] == 'tracks':
+                tracks = catalog.playlist_tracks(spotify_number(parts[1]))
+                items = [{'track': {
+                    'id': spotify_id(track['id']),
+                    'name': track['title'],
+                    'artists': [{'id': spotify_id(track['artist']['id']), 'name': track['artist']['name']}],
+                    'album': catalog.spotify_album(track['album'], track['artist']['id'])
+                }} for track in tracks]
+                page, next_url = self.page(items, service, api_path, query)
+                return 200, {'items': page, 'next': next_url, 'total': len(items)}
+            if len(parts) == 3 and parts[0] == 'artists' and parts[2] == 'albums':
+                artist_id = spotify_number(parts[1]) % 900000 + 1000
+                albums = [catalog.spotify_album(album, artist_id) for album in catalog.artist_albums(artist_id)]
+                items, next_url = self.page(albums, service, api_path, query)
+                return 200, {'items': items, 'next': next_url, 'total': len(albums)}
+            if len(parts) == 2 and parts[0] == 'albums':
+                album = catalog.album(spotify_number(parts[1]))
+                return 200, catalog.spotify_album(album, album['artist']['id'])
+            if len(parts) == 2 and parts[0] == 'tracks':
+                track = catalog.track(spotify_number(parts[1]) % 90000000 + 100100)
+                return 200, {'id': parts[1], 'name': track['title'],
+                             'album': catalog.spotify_album(track['album'], track['artist']['id'])}
+
+        return 404, {'error': {'message': f"No mock for {service}{path}"}}
+
+
+def start_server(port: int = 0, **options) -> MockAPIServer:
+    """
+    Start the mock server on a background thread.
+
+    Args:
+        port: Port to bind on 127.0.0.1 (0 picks a free one)
+        **options: Passed to MockAPIServer (latency, jitter, page_size, quota, ...)
+
+    Returns:
+        MockAPIServer: The running server; call shutdown() to stop it
+    """
+    server = MockAPIServer(('127.0.0.1', port), **options)
+    thread = threading.Thread(target=server.serve_forever, name="mock-api", daemon=True)
+    thread.start()
+    return server
+
+
+def tool_environment(base_url: str) -> Dict[str, str]:
+    """Environment variables that point the DeemixKit tools at a mock server."""
+    return {
+        'DEEMIXKIT_DEEZER_API': f"{base_url}/deezer",
+        'DEEMIXKIT_SPOTIFY_API': f"{base_url}/spotify",
+        'DEEMIXKIT_SPOTIFY_ACCOUNTS': f"{base_url}/spotify-accounts",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the Deezer and Spotify APIs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                                  # Synthetic catalog on port 8765
+  %(prog)s --latency 80 --jitter 40         # Simulate a slow network
+  %(prog)s --page-size 10 --quota 50        # Small pages, 50 requests per 5s
+  %(prog)s --record                         # Record real responses into fixtures/
+        """
+    )
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+    parser.add_argument('--latency', type=float, default=0, help='Added latency per request in ms')
+    parser.add_argument('--jitter', type=float, default=0, help='Random extra latency per request in ms')
+    parser.add_argument('--page-size', type=int, default=25, help='Max items per page (default: 25)')
+    parser.add_argument('--quota', type=int, default=0, help='Requests per window before quota errors (0: off)')
+    parser.add_argument('--quota-window', type=float, default=5.0, help='Quota window in seconds (default: 5)')
+    parser.add_argument('--albums-per-artist', type=int, default=40, help='Synthetic albums per artist')
+    parser.add_argument('--playlist-tracks', type=int, default=200, help='Synthetic tracks per playlist')
+    parser.add_argument('--fixtures', type=str, default=str(FIXTURES_DIR), help='Recorded fixtures folder')
+    parser.add_argument('--record', action='store_true', help='Fetch and store real responses on fixture misses')
+
+    args = parser.parse_args()
+
+    server = MockAPIServer(
+        ('127.0.0.1', args.port),
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        page_size=args.page_size,
+        quota=args.quota,
+        quota_window=args.quota_window,
+        fixtures_dir=Path(args.fixtures),
+        record=args.record,
+        catalog=SyntheticCatalog(args.albums_per_artist, args.playlist_tracks)
+    )
+
+    print(f"Mock API listening on {server.base_url}", file=sys.stderr)
+    for key, value in tool_environment(server.base_url).items():
+        print(f"export {key}={value}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped", file=sys.stderr)
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
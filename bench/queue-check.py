@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Download Queue Check for DeemixKit
+
+Runs scripts/deemix-queue.py against the stub deezer/deemix packages in
+bench/stub-deemix and checks what the queue is for: albums download in
+parallel up to --jobs, progress is reported per album, an album that
+fails once is retried and succeeds, and one that keeps failing is given
+up on after --retries, saved to failed.txt and reported in the exit code.
+
+Each run gets an isolated HOME, deemix config folder and download ledger.
+
+Usage:
+    python3 bench/queue-check.py
+    python3 bench/queue-check.py --jobs 4 --albums 12
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+STUB_DIR = BENCH_DIR / "stub-deemix"
+QUEUE = ROOT / "scripts" / "deemix-queue.py"
+
+FLAKY_ALBUM = 302127   # Fails on its first attempt only
+BROKEN_ALBUM = 1001    # Fails on every attempt
+
+
+def max_parallel(log_lines: List[str]) -> int:
+    """Most download attempts running at once, from the stub's start/end log."""
+    events = []
+    for line in log_lines:
+        stamp, event, _, _ = line.split()
+        events.append((float(stamp), 0 if event == 'end' else 1))
+    running = peak = 0
+    for _, starts in sorted(events):
+        running += 1 if starts else -1
+        peak = max(peak, running)
+    return peak
+
+
+def run_queue(urls: List[str], jobs: int, retries: int) -> Tuple[subprocess.CompletedProcess, Path, List[str]]:
+    """Run the queue once in an isolated HOME; returns the process, HOME and the stub's log lines."""
+    home = Path(tempfile.mkdtemp(prefix="deemixkit-queue-"))
+    config_folder = home / ".config" / "deemix"
+    config_folder.mkdir(parents=True)
+    (config_folder / ".arl").write_text("stub-arl\n")
+    log_file = home / "stub.log"
+
+    env = dict(os.environ, HOME=str(home),
+               PYTHONPATH=os.pathsep.join(filter(None, [str(STUB_DIR), os.environ.get('PYTHONPATH')])),
+               DEEMIXKIT_LEDGER=str(home / "ledger.db"),
+               DEEMIX_STUB_FAIL=f"{FLAKY_ALBUM}:1,{BROKEN_ALBUM}:99",
+               DEEMIX_STUB_LOG=str(log_file))
+    command = [sys.executable, str(QUEUE), '--config-folder', str(config_folder),
+               '-j', str(jobs), '--retries', str(retries), '--retry-delay', '0.1', '--format', 'jsonl']
+    result = subprocess.run(command, input='\n'.join(urls) + '\n', env=env,
+                            capture_output=True, text=True, timeout=120)
+    log_lines = log_file.read_text().splitlines() if log_file.exists() else []
+    return result, home, log_lines
+
+
+def check(result: subprocess.CompletedProcess, home: Path, log_lines: List[str],
+          urls: List[str], jobs: int, retries: int) -> List[Tuple[str, bool, str]]:
+    """Return (check, passed, detail) for every property of the run."""
+    records = {}
+    for line in result.stdout.splitlines():
+        record = json.loads(line)
+        records[record['url']] = record
+    flaky = f"https://www.deezer.com/album/{FLAKY_ALBUM}"
+    broken = f"https://www.deezer.com/album/{BROKEN_ALBUM}"
+    healthy = [url for url in urls if url not in (flaky, broken)]
+    failed_file = home / ".local" / "log" / "deemix-queue" / "failed.txt"
+    peak = max_parallel(log_lines)
+
+    def record(url: str) -> Dict[str, Any]:
+        return records.get(url, {})
+
+    return [
+        ("one record per album", len(records) == len(urls), f"{len(records)} of {len(urls)}"),
+        ("healthy albums done on the first attempt",
+         all(record(url).get('status') == 'done' and record(url).get('attempts') == 1 for url in healthy),
+         f"{sum(record(url).get('status') == 'done' for url in healthy)} of {len(healthy)} done"),
+        ("parallel downloads", peak == min(jobs, len(urls)), f"{peak} at once with -j {jobs}"),
+        ("progress reported to 100% per album",
+         all(f"{url} 100%" in result.stderr for url in healthy + [flaky]), "stderr progress lines"),
+        ("flaky album retried and done",
+         record(flaky).get('status') == 'done' and record(flaky).get('attempts') == 2,
+         f"status {record(flaky).get('status')}, {record(flaky).get('attempts')} attempts"),
+        ("retry announced", f"{flaky}:" in result.stderr and "retrying in" in result.stderr, "stderr"),
+        ("broken album given up after the retries",
+         record(broken).get('status') == 'failed' and record(broken).get('attempts') == retries + 1
+         and "giving up" in result.stderr,
+         f"status {record(broken).get('status')}, {record(broken).get('attempts')} attempts"),
+        ("broken album saved for a retry run",
+         failed_file.exists() and failed_file.read_text().split() == [broken], failed_file.name),
+        ("exit code 1 when an album failed", result.returncode == 1, f"exit {result.returncode}"),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check deemix-queue's parallelism, progress and retries against a stub deemix"
+    )
+    parser.add_argument('--jobs', '-j', type=int, default=3, help='Albums downloaded in parallel (default: 3)')
+    parser.add_argument('--albums', type=int, default=8, help='Albums in the queue, at least 3 (default: 8)')
+    parser.add_argument('--retries', type=int, default=2, help='Retries per failed album (default: 2)')
+    parser.add_argument('--keep', action='store_true', help='Keep the run HOME for inspection')
+    args = parser.parse_args()
+
+    urls = [f"https://www.deezer.com/album/{FLAKY_ALBUM}", f"https://www.deezer.com/album/{BROKEN_ALBUM}"]
+    urls += [f"https://www.deezer.com/album/{500000 + n}" for n in range(max(args.albums, 3) - 2)]
+
+    result, home, log_lines = run_queue(urls, args.jobs, args.retries)
+    try:
+        checks = check(result, home, log_lines, urls, args.jobs, args.retries)
+    finally:
+        if args.keep:
+            print(f"Run HOME kept at {home}")
+        else:
+            shutil.rmtree(home, ignore_errors=True)
+
+    width = max(len(name) for name, _, _ in checks)
+    for name, passed, detail in checks:
+        print(f"{'ok  ' if passed else 'FAIL'}  {name:<{width}}  {detail}")
+
+    if not all(passed for _, passed, _ in checks):
+        print("\nQueue stderr:\n" + result.stderr[-2000:])
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
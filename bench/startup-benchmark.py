@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Startup-Time Benchmark for DeemixKit
+
+Runs each entry point the way a hotkey does, with no arguments and a
+terminal on stdin, and measures how long it takes to reach its first
+prompt: the module imports plus main() up to the first read from stdin
+(or to its exit, for tools that need arguments). It fails when a script
+goes over its millisecond budget. Hotkey scripts pay this cost on every
+press, so heavy modules (requests, pyperclip, the collection matcher)
+should only load on the code path that needs them, after the prompt.
+
+The time starts when the script starts; interpreter startup (site,
+encodings) is the same for every script and is left out. The slowest
+imports of that stretch come from Python's -X importtime.
+
+Usage:
+    python3 bench/startup-benchmark.py
+    python3 bench/startup-benchmark.py --budget 40 --runs 9
+    python3 bench/startup-benchmark.py --budget 50 --budget deemix-queue=80 --json startup.json
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = [
+    'deezer/deezer-resolver.py',
+    'spotify/spotify-resolver.py',
+    'global/global-resolver.py',
+    'discography/discography-resolver.py',
+    'playlist/playlist-downloader.py',
+    'playlist/rileys-playlist-resolver.py',
+    'scripts/skip-owned.py',
+    'scripts/dedupe-batch.py',
+    'scripts/missing-albums.py',
+    'scripts/download-estimator.py',
+    'scripts/deemix-queue.py',
+    'scripts/prefetch-discography.py',
+]
+
+DEFAULT_BUDGET_MS = 50.0
+MARKER = '--deemixkit-start--'
+PROMPT = '--deemixkit-prompt--'
+
+# Runs a script as __main__ with a stdin that looks like a terminal. The first
+# read from it (input() included) is the prompt: the elapsed time is written
+# after a marker and the process ends there, before anything is typed. The
+# start marker tells the interpreter's own startup imports apart.
+LOADER = f"""
+import os, sys, time, runpy
+
+def prompt(*args, **kwargs):
+    os.write(2, ('{PROMPT} %.3f\\n' % ((time.perf_counter() - started) * 1000)).encode())
+    os._exit(0)
+
+class Terminal:
+    encoding = 'utf-8'
+    closed = False
+    def isatty(self):
+        return True
+    read = readline = readlines = __iter__ = prompt
+
+sys.argv = sys.argv[1:]
+sys.stdin = Terminal()
+sys.stderr.write('{MARKER}\\n'); sys.stderr.flush()
+started = time.perf_counter()
+try:
+    runpy.run_path(sys.argv[0], run_name='__main__')
+except SystemExit:
+    pass
+prompt()
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int]]:
+    """
+    Return (module, cumulative microseconds) for every top-level import between the markers.
+
+    Nested imports are indented under their parent in -X importtime output
+    and are already included in the parent's cumulative time.
+    """
+    lines = stderr.splitlines()
+    if MARKER not in lines:
+        return []
+
+    imports = []
+    for line in lines[lines.index(MARKER) + 1:]:
+        if line.startswith(PROMPT):
+            break
+        if not line.startswith('import time:'):
+            continue
+        parts = line.split('|')
+        if len(parts) != 3:
+            continue
+        name = parts[2]
+        # One space after the bar means top level; nested imports get two more per level
+        if name.startswith('  '):
+            continue
+        try:
+            imports.append((name.strip(), int(parts[1])))
+        except ValueError:
+            continue
+    return imports
+
+
+def measure(script: str, env: Dict[str, str]) -> Tuple[float, List[Tuple[str, int]]]:
+    """Run script once in a fresh interpreter up to its first prompt and return (ms, top-level imports)."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', LOADER, str(ROOT / script)],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=60
+    )
+    prompts = [line for line in result.stderr.splitlines() if line.startswith(PROMPT)]
+    if MARKER not in result.stderr.splitlines() or not prompts:
+        raise RuntimeError(f"{script} failed to start:\n{result.stderr[-500:]}")
+    return float(prompts[0].split()[1]), parse_importtime(result.stderr)
+
+
+def isolated_environment(home: str) -> Dict[str, str]:
+    """Environment with an empty HOME and unreachable APIs, so no run depends on local state or the network."""
+    unreachable = 'http://127.0.0.1:9'
+    env = {key: value for key, value in os.environ.items() if not key.startswith('DEEMIXKIT_')}
+    env.update(HOME=home, DEEMIXKIT_DEEZER_API=f'{unreachable}/deezer',
+               DEEMIXKIT_SPOTIFY_API=f'{unreachable}/spotify',
+               DEEMIXKIT_SPOTIFY_ACCOUNTS=f'{unreachable}/spotify-accounts')
+    return env
+
+
+def parse_budgets(values: List[str]) -> Tuple[float, Dict[str, float]]:
+    """Split --budget values into a default budget and per-script overrides."""
+    default = DEFAULT_BUDGET_MS
+    overrides = {}
+    for value in values or []:
+        if '=' in value:
+            name, ms = value.split('=', 1)
+            overrides[name.strip()] = float(ms)
+        else:
+            default = float(value)
+    return default, overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the time every DeemixKit entry point takes to reach its first prompt against a budget",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Examples:
+  %(prog)s
+  %(prog)s --budget 40
+  %(prog)s --budget 50 --budget deemix-queue=80
+  %(prog)s --json startup.json
+
+Default budget: {DEFAULT_BUDGET_MS:.0f} ms per script
+        """
+    )
+    parser.add_argument('--budget', action='append',
+                        help='Budget in ms for every script, or NAME=MS for one script (repeatable)')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per script; the median is used (default: 5)')
+    parser.add_argument('--top', type=int, default=3, help='Slowest imports to show per script (default: 3)')
+    parser.add_argument('--json', type=str, help='Write results to this file')
+
+    args = parser.parse_args()
+    default_budget, overrides = parse_budgets(args.budget)
+
+    home = tempfile.TemporaryDirectory(prefix="deemixkit-startup-")
+    env = isolated_environment(home.name)
+    results = []
+    for script in ENTRY_POINTS:
+        name = Path(script).stem
+        budget = overrides.get(name, default_budget)
+        try:
+            runs = [measure(script, env) for _ in range(args.runs)]
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            results.append({'script': script, 'budget_ms': budget, 'prompt_ms': None, 'over_budget': True})
+            continue
+
+        total_ms = statistics.median(total for total, _ in runs)
+        # Show the slowest imports from the run closest to the median
+        _, imports = min(runs, key=lambda run: abs(run[0] - total_ms))
+        slowest = sorted(imports, key=lambda item: item[1], reverse=True)[:args.top]
+        results.append({
+            'script': script,
+            'budget_ms': budget,
+            'prompt_ms': round(total_ms, 2),
+            'over_budget': total_ms > budget,
+            'slowest': [{'module': module, 'ms': round(us / 1000, 2)} for module, us in slowest],
+        })
+    home.cleanup()
+
+    print(f"{'Script':<40} {'prompt ms':>10} {'budget':>8}  slowest imports")
+    for result in results:
+        status = 'OVER' if result['over_budget'] else 'ok'
+        prompt_ms = f"{result['prompt_ms']:.1f}" if result['prompt_ms'] is not None else 'error'
+        slowest = ', '.join(f"{item['module']} {item['ms']:.1f}" for item in result.get('slowest', []))
+        print(f"{result['script']:<40} {prompt_ms:>10} {result['budget_ms']:>8.0f}  {status:<5}{slowest}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}", file=sys.stderr)
+
+    over = [result['script'] for result in results if result['over_budget']]
+    if over:
+        print(f"\n{len(over)} script(s) over budget: {', '.join(over)}", file=sys.stderr)
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
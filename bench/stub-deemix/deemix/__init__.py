@@ -0,0 +1,57 @@
+"""
+Stub of the deemix package for exercising deemix-queue offline.
+
+Put this folder first on PYTHONPATH and deemix-queue downloads nothing:
+each album "downloads" its tracks with a short sleep per track, sending
+the same updateQueue progress events as deemix. Environment variables
+script the behaviour:
+
+  DEEMIX_STUB_TRACK_SECONDS  seconds per track (default: 0.05)
+  DEEMIX_STUB_FAIL           album ids that fail, as id:times pairs, e.g.
+                             "302127:1,1001:99" fails album 302127 once
+                             and album 1001 on every attempt
+  DEEMIX_STUB_LOG            file that gets a 'start'/'end' line per
+                             download attempt, for checking parallelism
+
+bench/queue-check.py runs the queue against this stub.
+"""
+
+import os
+import re
+import threading
+from typing import Dict
+
+_lock = threading.Lock()
+_attempts: Dict[str, int] = {}
+
+
+class DownloadObject:
+    """One album download: its tracks, and how many of them failed."""
+
+    def __init__(self, url: str, bitrate: int, listener=None):
+        self.url = url
+        self.bitrate = bitrate
+        self.listener = listener
+        self.id = re.sub(r'.*/', '', url.rstrip('/'))
+        number = int(self.id) if self.id.isdigit() else sum(map(ord, self.id))
+        self.artist = f"Artist {number // 1000}"
+        self.title = f"Album {self.id}"
+        self.size = 4 + number % 5
+        self.failed = 0
+
+        with _lock:
+            _attempts[self.id] = _attempts.get(self.id, 0) + 1
+            self.attempt = _attempts[self.id]
+
+
+def failures_planned(album_id: str) -> int:
+    """How many attempts of album_id DEEMIX_STUB_FAIL says should fail."""
+    for pair in os.environ.get('DEEMIX_STUB_FAIL', '').split(','):
+        failing_id, _, times = pair.strip().partition(':')
+        if failing_id == album_id:
+            return int(times or 1)
+    return 0
+
+
+def generateDownloadObject(dz, url: str, bitrate: int, listener=None) -> DownloadObject:
+    return DownloadObject(url, bitrate, listener)
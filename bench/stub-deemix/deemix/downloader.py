@@ -0,0 +1,40 @@
+"""Stub of deemix.downloader: sleeps through an album's tracks and reports progress."""
+
+import os
+import time
+import threading
+
+from deemix import failures_planned
+
+_log_lock = threading.Lock()
+
+
+def _log(event: str, download_object) -> None:
+    log_file = os.environ.get('DEEMIX_STUB_LOG')
+    if log_file:
+        with _log_lock, open(log_file, 'a') as f:
+            f.write(f"{time.monotonic():.4f} {event} {download_object.id} {download_object.attempt}\n")
+
+
+class Downloader:
+    """Downloads one album object the way deemix's Downloader does, without any network."""
+
+    def __init__(self, dz, download_object, settings, listener=None):
+        self.dz = dz
+        self.download_object = download_object
+        self.settings = settings
+        self.listener = listener
+
+    def start(self) -> None:
+        album = self.download_object
+        track_seconds = float(os.environ.get('DEEMIX_STUB_TRACK_SECONDS', '0.05'))
+        failing = album.attempt <= failures_planned(album.id)
+
+        _log('start', album)
+        for track in range(1, album.size + 1):
+            time.sleep(track_seconds)
+            if failing and track == album.size:
+                album.failed = 1
+            if self.listener:
+                self.listener.send('updateQueue', {'uuid': album.id, 'progress': track * 100 / album.size})
+        _log('end', album)
@@ -0,0 +1,8 @@
+"""Stub of deemix.settings: default settings, as deemix writes them to a fresh config folder."""
+
+from pathlib import Path
+from typing import Dict, Any
+
+
+def load(config_folder: Path) -> Dict[str, Any]:
+    return {'downloadLocation': str(Path(config_folder) / 'downloads'), 'maxBitrate': '3'}
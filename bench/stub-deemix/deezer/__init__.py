@@ -0,0 +1,17 @@
+"""
+Stub of the deezer-py package for exercising deemix-queue offline.
+
+Only the login the queue needs is provided. An ARL of 'expired' fails to
+log in, like a real ARL that Deezer no longer accepts.
+"""
+
+
+class Deezer:
+    """Deezer client that logs in with any ARL but 'expired'."""
+
+    def __init__(self):
+        self.logged_in = False
+
+    def login_via_arl(self, arl: str) -> bool:
+        self.logged_in = bool(arl) and arl != 'expired'
+        return self.logged_in
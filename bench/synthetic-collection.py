@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Synthetic Music Collection Generator for DeemixKit
+
+Builds a realistic Genre/Alpha/Artist/"YYYY - Album" tree with empty audio
+stubs, shaped like the library CollectionMatcher expects. Names include
+edition suffixes, diacritics and near-duplicate artists so matching is
+exercised the way a real library exercises it.
+
+Output is deterministic for a given seed, and the generator also returns
+ground truth plus lookup queries (owned albums written differently and
+albums that are not in the collection) for benchmarks.
+
+Usage:
+    python3 bench/synthetic-collection.py /tmp/collection --albums 10000
+    python3 bench/synthetic-collection.py /tmp/collection --albums 100000 --seed 7 --tracks 1
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import sys
+import random
+import unicodedata
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+GENRES = [
+    'Alternative', 'Blues', 'Classical', 'Electronic', 'Folk', 'Hip-Hop',
+    'Jazz', 'Metal', 'Pop', 'Punk', 'Reggae', 'Rock', 'Soul', 'Soundtrack'
+]
+
+WORDS = [
+    'black', 'silver', 'night', 'morning', 'river', 'stone', 'electric', 'velvet',
+    'ghost', 'fire', 'winter', 'summer', 'broken', 'golden', 'empire', 'machine',
+    'shadow', 'ocean', 'thunder', 'crystal', 'wolf', 'raven', 'iron', 'paper',
+    'neon', 'desert', 'garden', 'mirror', 'storm', 'echo', 'crimson', 'hollow',
+    'lucky', 'savage', 'quiet', 'wild', 'burning', 'frozen', 'distant', 'sacred',
+    'city', 'heart', 'light', 'dream', 'road', 'sky', 'moon', 'sun', 'star', 'blood',
+    'soul', 'angel', 'devil', 'circus', 'harbor', 'tower', 'forest', 'signal', 'motor',
+    'saint', 'atlas', 'orbit', 'canyon', 'prairie', 'glacier', 'lantern', 'cathedral'
+]
+
+ARTIST_SUFFIXES = ['Band', 'Collective', 'Orchestra', 'Brothers', 'Experience', 'Project', 'Trio', 'Society']
+
+EDITION_SUFFIXES = [
+    ' (Remastered)', ' [Deluxe Edition]', ' (2009 Remaster)', ' (Expanded Edition)',
+    ' [Bonus Tracks]', ' (Live)', ' + Demos', ' (Anniversary Edition)', ' (Full Dynamic Range Edition)'
+]
+
+# Letters that commonly carry accents in artist and album names
+DIACRITICS = {'a': 'á', 'e': 'é', 'i': 'í', 'o': 'ö', 'u': 'ü', 'n': 'ñ', 'c': 'ç'}
+
+AUDIO_EXTENSIONS = ['.flac', '.mp3', '.m4a']
+
+
+def add_diacritics(name: str, rng: random.Random) -> str:
+    """Accent one or two letters of name."""
+    letters = [i for i, c in enumerate(name) if c.lower() in DIACRITICS]
+    chars = list(name)
+    for i in rng.sample(letters, min(len(letters), rng.randint(1, 2))):
+        accented = DIACRITICS[chars[i].lower()]
+        chars[i] = accented.upper() if chars[i].isupper() else accented
+    return ''.join(chars)
+
+
+def strip_diacritics(name: str) -> str:
+    """Undo add_diacritics, the way a service without accents would spell the name."""
+    return ''.join(c for c in unicodedata.normalize('NFD', name) if unicodedata.category(c) != 'Mn')
+
+
+def near_duplicate(name: str, rng: random.Random) -> str:
+    """A different artist whose name differs only slightly (plural, article, one letter)."""
+    choice = rng.randint(0, 2)
+    if choice == 0:
+        return name + 's' if not name.endswith('s') else name[:-1]
+    if choice == 1:
+        return name[4:] if name.startswith('The ') else 'The ' + name
+    i = rng.randrange(1, len(name))
+    return name[:i] + rng.choice('aeiourst') + name[i + 1:]
+
+
+def make_title(rng: random.Random, min_words: int = 1, max_words: int = 4) -> str:
+    return ' '.join(rng.choice(WORDS).capitalize() for _ in range(rng.randint(min_words, max_words)))
+
+
+def make_artist_names(count: int, rng: random.Random) -> List[str]:
+    """Unique artist names, about 10% accented and 5% near duplicates of another artist."""
+    names = []
+    seen = set()
+    while len(names) < count:
+        if names and rng.random() < 0.05:
+            name = near_duplicate(rng.choice(names), rng)
+        else:
+            name = make_title(rng, 1, 3)
+            roll = rng.random()
+            if roll < 0.15:
+                name = 'The ' + name
+            elif roll < 0.25:
+                name = f"{name} {rng.choice(ARTIST_SUFFIXES)}"
+            if rng.random() < 0.10:
+                name = add_diacritics(name, rng)
+        # Suffix a counter once the vocabulary runs dry at large sizes
+        if name.lower() in seen:
+            name = f"{name} {len(names)}"
+        seen.add(name.lower())
+        names.append(name)
+    return names
+
+
+def alpha_folder(artist: str) -> str:
+    """Alphabetical folder for an artist, ignoring a leading 'The'."""
+    name = artist[4:] if artist.startswith('The ') else artist
+    first = strip_diacritics(name[:1]).upper()
+    return first if first.isalpha() else '#'
+
+
+def generate_collection(root: Path, albums: int = 10000, seed: int = 1,
+                        tracks_per_album: int = 2) -> List[Dict[str, str]]:
+    """
+    Build a synthetic collection under root.
+
+    Args:
+        root: Folder to create the collection in
+        albums: Number of album folders to create
+        seed: Random seed (same seed, same collection)
+        tracks_per_album: Audio stubs per album folder
+
+    Returns:
+        List[Dict]: One entry per album with 'artist', 'album' (folder title
+        without year), 'title' (album without edition suffix), 'year' and 'genre'
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+
+    artists = make_artist_names(max(1, albums // 5), rng)
+    artist_genre = {artist: rng.choice(GENRES) for artist in artists}
+    truth = []
+
+    for i in range(albums):
+        # Skew album counts so a few artists have big discographies
+        artist = artists[min(int(rng.paretovariate(1.2)) - 1, len(artists) - 1)] if rng.random() < 0.3 \
+            else artists[i % len(artists)]
+        genre = artist_genre[artist]
+        year = str(rng.randint(1960, 2025))
+
+        title = make_title(rng)
+        if rng.random() < 0.08:
+            title = add_diacritics(title, rng)
+        folder_title = title + (rng.choice(EDITION_SUFFIXES) if rng.random() < 0.2 else '')
+
+        album_dir = root / genre / alpha_folder(artist) / artist / f"{year} - {folder_title}"
+        if album_dir.exists():
+            continue
+        album_dir.mkdir(parents=True)
+
+        extension = rng.choice(AUDIO_EXTENSIONS)
+        style = rng.randint(0, 2)
+        for track in range(1, tracks_per_album + 1):
+            track_title = make_title(rng, 1, 3)
+            if style == 0:
+                filename = f"{track:02d} - {artist} - {title} - {track_title}{extension}"
+            elif style == 1:
+                filename = f"{track:02d} - {track_title}{extension}"
+            else:
+                filename = f"{track:02d}. {track_title}{extension}"
+            (album_dir / filename.replace('/', '-')).touch()
+
+        truth.append({'artist': artist, 'album': folder_title, 'title': title, 'year': year, 'genre': genre})
+
+    return truth
+
+
+def make_queries(truth: List[Dict[str, str]], count: int = 1000, hit_ratio: float = 0.5,
+                 seed: int = 1) -> List[Dict[str, str]]:
+    """
+    Build lookup queries in the shape filter_existing_albums takes.
+
+    Hits are owned albums spelled the way a streaming service might spell
+    them (different edition suffix, no accents, other casing). Misses are
+    new albums by owned artists and albums by unknown artists. Each query
+    carries 'expected' so benchmarks can check results.
+    """
+    rng = random.Random(seed + 1)
+    queries = []
+    for _ in range(count):
+        owned = rng.choice(truth)
+        if rng.random() < hit_ratio:
+            artist, album = owned['artist'], owned['title']
+            variant = rng.randint(0, 3)
+            if variant == 1:
+                album += rng.choice(EDITION_SUFFIXES)
+            elif variant == 2:
+                artist, album = strip_diacritics(artist), strip_diacritics(album)
+            elif variant == 3:
+                artist, album = artist.upper(), album.lower()
+            queries.append({'artist': artist, 'album': album, 'year': owned['year'], 'expected': True})
+        elif rng.random() < 0.5:
+            queries.append({'artist': owned['artist'], 'album': f"Unreleased Sessions {rng.randint(1, 99999)}",
+                            'year': '', 'expected': False})
+        else:
+            queries.append({'artist': f"Zz Unknown {rng.randint(1, 99999)}", 'album': make_title(rng),
+                            'year': '', 'expected': False})
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic music collection for matcher benchmarks",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s /tmp/collection
+  %(prog)s /tmp/collection --albums 100000 --tracks 1
+        """
+    )
+    parser.add_argument('root', help='Folder to create the collection in')
+    parser.add_argument('--albums', type=int, default=10000, help='Number of albums (default: 10000)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    parser.add_argument('--tracks', type=int, default=2, help='Audio stubs per album (default: 2)')
+
+    args = parser.parse_args()
+
+    root = Path(args.root).expanduser()
+    if root.exists() and any(root.iterdir()):
+        print(f"Error: {root} is not empty", file=sys.stderr)
+        sys.exit(1)
+
+    truth = generate_collection(root, args.albums, args.seed, args.tracks)
+    artists = len({entry['artist'] for entry in truth})
+    print(f"Created {len(truth)} albums from {artists} artists in {root}")
+
+
+if __name__ == "__main__":
+    main()
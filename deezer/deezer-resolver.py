@@ -10,25 +10,21 @@ Author: cursor
 Created: December 23rd, 2025
 """
 
+import os
 import sys
 import json
 import logging
 import argparse
+import importlib.util
 import urllib.parse
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Optional, Dict, Any
-import requests
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
+from typing import Optional, Dict, Any, TYPE_CHECKING
 
-# Try to import clipboard functionality
-try:
-    import pyperclip
-    CLIPBOARD_AVAILABLE = True
-except ImportError:
-    CLIPBOARD_AVAILABLE = False
-    # Fallback for macOS using pbcopy
-    import subprocess
+# requests and the clipboard helpers are imported where they are used, so
+# --help and the interactive prompt come up without loading them
+if TYPE_CHECKING:
+    import requests
 
 
 # Configuration
@@ -37,28 +33,52 @@ CONFIG_FILE = CONFIG_DIR / "config.json"
 LOG_DIR = Path.home() / ".local" / "log" / "deezer-resolver"
 LOG_FILE = LOG_DIR / "deezer-resolver.log"
 
-# Deezer URLs and API endpoints
+# Deezer URLs and API endpoints (API base can point at a local stand-in server)
+DEEZER_API_BASE = os.environ.get("DEEMIXKIT_DEEZER_API", "https://api.deezer.com")
 DEEZER_ALBUM_BASE = "https://www.deezer.com/album/"
-DEEZER_SEARCH_URL = "https://api.deezer.com/search/album"
+DEEZER_SEARCH_URL = f"{DEEZER_API_BASE}/search/album"
 
 
-def setup_logging(verbose: bool = False) -> None:
-    """Set up logging configuration."""
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
+def load_kit_module(name: str):
+    """Load a shared module from DeemixKit's scripts/ folder (file names contain dashes)."""
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    module_file = Path(__file__).resolve().parent.parent / "scripts" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
 
-    level = logging.DEBUG if verbose else logging.INFO
-    format_str = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
-    handlers = [logging.FileHandler(LOG_FILE)]
-    # Only log to stderr in verbose mode
-    if verbose:
-        handlers.append(logging.StreamHandler(sys.stderr))
+def start_metrics(metrics_file: Optional[str]) -> None:
+    """Collect per-stage timings and HTTP counters, written to metrics_file at exit (see kit-metrics)."""
+    if metrics_file:
+        load_kit_module("kit-metrics").start(metrics_file, tool="deezer-resolver")
+
+
+def start_profile(profile_file: Optional[str]) -> None:
+    """Profile the run; a per-stage breakdown and profiler data go to profile_file at exit (see kit-profile)."""
+    if profile_file:
+        load_kit_module("kit-metrics").start(tool="deezer-resolver")
+        load_kit_module("kit-profile").start(profile_file, tool="deezer-resolver")
+
+
+def start_rate_budget(priority: str = 'interactive') -> None:
+    """Schedule Deezer requests through the shared rate budget at this priority class (see kit-cache)."""
+    load_kit_module("kit-cache").install_rate_budget(os.environ.get("DEEMIXKIT_PRIORITY") or priority)
 
-    logging.basicConfig(
-        level=level,
-        format=format_str,
-        handlers=handlers
-    )
+
+def stage(name: str):
+    """Time a phase of the run for --metrics and --profile; does nothing when both are off."""
+    metrics = sys.modules.get('kit_metrics')
+    return metrics.stage(name) if metrics else nullcontext()
+
+
+def setup_logging(verbose: bool = False) -> None:
+    """Set up queued, size-rotated logging to LOG_FILE (once per process, see kit-logging)."""
+    load_kit_module("kit-logging").setup_logging(LOG_FILE, verbose)
 
 
 def load_config(config_file: Optional[Path] = None) -> Dict[str, Any]:
@@ -70,6 +90,7 @@ def load_config(config_file: Optional[Path] = None) -> Dict[str, Any]:
         "log_level": "INFO",
         "cache_results": True,
         "cache_file": str(CONFIG_DIR / "cache.json"),
+        "use_catalog": True,
         "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
         "deezer_id": None,
         "deezer_secret": None
@@ -87,15 +108,26 @@ def load_config(config_file: Optional[Path] = None) -> Dict[str, Any]:
     return default_config
 
 
+def load_pyperclip():
+    """Import pyperclip on first use. Returns None if it is not installed."""
+    try:
+        import pyperclip
+        return pyperclip
+    except ImportError:
+        return None
+
+
 def save_to_clipboard(text: str) -> bool:
     """Copy text to clipboard. Returns True if successful."""
     try:
-        if CLIPBOARD_AVAILABLE:
+        pyperclip = load_pyperclip()
+        if pyperclip is not None:
             pyperclip.copy(text)
             logging.debug(f"Copied to clipboard using pyperclip: {text[:50]}...")
             return True
         else:
             # macOS fallback using pbcopy
+            import subprocess
             process = subprocess.Popen(
                 ['pbcopy'],
                 stdin=subprocess.PIPE,
@@ -114,8 +146,12 @@ def save_to_clipboard(text: str) -> bool:
         return False
 
 
-def create_session(config: Dict[str, Any]) -> requests.Session:
+def create_session(config: Dict[str, Any]) -> "requests.Session":
     """Create a requests session with retry strategy."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from requests.packages.urllib3.util.retry import Retry
+
     session = requests.Session()
 
     retry_strategy = Retry(
@@ -138,14 +174,26 @@ def create_session(config: Dict[str, Any]) -> requests.Session:
     return session
 
 
-def search_deezer_album(session: requests.Session, query: str, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+def search_deezer_album(session: "requests.Session", query: str, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Search Deezer for an album using the free Web API.
     Deezer doesn't require authentication for basic search.
+    An exact match in the local catalog (kit-catalog) skips the API.
     """
+    import requests
+
     # Build search query
     search_query = query
 
+    # Albums seen in earlier API responses resolve without the network
+    catalog = load_kit_module("kit-catalog").open_catalog() if config.get("use_catalog", True) else None
+    if catalog:
+        with stage('catalog'):
+            album = catalog.find_query(search_query)
+        if album:
+            logging.info(f"Found in local catalog: {search_query}")
+            return album
+
     # Set up search parameters
     params = {
         'q': search_query,
@@ -164,6 +212,7 @@ def search_deezer_album(session: requests.Session, query: str, config: Dict[str,
 
         data = response.json()
         albums = data.get('data', [])
+        load_kit_module("kit-catalog").record(data)
 
         if not albums:
             logging.warning(f"No albums found for query: {search_query}")
@@ -174,23 +223,59 @@ def search_deezer_album(session: requests.Session, query: str, config: Dict[str,
 
     except requests.exceptions.Timeout:
         logging.error("Request timed out while searching Deezer")
-        return None
+        return closest_catalog_match(catalog, search_query)
     except requests.exceptions.RequestException as e:
         logging.error(f"Network error searching Deezer: {e}")
         if hasattr(e, 'response') and e.response is not None:
             logging.error(f"Response status: {e.response.status_code}")
             logging.error(f"Response body: {e.response.text[:200]}")
-        return None
+        return closest_catalog_match(catalog, search_query)
     except (KeyError, json.JSONDecodeError) as e:
         logging.error(f"Error parsing Deezer response: {e}")
         return None
 
 
+def closest_catalog_match(catalog, query: str) -> Optional[Dict[str, Any]]:
+    """
+    The local catalog album a query names, used when Deezer cannot be reached.
+
+    Only a candidate whose artist and title are exactly the query's words
+    (in any order, ignoring case, accents and punctuation) counts. A looser
+    full-text hit may be another album of the same artist, so it is no match.
+    """
+    if not catalog:
+        return None
+    normalize = load_kit_module("kit-catalog").normalize
+    words = sorted(normalize(query).split())
+    for candidate in catalog.search(query, limit=5):
+        name = f"{(candidate.get('artist') or {}).get('name', '')} {candidate.get('title', '')}"
+        if sorted(normalize(name).split()) == words:
+            logging.warning(f"Deezer unreachable, using local catalog match for: {query}")
+            return candidate
+    logging.warning(f"Deezer unreachable and no confident local catalog match for: {query}")
+    return None
+
+
 def build_album_url(album_id: str) -> str:
     """Build Deezer album URL from album ID."""
     return f"{DEEZER_ALBUM_BASE}{album_id}"
 
 
+def query_from_line(line: str) -> str:
+    """Search query for a 'Band - Album' line, a JSONL record with artist and title, or free text."""
+    record = load_kit_module("kit-output").parse_record(line) if line.startswith('{') else None
+    if record and record.get('title'):
+        return f"{record.get('artist') or ''} {record['title']}".strip()
+    if record:
+        line = record.get('input') or ''
+
+    # Try to parse "Band - Album" format
+    if " - " in line:
+        parts = line.split(" - ", 1)
+        return f"{parts[0].strip()} {parts[1].strip()}"
+    return line
+
+
 def parse_input(args: argparse.Namespace) -> str:
     """Parse input from arguments or prompt user."""
     if args.band and args.album:
@@ -207,12 +292,7 @@ def parse_input(args: argparse.Namespace) -> str:
                 logging.error("No input provided")
                 sys.exit(1)
 
-            # Try to parse "Band - Album" format
-            if " - " in user_input:
-                parts = user_input.split(" - ", 1)
-                return f"{parts[0].strip()} {parts[1].strip()}"
-            else:
-                return user_input
+            return query_from_line(user_input)
         else:
             # Read from stdin (for piping)
             user_input = sys.stdin.read().strip()
@@ -222,6 +302,40 @@ def parse_input(args: argparse.Namespace) -> str:
             return user_input
 
 
+def resolve_lines(lines, session: "requests.Session", config: Dict[str, Any], prefetch: bool = False) -> int:
+    """
+    Resolve each line and write one JSONL record per line (see kit-output).
+
+    Returns:
+        int: Exit code, 1 when any album was not found
+    """
+    output = load_kit_module("kit-output")
+    failed = 0
+    artist_ids = []
+    for line in lines:
+        # A record from an earlier tool keeps its original input
+        result = output.Result((output.parse_record(line) or {}).get('input') or line)
+        with stage('search'):
+            album = search_deezer_album(session, query_from_line(line), config)
+        if not album or not album.get('id'):
+            logging.error(f"Album not found: {line}")
+            result.emit(error="Album not found on Deezer")
+            failed += 1
+            continue
+
+        album_url = build_album_url(album['id'])
+        artist = album.get('artist', {})
+        result.emit(url=album_url, id=album['id'], artist=artist.get('name'), title=album.get('title'))
+
+        if artist.get('id'):
+            artist_ids.append(artist['id'])
+
+    # One background process for the whole batch, not one per album
+    if prefetch and artist_ids:
+        load_kit_module("prefetch-discography").start_discography_prefetch(artist_ids)
+    return 1 if failed else 0
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -233,6 +347,7 @@ Examples:
   %(prog)s --query "Metallica Master of Puppets"
   echo "Metallica - Master of Puppets" | %(prog)s
   %(prog)s  # Interactive mode
+  %(prog)s --format jsonl < albums.txt  # One JSON record per line of albums.txt
         """
     )
 
@@ -258,6 +373,30 @@ Examples:
         action='store_true',
         help='Print URL instead of copying to clipboard'
     )
+    parser.add_argument(
+        '--format',
+        choices=['text', 'jsonl'],
+        default='text',
+        help='Output format: text, or jsonl for one JSON record per album on stdout (piped stdin: one album per line)'
+    )
+    parser.add_argument(
+        '--prefetch',
+        action='store_true',
+        default=bool(os.environ.get('DEEMIXKIT_PREFETCH')),
+        help="Fetch the artist's discography into the local catalog in the background, for a later discography-resolver run"
+    )
+    parser.add_argument(
+        '--metrics',
+        metavar='FILE',
+        default=os.environ.get('DEEMIXKIT_METRICS'),
+        help='Write per-stage timings and HTTP metrics to FILE at exit (.prom: Prometheus textfile, else JSON)'
+    )
+    parser.add_argument(
+        '--profile',
+        metavar='FILE',
+        default=os.environ.get('DEEMIXKIT_PROFILE'),
+        help='Profile the run and write a per-stage time breakdown to FILE (plus .prof and .folded profiler data)'
+    )
     parser.add_argument(
         '--config',
         type=str,
@@ -272,6 +411,11 @@ Examples:
 
     # Setup logging
     setup_logging(args.verbose)
+    start_metrics(args.metrics)
+    start_profile(args.profile)
+    start_rate_budget()
+    if args.format == 'jsonl':
+        load_kit_module("kit-output").start()
     logger = logging.getLogger(__name__)
 
     logger.info("=" * 60)
@@ -284,6 +428,14 @@ Examples:
     print("=" * 44)
 
     try:
+        if args.format == 'jsonl':
+            # A piped batch is resolved line by line in this one process
+            if (args.band and args.album) or args.query or sys.stdin.isatty():
+                lines = [parse_input(args)]
+            else:
+                lines = load_kit_module("kit-output").input_lines(sys.stdin)
+            sys.exit(resolve_lines(lines, create_session(config), config, args.prefetch))
+
         # Parse input
         query = parse_input(args)
         logger.info(f"Search query: {query}")
@@ -293,7 +445,8 @@ Examples:
 
         # Search Deezer
         print("Searching Deezer API...")
-        album = search_deezer_album(session, query, config)
+        with stage('search'):
+            album = search_deezer_album(session, query, config)
 
         if not album:
             logger.error("Album not found")
@@ -317,14 +470,23 @@ Examples:
         logger.info(f"Found album: {artist_name} - {album_name}")
         logger.info(f"Album URL: {album_url}")
 
+        artist_id = album.get('artist', {}).get('id')
+        if args.prefetch and artist_id:
+            if load_kit_module("prefetch-discography").start_discography_prefetch([artist_id]):
+                logger.info(f"Prefetching discography of artist {artist_id} in the background")
+
         # Copy to clipboard or print
         if args.no_clipboard:
             print(f"\n{album_url}")
         else:
             print("Copying URL to clipboard...")
-            if save_to_clipboard(album_url):
+            with stage('clipboard'):
+                copied = save_to_clipboard(album_url)
+            if copied:
                 print(f"\n{album_url}")
                 logger.info("Successfully copied URL to clipboard")
+                # Playlist and discography runs skip it until it is downloaded (see kit-ledger)
+                load_kit_module("kit-ledger").open_ledger().mark([album_url], 'queued', source='deezer-resolver')
             else:
                 print(f"Failed to copy to clipboard")
                 print(f"\n{album_url}")
@@ -10,8 +10,8 @@ ALBUM="$2"
 # Get the directory where this script is located
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
-# Call Deezer resolver and get URL
-URL=$(python3 "$SCRIPT_DIR/deezer-resolver.py" --band "$ARTIST" --album "$ALBUM" 2>&1)
+# Call Deezer resolver and get its JSON record (no clipboard)
+RECORD=$(python3 "$SCRIPT_DIR/deezer-resolver.py" --band "$ARTIST" --album "$ALBUM" --format jsonl)
 
 # Check if resolver succeeded
 if [ $? -ne 0 ]; then
@@ -19,8 +19,8 @@ if [ $? -ne 0 ]; then
   exit 1
 fi
 
-# Extract URL from output
-ALBUM_URL=$(echo "$URL" | grep -E 'https://(www\.)?deezer\.com/album/[0-9]+' | head -1)
+# Extract URL from the record
+ALBUM_URL=$(echo "$RECORD" | python3 "$SCRIPT_DIR/../scripts/kit-output.py")
 
 if [ -z "$ALBUM_URL" ]; then
   echo "Error: No URL found"
@@ -10,53 +10,76 @@ Version: 1.0.0
 Created: January 27th, 2026
 """
 
+import os
 import sys
 import json
 import logging
 import argparse
-import subprocess
 import time
+import importlib.util
+from contextlib import nullcontext, redirect_stdout
 from pathlib import Path
-from typing import Optional, Dict, Any, List
-import requests
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
-
-# Try to import clipboard functionality
-try:
-    import pyperclip
-    CLIPBOARD_AVAILABLE = True
-except ImportError:
-    CLIPBOARD_AVAILABLE = False
+from typing import Optional, Dict, Any, List, Set, Tuple, TYPE_CHECKING
+
+# requests is imported inside the functions that call the API, so --help
+# comes up without loading it
+if TYPE_CHECKING:
+    import requests
 
 # Configuration
 CONFIG_DIR = Path.home() / ".config" / "discography-resolver"
 CONFIG_FILE = CONFIG_DIR / "config.json"
 LOG_DIR = Path.home() / ".local" / "log" / "discography-resolver"
 LOG_FILE = LOG_DIR / "discography-resolver.log"
+WATCH_STATE_FILE = CONFIG_DIR / "watch-state.json"
 
-# Deezer API endpoints
-DEEZER_SEARCH_ALBUM_URL = "https://api.deezer.com/search/album"
-DEEZER_ARTIST_ALBUMS_URL = "https://api.deezer.com/artist/{artist_id}/albums"
+# Deezer API endpoints (API base can point at a local stand-in server)
+DEEZER_API_BASE = os.environ.get("DEEMIXKIT_DEEZER_API", "https://api.deezer.com")
+DEEZER_SEARCH_ALBUM_URL = f"{DEEZER_API_BASE}/search/album"
+DEEZER_ARTIST_ALBUMS_URL = DEEZER_API_BASE + "/artist/{artist_id}/albums"
 DEEZER_ALBUM_BASE = "https://www.deezer.com/album/"
 
 
-def setup_logging(verbose: bool = False) -> None:
-    """Set up logging configuration."""
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
+def load_kit_module(name: str):
+    """Load a shared module from DeemixKit's scripts/ folder (file names contain dashes)."""
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    module_file = Path(__file__).resolve().parent.parent / "scripts" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
 
-    level = logging.DEBUG if verbose else logging.INFO
-    format_str = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
-    handlers = [logging.FileHandler(LOG_FILE)]
-    if verbose:
-        handlers.append(logging.StreamHandler(sys.stderr))
+def start_metrics(metrics_file: Optional[str]) -> None:
+    """Collect per-stage timings and HTTP counters, written to metrics_file at exit (see kit-metrics)."""
+    if metrics_file:
+        load_kit_module("kit-metrics").start(metrics_file, tool="discography-resolver")
 
-    logging.basicConfig(
-        level=level,
-        format=format_str,
-        handlers=handlers
-    )
+
+def start_profile(profile_file: Optional[str]) -> None:
+    """Profile the run; a per-stage breakdown and profiler data go to profile_file at exit (see kit-profile)."""
+    if profile_file:
+        load_kit_module("kit-metrics").start(tool="discography-resolver")
+        load_kit_module("kit-profile").start(profile_file, tool="discography-resolver")
+
+
+def start_rate_budget(priority: str = 'batch') -> None:
+    """Schedule Deezer requests through the shared rate budget at this priority class (see kit-cache)."""
+    load_kit_module("kit-cache").install_rate_budget(os.environ.get("DEEMIXKIT_PRIORITY") or priority)
+
+
+def stage(name: str):
+    """Time a phase of the run for --metrics and --profile; does nothing when both are off."""
+    metrics = sys.modules.get('kit_metrics')
+    return metrics.stage(name) if metrics else nullcontext()
+
+
+def setup_logging(verbose: bool = False) -> None:
+    """Set up queued, size-rotated logging to LOG_FILE (once per process, see kit-logging)."""
+    load_kit_module("kit-logging").setup_logging(LOG_FILE, verbose)
 
 
 def load_config(config_file: Optional[Path] = None) -> Dict[str, Any]:
@@ -66,7 +89,11 @@ def load_config(config_file: Optional[Path] = None) -> Dict[str, Any]:
         "max_retries": 3,
         "retry_delay": 1,
         "log_level": "INFO",
-        "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+        "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+        "watch_state_file": str(WATCH_STATE_FILE),
+        "watch_page_size": 25,
+        "availability_workers": 8,
+        "use_catalog": True
     }
 
     config_path = config_file if config_file else CONFIG_FILE
@@ -81,8 +108,12 @@ def load_config(config_file: Optional[Path] = None) -> Dict[str, Any]:
     return default_config
 
 
-def create_session(config: Dict[str, Any]) -> requests.Session:
+def create_session(config: Dict[str, Any]) -> "requests.Session":
     """Create a requests session with retry strategy."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from requests.packages.urllib3.util.retry import Retry
+
     session = requests.Session()
 
     retry_strategy = Retry(
@@ -105,9 +136,19 @@ def create_session(config: Dict[str, Any]) -> requests.Session:
     return session
 
 
-def search_album(session: requests.Session, band: str, album: str, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Search for a specific album to find the artist."""
+def search_album(session: "requests.Session", band: str, album: str, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Search for a specific album to find the artist (an exact local catalog match skips the API)."""
+    import requests
+
     query = f"{band} {album}"
+    catalog = load_kit_module("kit-catalog").open_catalog() if config.get("use_catalog", True) else None
+    if catalog:
+        with stage('catalog'):
+            found = catalog.find_album(band, album)
+        if found:
+            logging.info(f"Found in local catalog: {query}")
+            return found
+
     try:
         logging.info(f"Searching for album: {query}")
         response = session.get(
@@ -118,6 +159,7 @@ def search_album(session: requests.Session, band: str, album: str, config: Dict[
         response.raise_for_status()
         data = response.json()
         albums = data.get('data', [])
+        load_kit_module("kit-catalog").record(data)
 
         if not albums:
             logging.warning(f"No album found for: {query}")
@@ -127,17 +169,48 @@ def search_album(session: requests.Session, band: str, album: str, config: Dict[
 
     except requests.exceptions.Timeout:
         logging.error("Request timed out while searching Deezer")
-        return None
+        return closest_catalog_match(catalog, query)
     except requests.exceptions.RequestException as e:
         logging.error(f"Network error searching Deezer: {e}")
-        return None
+        return closest_catalog_match(catalog, query)
     except (KeyError, json.JSONDecodeError) as e:
         logging.error(f"Error parsing Deezer response: {e}")
         return None
 
 
-def get_artist_discography(session: requests.Session, artist_id: int, config: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Get all albums for an artist."""
+def closest_catalog_match(catalog, query: str) -> Optional[Dict[str, Any]]:
+    """
+    The local catalog album a query names, used when Deezer cannot be reached.
+
+    Only a candidate whose artist and title are exactly the query's words
+    (in any order, ignoring case, accents and punctuation) counts. A looser
+    full-text hit may be another album of the same artist, so it is no match.
+    """
+    if not catalog:
+        return None
+    normalize = load_kit_module("kit-catalog").normalize
+    words = sorted(normalize(query).split())
+    for candidate in catalog.search(query, limit=5):
+        name = f"{(candidate.get('artist') or {}).get('name', '')} {candidate.get('title', '')}"
+        if sorted(normalize(name).split()) == words:
+            logging.warning(f"Deezer unreachable, using local catalog match for: {query}")
+            return candidate
+    logging.warning(f"Deezer unreachable and no confident local catalog match for: {query}")
+    return None
+
+
+def get_artist_discography(session: "requests.Session", artist_id: int, config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Get all albums for an artist (from the local catalog when fetched or prefetched within a day)."""
+    import requests
+
+    catalog = load_kit_module("kit-catalog").open_catalog() if config.get("use_catalog", True) else None
+    if catalog:
+        with stage('catalog'):
+            cached = catalog.artist_albums(artist_id)
+        if cached is not None:
+            logging.info(f"Found {len(cached)} albums in discography (local catalog)")
+            return cached
+
     albums = []
     url = DEEZER_ARTIST_ALBUMS_URL.format(artist_id=artist_id)
 
@@ -147,6 +220,7 @@ def get_artist_discography(session: requests.Session, artist_id: int, config: Di
             response = session.get(url, params={'limit': 100}, timeout=config.get("timeout", 10))
             response.raise_for_status()
             data = response.json()
+            load_kit_module("kit-catalog").record(data, {'id': artist_id})
 
             albums.extend(data.get('data', []))
             url = data.get('next')
@@ -155,6 +229,8 @@ def get_artist_discography(session: requests.Session, artist_id: int, config: Di
                 time.sleep(0.3)
 
         logging.info(f"Found {len(albums)} albums in discography")
+        if catalog:
+            catalog.record_discography(artist_id, albums)
         return albums
 
     except requests.exceptions.RequestException as e:
@@ -179,6 +255,186 @@ def filter_albums(albums: List[Dict[str, Any]], include_singles: bool = False) -
     return filtered
 
 
+def load_watch_state(state_file: Path) -> Dict[str, Any]:
+    """Load watch state (artist ids per watchlist entry and seen album ids per artist)."""
+    state = {"entries": {}, "artists": {}}
+    if state_file.exists():
+        try:
+            with open(state_file, 'r') as f:
+                state.update(json.load(f))
+        except (json.JSONDecodeError, IOError) as e:
+            logging.warning(f"Error loading watch state: {e}. Starting fresh.")
+    return state
+
+
+def save_watch_state(state_file: Path, state: Dict[str, Any]) -> None:
+    """Write watch state atomically so an interrupted run never corrupts it."""
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = state_file.with_suffix('.tmp')
+    with open(tmp_file, 'w') as f:
+        json.dump(state, f, indent=2)
+    tmp_file.replace(state_file)
+
+
+def read_watchlist(watchlist_file: Path) -> List[Tuple[str, str]]:
+    """Read 'Band - Album' lines from a watchlist file, skipping comments and blanks."""
+    entries = []
+    with open(watchlist_file, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if " - " not in line:
+                logging.warning(f"Skipping watchlist line (expected 'Band - Album'): {line}")
+                continue
+            band, album = line.split(" - ", 1)
+            entries.append((band.strip(), album.strip()))
+    return entries
+
+
+def get_new_releases(session: "requests.Session", artist_id: int, seen_ids: Set[int],
+                     config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Get albums released since the last watch run.
+
+    Deezer lists an artist's albums newest first, so paging stops at the
+    first already-seen album id. A typical run costs a single request.
+    """
+    import requests
+
+    new_albums = []
+    url = DEEZER_ARTIST_ALBUMS_URL.format(artist_id=artist_id)
+    params = {'limit': config.get("watch_page_size", 25)}
+
+    try:
+        while url:
+            logging.debug(f"Fetching new releases from: {url}")
+            response = session.get(url, params=params, timeout=config.get("timeout", 10))
+            response.raise_for_status()
+            data = response.json()
+            load_kit_module("kit-catalog").record(data, {'id': artist_id})
+
+            for alb in data.get('data', []):
+                if alb.get('id') in seen_ids:
+                    return new_albums
+                new_albums.append(alb)
+
+            url = data.get('next')
+            params = None  # 'next' already carries the paging parameters
+
+            if url:
+                time.sleep(0.3)
+
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Error fetching new releases: {e}")
+
+    return new_albums
+
+
+def watch_artists(session: "requests.Session", entries: List[Tuple[str, str]], config: Dict[str, Any],
+                  include_singles: bool = False, emit_initial: bool = False) -> List[Dict[str, Any]]:
+    """
+    Check every watchlist entry for new releases and update the watch state.
+
+    The first time an artist is seen its full discography is recorded as the
+    baseline (and only emitted with emit_initial). Artist ids are remembered
+    per entry, so later runs skip the album search entirely.
+    """
+    state_file = Path(config.get("watch_state_file", WATCH_STATE_FILE)).expanduser()
+    state = load_watch_state(state_file)
+    releases = []
+
+    for band, album in entries:
+        entry_key = f"{band} - {album}".lower()
+        artist_id = state["entries"].get(entry_key)
+        artist_name = band
+
+        if artist_id is None:
+            found_album = search_album(session, band, album, config)
+            artist = found_album.get('artist') if found_album else None
+            if not artist or not artist.get('id'):
+                print(f"Artist not found: {band} - {album}", file=sys.stderr)
+                continue
+            artist_id = artist['id']
+            artist_name = artist.get('name', band)
+            state["entries"][entry_key] = artist_id
+
+        artist_state = state["artists"].setdefault(str(artist_id), {"name": artist_name, "seen": []})
+        seen_ids = set(artist_state["seen"])
+
+        if not seen_ids:
+            fetched = get_artist_discography(session, artist_id, config)
+            new_albums = fetched if emit_initial else []
+            print(f"{artist_state['name']}: baseline of {len(fetched)} albums recorded", file=sys.stderr)
+        else:
+            fetched = get_new_releases(session, artist_id, seen_ids, config)
+            new_albums = fetched
+            print(f"{artist_state['name']}: {len(new_albums)} new release(s)", file=sys.stderr)
+
+        artist_state["seen"].extend(alb['id'] for alb in fetched if alb.get('id') not in seen_ids)
+        for alb in new_albums:
+            # artist/{id}/albums entries carry no artist; add it like a full album object
+            alb.setdefault('artist', {'id': artist_id, 'name': artist_state['name']})
+        releases.extend(filter_albums(new_albums, include_singles=include_singles))
+
+        # Persist after every artist so an interrupted sweep keeps its progress
+        save_watch_state(state_file, state)
+
+    logging.info(f"Watch run found {len(releases)} new releases across {len(entries)} artists")
+    return releases
+
+
+def drop_owned_albums(albums: List[Dict[str, Any]], artist_name: str = '') -> List[Dict[str, Any]]:
+    """Drop albums the CollectionMatcher finds in the local collection (uses its persisted index)."""
+    matcher_module = load_kit_module("rileys-collection-matcher")
+    # Matcher status messages must not end up in the URL list on stdout
+    with redirect_stdout(sys.stderr):
+        matcher = matcher_module.load_indexed_matcher()
+
+    records = [{
+        'artist': alb.get('artist', {}).get('name', artist_name),
+        'album': alb.get('title', ''),
+        'year': alb.get('release_date', '')[:4],
+        'deezer': alb
+    } for alb in albums]
+    new_albums, existing_albums = matcher.filter_existing_albums(records)
+    logging.info(f"Skipping {len(existing_albums)} albums already in collection")
+    return [record['deezer'] for record in new_albums]
+
+
+def drop_unavailable_albums(albums: List[Dict[str, Any]], config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Drop albums Deezer marks unavailable or unreadable (details fetched concurrently, cached)."""
+    deezer_api = load_kit_module("deezer-api")
+    album_ids = [str(alb.get('id')) for alb in albums]
+    available_ids = set(deezer_api.filter_available_albums(
+        album_ids, config, max_workers=config.get("availability_workers", 8)))
+    return [alb for alb in albums if str(alb.get('id')) in available_ids]
+
+
+def drop_queued_albums(albums: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop albums the download ledger has as queued, downloading or failed (not on disk yet)."""
+    _, in_hand = load_kit_module("kit-ledger").open_ledger().filter_new(
+        [build_album_url(alb.get('id')) for alb in albums])
+    logging.info(f"Skipping {len(in_hand)} albums already in the download ledger")
+    return [alb for alb in albums if build_album_url(alb.get('id')) not in in_hand]
+
+
+def emit_albums(albums: List[Dict[str, Any]], result=None) -> None:
+    """
+    Print album URLs to stdout (one per line).
+
+    With a kit-output Result (--format jsonl), one JSON record per album is written instead.
+    The download ledger is left to whatever hands the URLs to Deemix.
+    """
+    urls = [build_album_url(alb.get('id')) for alb in albums]
+    for url, alb in zip(urls, albums):
+        if result:
+            result.emit(url=url, id=alb.get('id'), artist=alb.get('artist', {}).get('name'),
+                        title=alb.get('title'), record_type=alb.get('record_type'))
+        else:
+            print(url)
+
+
 def build_album_url(album_id: int) -> str:
     """Build Deezer album URL."""
     return f"{DEEZER_ALBUM_BASE}{album_id}"
@@ -226,6 +482,8 @@ Examples:
   %(prog)s -b "America" -a "Ventura Highway"
   echo "The Beatles - Abbey Road" | %(prog)s
   %(prog)s  # Interactive mode
+  %(prog)s --watch watchlist.txt  # Only new releases since the last run
+  %(prog)s -b "Radiohead" -a "OK Computer" --format jsonl  # One JSON record per album
         """
     )
 
@@ -242,11 +500,54 @@ Examples:
         action='store_true',
         help='Include singles in results (default: only albums and EPs)'
     )
+    parser.add_argument(
+        '--skip-owned',
+        action='store_true',
+        help='Skip albums already in your collection (uses the collection matcher index)'
+    )
+    parser.add_argument(
+        '--check-availability',
+        action='store_true',
+        help='Drop albums that are unavailable or unreadable in your region before output'
+    )
+    parser.add_argument(
+        '--requeue',
+        action='store_true',
+        help='Include albums the download ledger has as queued, downloading or failed'
+    )
+    parser.add_argument(
+        '--watch',
+        metavar='FILE',
+        help="Watch mode: check every 'Band - Album' line in FILE and output only new releases"
+    )
+    parser.add_argument(
+        '--emit-initial',
+        action='store_true',
+        help='In watch mode, also output the full catalog of newly added artists'
+    )
+    parser.add_argument(
+        '--format',
+        choices=['urls', 'jsonl'],
+        default='urls',
+        help='Output format: album URLs (default) or one JSON record per album'
+    )
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
         help='Enable verbose logging'
     )
+    parser.add_argument(
+        '--metrics',
+        metavar='FILE',
+        default=os.environ.get('DEEMIXKIT_METRICS'),
+        help='Write per-stage timings and HTTP metrics to FILE at exit (.prom: Prometheus textfile, else JSON)'
+    )
+    parser.add_argument(
+        '--profile',
+        metavar='FILE',
+        default=os.environ.get('DEEMIXKIT_PROFILE'),
+        help='Profile the run and write a per-stage time breakdown to FILE (plus .prof and .folded profiler data)'
+    )
     parser.add_argument(
         '--config',
         type=str,
@@ -259,20 +560,51 @@ Examples:
     config = load_config(config_file_path)
 
     setup_logging(args.verbose)
+    start_metrics(args.metrics)
+    start_profile(args.profile)
+    start_rate_budget()
+    output = None
+    if args.format == 'jsonl':
+        output = load_kit_module("kit-output")
+        output.start()
     logger = logging.getLogger(__name__)
 
     logger.info("=" * 60)
     logger.info("Discography Resolver v1.0.0")
     logger.info("=" * 60)
 
-    session = create_session(config)
-
     try:
+        if args.watch:
+            result = output.Result(args.watch) if output else None
+            entries = read_watchlist(Path(args.watch))
+            session = create_session(config)
+            print(f"Watching {len(entries)} artists for new releases...", file=sys.stderr)
+            with stage('watch'):
+                releases = watch_artists(session, entries, config,
+                                         include_singles=args.include_singles,
+                                         emit_initial=args.emit_initial)
+            if args.skip_owned and releases:
+                with stage('skip_owned'):
+                    releases = drop_owned_albums(releases)
+            if args.check_availability and releases:
+                with stage('availability'):
+                    releases = drop_unavailable_albums(releases, config)
+            if not args.requeue and releases:
+                with stage('ledger'):
+                    releases = drop_queued_albums(releases)
+            print(f"Found {len(releases)} new releases", file=sys.stderr)
+            emit_albums(releases, result)
+            sys.exit(0)
+
+        # The session imports requests, so it is only created once the prompt has been answered
         band, album = parse_input(args)
         logger.info(f"Search: {band} - {album}")
+        result = output.Result(f"{band} - {album}") if output else None
+        session = create_session(config)
 
         print(f"Searching for: {band} - {album}", file=sys.stderr)
-        found_album = search_album(session, band, album, config)
+        with stage('search'):
+            found_album = search_album(session, band, album, config)
 
         if not found_album:
             print(f"Album not found: {band} - {album}", file=sys.stderr)
@@ -290,7 +622,8 @@ Examples:
         logger.info(f"Found artist: {artist_name} (ID: {artist_id})")
 
         print("Fetching discography...", file=sys.stderr)
-        albums = get_artist_discography(session, artist_id, config)
+        with stage('discography'):
+            albums = get_artist_discography(session, artist_id, config)
 
         if not albums:
             print("No albums found in discography", file=sys.stderr)
@@ -313,6 +646,29 @@ Examples:
                 seen_titles.add(title)
                 unique_albums.append(alb)
 
+        if args.skip_owned:
+            with stage('skip_owned'):
+                new_albums = drop_owned_albums(unique_albums, artist_name)
+            print(f"Skipped {len(unique_albums) - len(new_albums)} albums already in collection", file=sys.stderr)
+            unique_albums = new_albums
+
+        if args.check_availability:
+            print("Checking album availability...", file=sys.stderr)
+            with stage('availability'):
+                available_albums = drop_unavailable_albums(unique_albums, config)
+            dropped = len(unique_albums) - len(available_albums)
+            if dropped:
+                print(f"Dropped {dropped} unavailable albums", file=sys.stderr)
+            unique_albums = available_albums
+
+        if not args.requeue:
+            with stage('ledger'):
+                new_albums = drop_queued_albums(unique_albums)
+            if len(new_albums) < len(unique_albums):
+                print(f"Skipped {len(unique_albums) - len(new_albums)} albums already queued, downloading or failed",
+                      file=sys.stderr)
+            unique_albums = new_albums
+
         if args.include_singles:
             print(f"Found {len(unique_albums)} unique albums (Albums + EPs + Singles)", file=sys.stderr)
         else:
@@ -321,8 +677,9 @@ Examples:
 
         # Output URLs to stdout (one per line)
         for alb in unique_albums:
-            url = build_album_url(alb.get('id'))
-            print(url)
+            # artist/{id}/albums entries carry no artist; add it like a full album object
+            alb.setdefault('artist', {'id': artist_id, 'name': artist_name})
+        emit_albums(unique_albums, result)
 
         sys.exit(0)
 
@@ -8,19 +8,18 @@ ALBUM="$2"
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 RESOLVER="$SCRIPT_DIR/discography-resolver.py"
 
-# Call discography resolver (show stderr to console, capture stdout to variable)
-URLS=$(python3 "$RESOLVER" --band "$ARTIST" --album "$ALBUM" 2>&1)
+# Call discography resolver (show stderr to console, capture one JSON record per album)
+RECORDS=$(python3 "$RESOLVER" --band "$ARTIST" --album "$ALBUM" --format jsonl)
 RESOLVER_EXIT=$?
 
 # Check if resolver succeeded
 if [ $RESOLVER_EXIT -ne 0 ]; then
   echo "Error: Failed to resolve discography" >&2
-  echo "$URLS" >&2
   exit 1
 fi
 
-# Extract only URLs (stderr messages start with non-URL text)
-URLS_ONLY=$(echo "$URLS" | grep '^https://www\.deezer\.com/album/[0-9]')
+# Extract the album URLs from the records
+URLS_ONLY=$(echo "$RECORDS" | python3 "$SCRIPT_DIR/../scripts/kit-output.py")
 
 # Count URLs
 if [ -z "$URLS_ONLY" ]; then
@@ -34,6 +33,7 @@ echo "Found $URL_COUNT albums. Copying to clipboard..."
 
 # Copy all URLs at once (each on its own line)
 echo "$URLS_ONLY" | pbcopy
+echo "$URLS_ONLY" | python3 "$SCRIPT_DIR/../scripts/kit-ledger.py" queued --source discography-to-deemix
 
 echo "All $URL_COUNT album URLs copied to clipboard!"
 echo "Now paste into Deemix to download all albums."
@@ -51,11 +51,12 @@ if [[ "$URL" =~ (spotify\.com/artist/|deezer\.com/artist/) ]]; then
     echo -e "${YELLOW}Artist URL detected - fetching all albums...${NC}"
     echo ""
 
-    # Call Python resolver with --artist flag to get all albums
-    RESULT=$(python3 "$SCRIPT_DIR/global-resolver.py" "$URL" --artist --no-clipboard 2>&1)
+    # Call Python resolver with --artist flag to get all albums, one JSON record each
+    RESULT=$(python3 "$SCRIPT_DIR/global-resolver.py" "$URL" --artist --format jsonl)
+    RESOLVER_EXIT=$?
 
-    # Extract all album URLs from output
-    ALBUM_URLS=$(echo "$RESULT" | grep -E 'https://(www\.)?deezer\.com/album/[0-9]+|https://open\.spotify\.com/album/[a-zA-Z0-9]+')
+    # Extract all album URLs from the records
+    ALBUM_URLS=$(echo "$RESULT" | python3 "$SCRIPT_DIR/../scripts/kit-output.py")
 
     if [ -n "$ALBUM_URLS" ]; then
         URL_COUNT=$(echo "$ALBUM_URLS" | wc -l | tr -d ' ')
@@ -70,28 +71,29 @@ if [[ "$URL" =~ (spotify\.com/artist/|deezer\.com/artist/) ]]; then
         echo -e "${GREEN}✓${NC} All done!"
         echo ""
         exit 0
+    elif [ $RESOLVER_EXIT -eq 0 ]; then
+        # Resolved, but the download ledger already has every album in hand
+        echo -e "${YELLOW}Nothing new to download${NC}"
+        exit 0
     fi
 fi
 
 # Call Python resolver for single album (track/album)
-RESULT=$(python3 "$SCRIPT_DIR/global-resolver.py" "$URL" --no-clipboard 2>&1)
+RESULT=$(python3 "$SCRIPT_DIR/global-resolver.py" "$URL" --format jsonl)
 
-# Check if result contains a URL
-if [[ "$RESULT" =~ https://(www\.)?deezer\.com/album/[0-9]+|https://open\.spotify\.com/album/[a-zA-Z0-9]+ ]]; then
-    # Extract the URL
-    ALBUM_URL=$(echo "$RESULT" | grep -E 'https://(www\.)?deezer\.com/album/[0-9]+|https://open\.spotify\.com/album/[a-zA-Z0-9]+' | head -1)
+# Extract the URL (kit-output.py reports a failed resolution on stderr)
+ALBUM_URL=$(echo "$RESULT" | python3 "$SCRIPT_DIR/../scripts/kit-output.py" | head -1)
 
-    if [ -n "$ALBUM_URL" ]; then
-        echo -e "${GREEN}✓${NC} Found: $ALBUM_URL"
-        echo ""
+if [ -n "$ALBUM_URL" ]; then
+    echo -e "${GREEN}✓${NC} Found: $ALBUM_URL"
+    echo ""
 
-        # Download directly via CLI
-        echo -e "${BLUE}Downloading...${NC}"
-        "$SCRIPT_DIR/../scripts/deemix-download.sh" "$ALBUM_URL"
-        echo -e "${GREEN}✓${NC} All done!"
-        echo ""
-        exit 0
-    fi
+    # Download directly via CLI
+    echo -e "${BLUE}Downloading...${NC}"
+    "$SCRIPT_DIR/../scripts/deemix-download.sh" "$ALBUM_URL"
+    echo -e "${GREEN}✓${NC} All done!"
+    echo ""
+    exit 0
 fi
 
 # If we get here, resolution failed
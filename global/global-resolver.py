@@ -10,52 +10,87 @@ Author: cursor
 Created: February 2025
 """
 
+import os
 import sys
 import argparse
 import json
 import re
 import logging
+import importlib.util
+from contextlib import nullcontext, redirect_stdout
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
-import requests
+from typing import Optional, Dict, Any, Tuple, List
+
+# requests is imported inside the functions that call the APIs, so --help
+# and the interactive prompt come up without loading it
 
 # Configuration
 CREDENTIALS_FILE = Path.home() / ".config" / "deemixkit" / "credentials.json"
 LOG_DIR = Path.home() / ".local" / "log" / "global-resolver"
 LOG_FILE = LOG_DIR / "global-resolver.log"
 
-# Deezer URLs
+# Deezer URLs (API base can point at a local stand-in server)
+DEEZER_API_BASE = os.environ.get("DEEMIXKIT_DEEZER_API", "https://api.deezer.com")
 DEEZER_ALBUM_BASE = "https://www.deezer.com/album/"
-DEEZER_TRACK_URL = "https://api.deezer.com/track/"
-DEEZER_ALBUM_URL = "https://api.deezer.com/album/"
-DEEZER_ARTIST_URL = "https://api.deezer.com/artist/"
-DEEZER_SEARCH_URL = "https://api.deezer.com/search/"
-
-# Spotify URLs
+DEEZER_TRACK_URL = f"{DEEZER_API_BASE}/track/"
+DEEZER_ALBUM_URL = f"{DEEZER_API_BASE}/album/"
+DEEZER_ARTIST_URL = f"{DEEZER_API_BASE}/artist/"
+DEEZER_SEARCH_URL = f"{DEEZER_API_BASE}/search/"
+
+# Spotify URLs (API bases can point at a local stand-in server)
+SPOTIFY_API_BASE = os.environ.get("DEEMIXKIT_SPOTIFY_API", "https://api.spotify.com")
+SPOTIFY_ACCOUNTS_BASE = os.environ.get("DEEMIXKIT_SPOTIFY_ACCOUNTS", "https://accounts.spotify.com")
 SPOTIFY_ALBUM_BASE = "https://open.spotify.com/album/"
-SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
-SPOTIFY_SEARCH_URL = "https://api.spotify.com/v1/search"
-SPOTIFY_TRACK_URL = "https://api.spotify.com/v1/tracks/"
-SPOTIFY_ALBUM_URL = "https://api.spotify.com/v1/albums/"
-SPOTIFY_ARTIST_URL = "https://api.spotify.com/v1/artists/"
+SPOTIFY_TOKEN_URL = f"{SPOTIFY_ACCOUNTS_BASE}/api/token"
+SPOTIFY_SEARCH_URL = f"{SPOTIFY_API_BASE}/v1/search"
+SPOTIFY_TRACK_URL = f"{SPOTIFY_API_BASE}/v1/tracks/"
+SPOTIFY_ALBUM_URL = f"{SPOTIFY_API_BASE}/v1/albums/"
+SPOTIFY_ARTIST_URL = f"{SPOTIFY_API_BASE}/v1/artists/"
 
+# Artist and title of every album URL resolved in this process (for --format jsonl)
+_album_names: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
 
-def setup_logging(verbose: bool = False) -> None:
-    """Set up logging configuration."""
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
 
-    level = logging.DEBUG if verbose else logging.INFO
-    format_str = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+def load_kit_module(name: str):
+    """Load a shared module from DeemixKit's scripts/ folder (file names contain dashes)."""
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    module_file = Path(__file__).resolve().parent.parent / "scripts" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
 
-    handlers = [logging.FileHandler(LOG_FILE)]
-    if verbose:
-        handlers.append(logging.StreamHandler(sys.stderr))
 
-    logging.basicConfig(
-        level=level,
-        format=format_str,
-        handlers=handlers
-    )
+def start_metrics(metrics_file: Optional[str]) -> None:
+    """Collect per-stage timings and HTTP counters, written to metrics_file at exit (see kit-metrics)."""
+    if metrics_file:
+        load_kit_module("kit-metrics").start(metrics_file, tool="global-resolver")
+
+
+def start_profile(profile_file: Optional[str]) -> None:
+    """Profile the run; a per-stage breakdown and profiler data go to profile_file at exit (see kit-profile)."""
+    if profile_file:
+        load_kit_module("kit-metrics").start(tool="global-resolver")
+        load_kit_module("kit-profile").start(profile_file, tool="global-resolver")
+
+
+def start_rate_budget(priority: str = 'interactive') -> None:
+    """Schedule Deezer requests through the shared rate budget at this priority class (see kit-cache)."""
+    load_kit_module("kit-cache").install_rate_budget(os.environ.get("DEEMIXKIT_PRIORITY") or priority)
+
+
+def stage(name: str):
+    """Time a phase of the run for --metrics and --profile; does nothing when both are off."""
+    metrics = sys.modules.get('kit_metrics')
+    return metrics.stage(name) if metrics else nullcontext()
+
+
+def setup_logging(verbose: bool = False) -> None:
+    """Set up queued, size-rotated logging to LOG_FILE (once per process, see kit-logging)."""
+    load_kit_module("kit-logging").setup_logging(LOG_FILE, verbose)
 
 
 def get_spotify_credentials() -> Optional[Tuple[str, str]]:
@@ -75,7 +110,7 @@ def get_spotify_credentials() -> Optional[Tuple[str, str]]:
 
 
 def get_spotify_access_token() -> Optional[str]:
-    """Get Spotify API access token."""
+    """Get Spotify API access token (reused from the kit-cache backend while valid)."""
     import subprocess
 
     creds = get_spotify_credentials()
@@ -83,11 +118,15 @@ def get_spotify_access_token() -> Optional[str]:
         return None
 
     client_id, client_secret = creds
+    kit_cache = load_kit_module("kit-cache")
+    cached_token = kit_cache.get_token('spotify', client_id)
+    if cached_token:
+        return cached_token
 
     try:
         response = subprocess.run([
             'curl', '-s', '-X', 'POST',
-            'https://accounts.spotify.com/api/token',
+            SPOTIFY_TOKEN_URL,
             '-H', 'Content-Type: application/x-www-form-urlencoded',
             '-d', f'grant_type=client_credentials&client_id={client_id}&client_secret={client_secret}'
         ], capture_output=True, text=True, timeout=10)
@@ -95,6 +134,7 @@ def get_spotify_access_token() -> Optional[str]:
         data = response.stdout.strip()
         if data:
             token_data = json.loads(data)
+            kit_cache.put_token('spotify', client_id, token_data)
             return token_data.get('access_token')
     except Exception as e:
         logging.error(f"Error getting Spotify token: {e}")
@@ -156,16 +196,26 @@ def parse_url(url: str) -> Dict[str, Any]:
     return result
 
 
+def remember_album(album_url: str, artist: Optional[str], title: Optional[str]) -> str:
+    """Keep the artist and title of a resolved album for its JSONL record; returns album_url."""
+    _album_names[album_url] = (artist or None, title or None)
+    return album_url
+
+
 def resolve_deezer_track(track_id: str) -> Optional[str]:
     """Resolve a Deezer track to its album URL."""
+    import requests
+
     try:
         response = requests.get(f"{DEEZER_TRACK_URL}{track_id}", timeout=10)
         response.raise_for_status()
         data = response.json()
+        load_kit_module("kit-catalog").record(data)
 
-        album_id = data.get('album', {}).get('id')
-        if album_id:
-            return f"{DEEZER_ALBUM_BASE}{album_id}"
+        album = data.get('album', {})
+        if album.get('id'):
+            return remember_album(f"{DEEZER_ALBUM_BASE}{album['id']}",
+                                  data.get('artist', {}).get('name'), album.get('title'))
     except Exception as e:
         logging.error(f"Error resolving Deezer track: {e}")
 
@@ -174,46 +224,123 @@ def resolve_deezer_track(track_id: str) -> Optional[str]:
 
 def resolve_spotify_track(track_id: str, access_token: str) -> Optional[str]:
     """Resolve a Spotify track to its album URL."""
+    import requests
+
     try:
         headers = {'Authorization': f'Bearer {access_token}'}
         response = requests.get(f"{SPOTIFY_TRACK_URL}{track_id}", headers=headers, timeout=10)
         response.raise_for_status()
         data = response.json()
 
-        album_id = data.get('album', {}).get('id')
-        if album_id:
-            return f"{SPOTIFY_ALBUM_BASE}{album_id}"
+        album = data.get('album', {})
+        if album.get('id'):
+            artists = album.get('artists') or data.get('artists', [])
+            return remember_album(f"{SPOTIFY_ALBUM_BASE}{album['id']}",
+                                  ', '.join(a.get('name', '') for a in artists), album.get('name'))
     except Exception as e:
         logging.error(f"Error resolving Spotify track: {e}")
 
     return None
 
 
-def resolve_deezer_artist(artist_id: str, all_albums: bool = False) -> Optional[str]:
+def drop_owned_albums(albums: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Drop albums the CollectionMatcher finds in the local collection.
+
+    Takes dicts with 'artist', 'album' and 'id' keys and uses the matcher's
+    persisted index, so no rescan happens.
+    """
+    matcher_module = load_kit_module("rileys-collection-matcher")
+    # Matcher status messages must not end up in the URL output
+    with redirect_stdout(sys.stderr):
+        matcher = matcher_module.load_indexed_matcher()
+    new_albums, existing_albums = matcher.filter_existing_albums(albums)
+    logging.info(f"Skipping {len(existing_albums)} albums already in collection")
+    return new_albums
+
+
+def drop_queued_urls(album_urls: List[str]) -> List[str]:
+    """Drop album URLs the download ledger has as queued, downloading, done or failed."""
+    new_urls, in_hand = load_kit_module("kit-ledger").open_ledger().filter_new(album_urls)
+    if in_hand:
+        print(f"Skipped {len(in_hand)} albums already queued, downloading or failed", file=sys.stderr)
+    return new_urls
+
+
+def get_deezer_artist_name(artist_id: str) -> Optional[str]:
+    """Name of a Deezer artist (artist/{id}/albums entries carry none)."""
+    import requests
+
+    try:
+        artist = requests.get(f"{DEEZER_ARTIST_URL}{artist_id}", timeout=10).json()
+        load_kit_module("kit-catalog").record(artist)
+        return artist.get('name')
+    except Exception as e:
+        logging.error(f"Error fetching Deezer artist {artist_id}: {e}")
+        return None
+
+
+def lookup_album_names(album_url: str) -> Tuple[Optional[str], Optional[str]]:
+    """Artist and title of an album URL that was passed through without an API request."""
+    import requests
+
+    parsed = parse_url(album_url)
+    try:
+        if parsed['service'] == 'deezer':
+            data = requests.get(f"{DEEZER_ALBUM_URL}{parsed['id']}", timeout=10).json()
+            load_kit_module("kit-catalog").record(data)
+            return data.get('artist', {}).get('name'), data.get('title')
+        token = get_spotify_access_token()
+        if token:
+            data = requests.get(f"{SPOTIFY_ALBUM_URL}{parsed['id']}",
+                                headers={'Authorization': f'Bearer {token}'}, timeout=10).json()
+            return ', '.join(a.get('name', '') for a in data.get('artists', [])) or None, data.get('name')
+    except Exception as e:
+        logging.error(f"Error looking up album {album_url}: {e}")
+    return None, None
+
+
+def resolve_deezer_artist(artist_id: str, all_albums: bool = False, skip_owned: bool = False) -> Optional[str]:
     """For Deezer artist, return first album or all albums."""
+    import requests
+
     try:
         limit = 100 if all_albums else 1  # Get up to 100 albums for full discography
         response = requests.get(f"{DEEZER_ARTIST_URL}{artist_id}/albums?limit={limit}", timeout=10)
         response.raise_for_status()
         data = response.json()
+        load_kit_module("kit-catalog").record(data, {'id': int(artist_id)})
 
         if data.get('data'):
-            if all_albums:
-                # Return all album URLs, one per line
-                albums = data['data']
-                urls = [f"{DEEZER_ALBUM_BASE}{album['id']}" for album in albums]
-                return '\n'.join(urls)
-            elif len(albums) > 0:
-                album_id = data['data'][0]['id']
-                return f"{DEEZER_ALBUM_BASE}{album_id}"
+            albums = data['data']
+            artist_name = None
+            if all_albums and skip_owned:
+                artist_name = get_deezer_artist_name(artist_id)
+                albums = drop_owned_albums([{
+                    'artist': artist_name or '',
+                    'album': album.get('title', ''),
+                    'year': album.get('release_date', '')[:4],
+                    'id': album['id']
+                } for album in albums])
+                if not albums:
+                    return None
+            if not all_albums:
+                albums = albums[:1]
+            # Return the album URLs, one per line
+            urls = [remember_album(f"{DEEZER_ALBUM_BASE}{album['id']}", artist_name, album.get('title'))
+                    for album in albums]
+            return '\n'.join(urls)
     except Exception as e:
         logging.error(f"Error resolving Deezer artist: {e}")
 
     return None
 
 
-def resolve_spotify_artist(artist_id: str, access_token: str, all_albums: bool = False) -> Optional[str]:
+def resolve_spotify_artist(artist_id: str, access_token: str, all_albums: bool = False,
+                           skip_owned: bool = False) -> Optional[str]:
     """For Spotify artist, return first album or all albums."""
+    import requests
+
     try:
         limit = 50 if all_albums else 1  # Spotify API max is 50
         headers = {'Authorization': f'Bearer {access_token}'}
@@ -222,21 +349,30 @@ def resolve_spotify_artist(artist_id: str, access_token: str, all_albums: bool =
         data = response.json()
 
         if data.get('items'):
-            if all_albums:
-                # Return all album URLs, one per line
-                albums = data['items']
-                urls = [f"{SPOTIFY_ALBUM_BASE}{album['id']}" for album in albums]
-                return '\n'.join(urls)
-            elif len(albums) > 0:
-                album_id = data['items'][0]['id']
-                return f"{SPOTIFY_ALBUM_BASE}{album_id}"
+            albums = [{
+                'artist': ', '.join(a.get('name', '') for a in album.get('artists', [])),
+                'album': album.get('name', ''),
+                'year': album.get('release_date', '')[:4],
+                'id': album['id']
+            } for album in data['items']]
+            if all_albums and skip_owned:
+                albums = drop_owned_albums(albums)
+                if not albums:
+                    return None
+            if not all_albums:
+                albums = albums[:1]
+            # Return the album URLs, one per line
+            urls = [remember_album(f"{SPOTIFY_ALBUM_BASE}{album['id']}", album['artist'], album['album'])
+                    for album in albums]
+            return '\n'.join(urls)
     except Exception as e:
         logging.error(f"Error resolving Spotify artist: {e}")
 
     return None
 
 
-def resolve_url(url: str, verbose: bool = False, all_albums: bool = False) -> Optional[str]:
+def resolve_url(url: str, verbose: bool = False, all_albums: bool = False,
+                skip_owned: bool = False) -> Optional[str]:
     """
     Resolve any Spotify/Deezer URL to an album URL.
 
@@ -244,7 +380,7 @@ def resolve_url(url: str, verbose: bool = False, all_albums: bool = False) -> Op
     - Track URLs → Returns parent album URL
     - Album URLs → Returns as-is
     - Playlist URLs → Returns first album
-    - Artist URLs → Returns first album
+    - Artist URLs → Returns first album (all albums with all_albums, minus owned ones with skip_owned)
 
     Returns Deemix-compatible album URL (Deezer format).
     """
@@ -276,7 +412,8 @@ def resolve_url(url: str, verbose: bool = False, all_albums: bool = False) -> Op
     # Spotify requires credentials
     spotify_token = None
     if service == 'spotify':
-        spotify_token = get_spotify_access_token()
+        with stage('token'):
+            spotify_token = get_spotify_access_token()
         if not spotify_token:
             logger.error("Spotify credentials not configured")
             if verbose:
@@ -291,7 +428,8 @@ def resolve_url(url: str, verbose: bool = False, all_albums: bool = False) -> Op
         if url_type == 'track':
             if verbose:
                 print(f"Resolving Deezer track to album...")
-            album_url = resolve_deezer_track(item_id)
+            with stage('track'):
+                album_url = resolve_deezer_track(item_id)
         elif url_type == 'album':
             album_url = f"{DEEZER_ALBUM_BASE}{item_id}"
         elif url_type == 'artist':
@@ -300,7 +438,8 @@ def resolve_url(url: str, verbose: bool = False, all_albums: bool = False) -> Op
                     print(f"Getting all albums from Deezer artist...")
                 else:
                     print(f"Getting first album from Deezer artist...")
-            album_url = resolve_deezer_artist(item_id, all_albums)
+            with stage('artist'):
+                album_url = resolve_deezer_artist(item_id, all_albums, skip_owned)
         elif url_type == 'playlist':
             # For playlists, we could get all albums, but for now just warn
             logger.warning(f"Deezer playlists not fully supported yet")
@@ -313,7 +452,8 @@ def resolve_url(url: str, verbose: bool = False, all_albums: bool = False) -> Op
         if url_type == 'track':
             if verbose:
                 print(f"Resolving Spotify track to album...")
-            album_url = resolve_spotify_track(item_id, spotify_token)
+            with stage('track'):
+                album_url = resolve_spotify_track(item_id, spotify_token)
         elif url_type == 'album':
             album_url = f"{SPOTIFY_ALBUM_BASE}{item_id}"
         elif url_type == 'artist':
@@ -322,7 +462,8 @@ def resolve_url(url: str, verbose: bool = False, all_albums: bool = False) -> Op
                     print(f"Getting all albums from Spotify artist...")
                 else:
                     print(f"Getting first album from Spotify artist...")
-            album_url = resolve_spotify_artist(item_id, spotify_token, all_albums)
+            with stage('artist'):
+                album_url = resolve_spotify_artist(item_id, spotify_token, all_albums, skip_owned)
         elif url_type == 'playlist':
             # For playlists, we could get all albums, but for now just warn
             logger.warning(f"Spotify playlists not fully supported yet")
@@ -346,6 +487,50 @@ def resolve_url(url: str, verbose: bool = False, all_albums: bool = False) -> Op
     return album_url
 
 
+def resolve_lines(lines, verbose: bool = False, all_albums: bool = False, skip_owned: bool = False,
+                  requeue: bool = False) -> int:
+    """
+    Resolve each URL line (or JSONL record with a url) and write one JSONL
+    record per album it resolves to (see kit-output). With all_albums, albums
+    the download ledger has in hand are left out unless requeue is set; an
+    artist whose albums are all in hand writes no record and does not fail.
+
+    Returns:
+        int: Exit code, 1 when any URL could not be resolved
+    """
+    output = load_kit_module("kit-output")
+    failed = 0
+    for line in lines:
+        record = output.parse_record(line)
+        url = record.get('url') if record else line
+        result = output.Result(line)
+        with stage('resolve'):
+            album_urls = resolve_url(url, verbose, all_albums, skip_owned) if url else None
+        if not album_urls:
+            result.emit(error="Could not resolve URL")
+            failed += 1
+            continue
+        album_urls = album_urls.split('\n')
+        if all_albums and not requeue:
+            album_urls = drop_queued_urls(album_urls)
+        for album_url in album_urls:
+            if album_url not in _album_names:
+                with stage('album'):
+                    remember_album(album_url, *lookup_album_names(album_url))
+        artist_name = None
+        source = parse_url(url)
+        if source['service'] == 'deezer' and source['type'] == 'artist' and \
+                any(_album_names[album_url][0] is None for album_url in album_urls):
+            # artist/{id}/albums entries carry no artist name; one request names them all
+            artist_name = get_deezer_artist_name(source['id'])
+        for album_url in album_urls:
+            parsed = parse_url(album_url)
+            artist, title = _album_names[album_url]
+            result.emit(url=album_url, id=parsed['id'], artist=artist or artist_name, title=title,
+                        provider=parsed['service'])
+    return 1 if failed else 0
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -362,6 +547,7 @@ Examples:
   %(prog)s https://open.spotify.com/track/xyz
   %(prog)s https://www.deezer.com/album/123
   %(prog)s "https://open.spotify.com/album/abc"
+  %(prog)s --format jsonl < urls.txt  # One JSON record per album
         """
     )
 
@@ -385,8 +571,46 @@ Examples:
         action='store_true',
         help='For artist URLs, return all albums instead of just one'
     )
+    parser.add_argument(
+        '--skip-owned',
+        action='store_true',
+        help='With --artist, skip albums already in your collection'
+    )
+    parser.add_argument(
+        '--requeue',
+        action='store_true',
+        help='With --artist, keep albums the download ledger has as queued, downloading, done or failed'
+    )
+    parser.add_argument(
+        '--format',
+        choices=['text', 'jsonl'],
+        default='text',
+        help='Output format: text, or jsonl for one JSON record per album on stdout (piped stdin: one URL per line)'
+    )
+    parser.add_argument(
+        '--metrics',
+        metavar='FILE',
+        default=os.environ.get('DEEMIXKIT_METRICS'),
+        help='Write per-stage timings and HTTP metrics to FILE at exit (.prom: Prometheus textfile, else JSON)'
+    )
+    parser.add_argument(
+        '--profile',
+        metavar='FILE',
+        default=os.environ.get('DEEMIXKIT_PROFILE'),
+        help='Profile the run and write a per-stage time breakdown to FILE (plus .prof and .folded profiler data)'
+    )
 
     args = parser.parse_args()
+    start_metrics(args.metrics)
+    start_profile(args.profile)
+    start_rate_budget()
+    if args.format == 'jsonl':
+        load_kit_module("kit-output").start()
+
+    # A piped list of URLs is resolved line by line in this one process
+    if args.format == 'jsonl' and not args.url and not sys.stdin.isatty():
+        lines = load_kit_module("kit-output").input_lines(sys.stdin)
+        sys.exit(resolve_lines(lines, args.verbose, args.artist, args.skip_owned, args.requeue))
 
     # Get URL - from argument or prompt
     url = args.url
@@ -405,20 +629,31 @@ Examples:
                 print("No URL provided")
                 sys.exit(1)
 
+    if args.format == 'jsonl':
+        sys.exit(resolve_lines([url], args.verbose, args.artist, args.skip_owned, args.requeue))
+
     # Resolve the URL
-    album_url = resolve_url(url, args.verbose, args.artist)
+    with stage('resolve'):
+        album_url = resolve_url(url, args.verbose, args.artist, args.skip_owned)
 
     if not album_url:
         sys.exit(1)
 
+    if args.artist and not args.requeue:
+        album_url = '\n'.join(drop_queued_urls(album_url.split('\n')))
+        if not album_url:
+            print("Nothing new to queue (use --requeue to queue these albums again)")
+            sys.exit(0)
+
     # Copy to clipboard or print
     if args.no_clipboard:
         print(album_url)
     else:
         try:
             import subprocess
-            process = subprocess.Popen(['pbcopy'], stdin=subprocess.PIPE)
-            process.communicate(input=album_url.encode('utf-8'))
+            with stage('clipboard'):
+                process = subprocess.Popen(['pbcopy'], stdin=subprocess.PIPE)
+                process.communicate(input=album_url.encode('utf-8'))
             if process.returncode == 0:
                 # Check if we have multiple URLs (newline separated)
                 url_count = album_url.count('\n') + 1 if '\n' in album_url else 1
@@ -51,11 +51,12 @@ if [[ "$URL" =~ (spotify\.com/artist/|deezer\.com/artist/) ]]; then
     echo -e "${YELLOW}Artist URL detected - fetching all albums...${NC}"
     echo ""
 
-    # Call Python resolver with --artist flag to get all albums
-    RESULT=$(python3 "$SCRIPT_DIR/global-resolver.py" "$URL" --artist --no-clipboard 2>&1)
+    # Call Python resolver with --artist flag to get all albums, one JSON record each
+    RESULT=$(python3 "$SCRIPT_DIR/global-resolver.py" "$URL" --artist --format jsonl)
+    RESOLVER_EXIT=$?
 
-    # Extract all album URLs from output
-    ALBUM_URLS=$(echo "$RESULT" | grep -E 'https://(www\.)?deezer\.com/album/[0-9]+|https://open\.spotify\.com/album/[a-zA-Z0-9]+')
+    # Extract all album URLs from the records
+    ALBUM_URLS=$(echo "$RESULT" | python3 "$SCRIPT_DIR/../scripts/kit-output.py")
 
     if [ -n "$ALBUM_URLS" ]; then
         URL_COUNT=$(echo "$ALBUM_URLS" | wc -l | tr -d ' ')
@@ -64,6 +65,7 @@ if [[ "$URL" =~ (spotify\.com/artist/|deezer\.com/artist/) ]]; then
 
         # Copy all URLs to clipboard at once (newline-separated)
         echo "$ALBUM_URLS" | pbcopy
+        echo "$ALBUM_URLS" | python3 "$SCRIPT_DIR/../scripts/kit-ledger.py" queued --source global-resolver
         echo -e "${GREEN}✓${NC} Copied $URL_COUNT albums to clipboard!"
 
         # Paste to Deemix
@@ -74,34 +76,36 @@ if [[ "$URL" =~ (spotify\.com/artist/|deezer\.com/artist/) ]]; then
         echo ""
         echo -e "${GREEN}All done!${NC}"
         exit 0
+    elif [ $RESOLVER_EXIT -eq 0 ]; then
+        # Resolved, but the download ledger already has every album in hand
+        echo -e "${YELLOW}Nothing new to queue${NC}"
+        exit 0
     fi
 fi
 
 # Call Python resolver for single album (track/album)
-RESULT=$(python3 "$SCRIPT_DIR/global-resolver.py" "$URL" --no-clipboard 2>&1)
+RESULT=$(python3 "$SCRIPT_DIR/global-resolver.py" "$URL" --format jsonl)
 
-# Check if result contains a URL
-if [[ "$RESULT" =~ https://(www\.)?deezer\.com/album/[0-9]+|https://open\.spotify\.com/album/[a-zA-Z0-9]+ ]]; then
-    # Extract the URL
-    ALBUM_URL=$(echo "$RESULT" | grep -E 'https://(www\.)?deezer\.com/album/[0-9]+|https://open\.spotify\.com/album/[a-zA-Z0-9]+' | head -1)
+# Extract the URL (kit-output.py reports a failed resolution on stderr)
+ALBUM_URL=$(echo "$RESULT" | python3 "$SCRIPT_DIR/../scripts/kit-output.py" | head -1)
 
-    if [ -n "$ALBUM_URL" ]; then
-        echo -e "${GREEN}✓${NC} Found: $ALBUM_URL"
-        echo ""
+if [ -n "$ALBUM_URL" ]; then
+    echo -e "${GREEN}✓${NC} Found: $ALBUM_URL"
+    echo ""
 
-        # Copy to clipboard
-        echo "$ALBUM_URL" | pbcopy
-        echo -e "${GREEN}✓${NC} Copied to clipboard!"
+    # Copy to clipboard
+    echo "$ALBUM_URL" | pbcopy
+    python3 "$SCRIPT_DIR/../scripts/kit-ledger.py" queued --source global-resolver "$ALBUM_URL"
+    echo -e "${GREEN}✓${NC} Copied to clipboard!"
 
-        # Paste to Deemix
-        echo ""
-        echo -e "${BLUE}Pasting to Deemix...${NC}"
-        osascript "$SCRIPT_DIR/../scripts/paste-to-deemix.applescript" 2>/dev/null
-        echo -e "${GREEN}✓${NC} Sent to Deemix!"
-        echo ""
-        echo -e "${GREEN}All done!${NC}"
-        exit 0
-    fi
+    # Paste to Deemix
+    echo ""
+    echo -e "${BLUE}Pasting to Deemix...${NC}"
+    osascript "$SCRIPT_DIR/../scripts/paste-to-deemix.applescript" 2>/dev/null
+    echo -e "${GREEN}✓${NC} Sent to Deemix!"
+    echo ""
+    echo -e "${GREEN}All done!${NC}"
+    exit 0
 fi
 
 # If we get here, resolution failed
@@ -45,11 +45,11 @@ echo -e "${BLUE}=== Playlist Downloader (CLI) ===${NC}"
 echo -e "${BLUE}Processing playlist...${NC}"
 echo ""
 
-# Call Python resolver
-RESULT=$(python3 "$SCRIPT_DIR/playlist-downloader.py" "$URL" --no-clipboard 2>&1)
+# Call Python resolver (one JSON record per album)
+RESULT=$(python3 "$SCRIPT_DIR/playlist-downloader.py" "$URL" --format jsonl)
 
-# Extract all album URLs from output (supports both Deezer and Spotify)
-ALBUM_URLS=$(echo "$RESULT" | grep -E 'https://(www\.)?deezer\.com/album/[0-9]+|https://open\.spotify\.com/album/[a-zA-Z0-9]+' | sort | uniq)
+# Extract all album URLs from the records (supports both Deezer and Spotify)
+ALBUM_URLS=$(echo "$RESULT" | python3 "$SCRIPT_DIR/../scripts/kit-output.py")
 
 if [ -n "$ALBUM_URLS" ]; then
     URL_COUNT=$(echo "$ALBUM_URLS" | wc -l | tr -d ' ')
@@ -9,6 +9,7 @@ Version: 1.0.0
 Created: February 2025
 """
 
+import os
 import sys
 import argparse
 import json
@@ -16,41 +17,75 @@ import re
 import logging
 import time
 import base64
+import importlib.util
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Optional, Dict, Any, Tuple, Set, List
-import requests
+
+# requests is imported inside the functions that call the APIs, so --help
+# and the interactive prompt come up without loading it
 
 # Configuration
 CREDENTIALS_FILE = Path.home() / ".config" / "deemixkit" / "credentials.json"
 LOG_DIR = Path.home() / ".local" / "log" / "playlist-downloader"
 LOG_FILE = LOG_DIR / "playlist-downloader.log"
 
-# Deezer API
-DEEZER_PLAYLIST_URL = "https://api.deezer.com/playlist/"
+# Deezer API (API base can point at a local stand-in server)
+DEEZER_API_BASE = os.environ.get("DEEMIXKIT_DEEZER_API", "https://api.deezer.com")
+DEEZER_PLAYLIST_URL = f"{DEEZER_API_BASE}/playlist/"
 DEEZER_ALBUM_BASE = "https://www.deezer.com/album/"
 
-# Spotify API
-SPOTIFY_PLAYLIST_URL = "https://api.spotify.com/v1/playlists/"
-SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
+# Spotify API (API bases can point at a local stand-in server)
+SPOTIFY_API_BASE = os.environ.get("DEEMIXKIT_SPOTIFY_API", "https://api.spotify.com")
+SPOTIFY_ACCOUNTS_BASE = os.environ.get("DEEMIXKIT_SPOTIFY_ACCOUNTS", "https://accounts.spotify.com")
+SPOTIFY_PLAYLIST_URL = f"{SPOTIFY_API_BASE}/v1/playlists/"
+SPOTIFY_TOKEN_URL = f"{SPOTIFY_ACCOUNTS_BASE}/api/token"
 SPOTIFY_ALBUM_BASE = "https://open.spotify.com/album/"
 
+# Artist and title of every album URL found in a playlist (for --format jsonl)
+_album_names: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
 
-def setup_logging(verbose: bool = False) -> None:
-    """Set up logging configuration."""
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
 
-    level = logging.DEBUG if verbose else logging.INFO
-    format_str = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+def load_kit_module(name: str):
+    """Load a shared module from DeemixKit's scripts/ folder (file names contain dashes)."""
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    module_file = Path(__file__).resolve().parent.parent / "scripts" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
 
-    handlers = [logging.FileHandler(LOG_FILE)]
-    if verbose:
-        handlers.append(logging.StreamHandler(sys.stderr))
 
-    logging.basicConfig(
-        level=level,
-        format=format_str,
-        handlers=handlers
-    )
+def start_metrics(metrics_file: Optional[str]) -> None:
+    """Collect per-stage timings and HTTP counters, written to metrics_file at exit (see kit-metrics)."""
+    if metrics_file:
+        load_kit_module("kit-metrics").start(metrics_file, tool="playlist-downloader")
+
+
+def start_profile(profile_file: Optional[str]) -> None:
+    """Profile the run; a per-stage breakdown and profiler data go to profile_file at exit (see kit-profile)."""
+    if profile_file:
+        load_kit_module("kit-metrics").start(tool="playlist-downloader")
+        load_kit_module("kit-profile").start(profile_file, tool="playlist-downloader")
+
+
+def start_rate_budget(priority: str = 'batch') -> None:
+    """Schedule Deezer requests through the shared rate budget at this priority class (see kit-cache)."""
+    load_kit_module("kit-cache").install_rate_budget(os.environ.get("DEEMIXKIT_PRIORITY") or priority)
+
+
+def stage(name: str):
+    """Time a phase of the run for --metrics and --profile; does nothing when both are off."""
+    metrics = sys.modules.get('kit_metrics')
+    return metrics.stage(name) if metrics else nullcontext()
+
+
+def setup_logging(verbose: bool = False) -> None:
+    """Set up queued, size-rotated logging to LOG_FILE (once per process, see kit-logging)."""
+    load_kit_module("kit-logging").setup_logging(LOG_FILE, verbose)
 
 
 def get_spotify_credentials() -> Optional[Tuple[str, str]]:
@@ -70,12 +105,18 @@ def get_spotify_credentials() -> Optional[Tuple[str, str]]:
 
 
 def get_spotify_access_token() -> Optional[str]:
-    """Get Spotify API access token."""
+    """Get Spotify API access token (reused from the kit-cache backend while valid)."""
+    import requests
+
     creds = get_spotify_credentials()
     if not creds:
         return None
 
     client_id, client_secret = creds
+    kit_cache = load_kit_module("kit-cache")
+    cached_token = kit_cache.get_token('spotify', client_id)
+    if cached_token:
+        return cached_token
 
     try:
         auth_header = base64.b64encode(
@@ -88,6 +129,7 @@ def get_spotify_access_token() -> Optional[str]:
         response = requests.post(SPOTIFY_TOKEN_URL, data=data, headers=headers, timeout=10)
         response.raise_for_status()
         token_data = response.json()
+        kit_cache.put_token('spotify', client_id, token_data)
 
         return token_data.get('access_token')
     except Exception as e:
@@ -112,6 +154,8 @@ def extract_playlist_id(url: str, service: str) -> str:
 
 def get_deezer_playlist_albums(playlist_id: str, verbose: bool = False) -> Tuple[Set[str], str]:
     """Get all unique album URLs from a Deezer playlist."""
+    import requests
+
     albums = set()
     playlist_name = "Unknown Playlist"
 
@@ -133,6 +177,7 @@ def get_deezer_playlist_albums(playlist_id: str, verbose: bool = False) -> Tuple
             response = requests.get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
+            load_kit_module("kit-catalog").record(data)
 
             if 'data' not in data:
                 break
@@ -141,7 +186,10 @@ def get_deezer_playlist_albums(playlist_id: str, verbose: bool = False) -> Tuple
                 if track.get('album'):
                     album_id = track['album'].get('id')
                     if album_id:
-                        albums.add(f"{DEEZER_ALBUM_BASE}{album_id}")
+                        album_url = f"{DEEZER_ALBUM_BASE}{album_id}"
+                        albums.add(album_url)
+                        _album_names[album_url] = (track.get('artist', {}).get('name'),
+                                                   track['album'].get('title'))
 
             # Get next page
             url = data.get('next') if isinstance(data.get('next'), str) else None
@@ -160,10 +208,13 @@ def get_deezer_playlist_albums(playlist_id: str, verbose: bool = False) -> Tuple
 
 def get_spotify_playlist_albums(playlist_id: str, verbose: bool = False) -> Tuple[Set[str], str]:
     """Get all unique album URLs from a Spotify playlist."""
+    import requests
+
     albums = set()
     playlist_name = "Unknown Playlist"
 
-    access_token = get_spotify_access_token()
+    with stage('token'):
+        access_token = get_spotify_access_token()
     if not access_token:
         if verbose:
             print("Error: Spotify credentials not configured")
@@ -198,7 +249,11 @@ def get_spotify_playlist_albums(playlist_id: str, verbose: bool = False) -> Tupl
                 if track and track.get('album'):
                     album_id = track['album'].get('id')
                     if album_id:
-                        albums.add(f"{SPOTIFY_ALBUM_BASE}{album_id}")
+                        album_url = f"{SPOTIFY_ALBUM_BASE}{album_id}"
+                        albums.add(album_url)
+                        artists = track['album'].get('artists') or track.get('artists', [])
+                        _album_names[album_url] = (', '.join(a.get('name', '') for a in artists) or None,
+                                                   track['album'].get('name'))
 
             # Get next page
             url = data.get('next')
@@ -215,6 +270,20 @@ def get_spotify_playlist_albums(playlist_id: str, verbose: bool = False) -> Tupl
     return albums, playlist_name
 
 
+def drop_unavailable_albums(albums: Set[str], verbose: bool = False) -> Set[str]:
+    """Drop Deezer albums that are unavailable or unreadable. Spotify URLs pass through unchecked."""
+    deezer_api = load_kit_module("deezer-api")
+    deezer_ids = [url[len(DEEZER_ALBUM_BASE):] for url in albums if url.startswith(DEEZER_ALBUM_BASE)]
+    if not deezer_ids:
+        return albums
+
+    if verbose:
+        print(f"Checking availability of {len(deezer_ids)} albums...")
+    available_ids = set(deezer_api.filter_available_albums(deezer_ids, {"timeout": 10}))
+    return {url for url in albums
+            if not url.startswith(DEEZER_ALBUM_BASE) or url[len(DEEZER_ALBUM_BASE):] in available_ids}
+
+
 def process_playlist(url: str, verbose: bool = False) -> Tuple[Set[str], str]:
     """Process a playlist URL and extract album URLs."""
     setup_logging(verbose)
@@ -252,6 +321,7 @@ Examples:
   %(prog)s https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M
   %(prog)s "https://www.deezer.com/playlist/123456789"
   %(prog)s https://open.spotify.com/playlist/abc123 --verbose
+  %(prog)s https://open.spotify.com/playlist/abc123 --format jsonl  # One JSON record per album
         """
     )
 
@@ -270,8 +340,43 @@ Examples:
         action='store_true',
         help='Print URLs instead of copying to clipboard'
     )
+    parser.add_argument(
+        '--check-availability',
+        action='store_true',
+        help='Drop Deezer albums that are unavailable or unreadable in your region'
+    )
+    parser.add_argument(
+        '--requeue',
+        action='store_true',
+        help='Include albums the download ledger has as queued, downloading or failed'
+    )
+    parser.add_argument(
+        '--format',
+        choices=['text', 'jsonl'],
+        default='text',
+        help='Output format: text, or jsonl for one JSON record per album on stdout'
+    )
+    parser.add_argument(
+        '--metrics',
+        metavar='FILE',
+        default=os.environ.get('DEEMIXKIT_METRICS'),
+        help='Write per-stage timings and HTTP metrics to FILE at exit (.prom: Prometheus textfile, else JSON)'
+    )
+    parser.add_argument(
+        '--profile',
+        metavar='FILE',
+        default=os.environ.get('DEEMIXKIT_PROFILE'),
+        help='Profile the run and write a per-stage time breakdown to FILE (plus .prof and .folded profiler data)'
+    )
 
     args = parser.parse_args()
+    start_metrics(args.metrics)
+    start_profile(args.profile)
+    start_rate_budget()
+    output = None
+    if args.format == 'jsonl':
+        output = load_kit_module("kit-output")
+        output.start()
 
     # Get URL - from argument or prompt
     url = args.url
@@ -289,8 +394,15 @@ Examples:
                 print("No URL provided")
                 sys.exit(1)
 
+    result = output.Result(url) if output else None
+
     # Process playlist
-    albums, playlist_name = process_playlist(url, args.verbose)
+    with stage('playlist'):
+        albums, playlist_name = process_playlist(url, args.verbose)
+
+    if albums and args.check_availability:
+        with stage('availability'):
+            albums = drop_unavailable_albums(albums, args.verbose)
 
     if not albums:
         print("No albums found")
@@ -298,6 +410,17 @@ Examples:
 
     # Sort albums for consistent output
     sorted_albums = sorted(albums)
+
+    # Albums queued by an earlier run may not be downloaded yet; the download ledger knows them
+    ledger = load_kit_module("kit-ledger").open_ledger()
+    if not args.requeue:
+        with stage('ledger'):
+            sorted_albums, in_hand = ledger.filter_new(sorted_albums)
+        if in_hand:
+            print(f"Skipped {len(in_hand)} albums already queued, downloading or failed", file=sys.stderr)
+        if not sorted_albums:
+            print("All albums are already queued")
+            sys.exit(0)
     album_count = len(sorted_albums)
 
     if args.verbose:
@@ -305,7 +428,13 @@ Examples:
         print("")
 
     # Copy to clipboard or print
-    if args.no_clipboard:
+    if result:
+        for album in sorted_albums:
+            service = 'deezer' if album.startswith(DEEZER_ALBUM_BASE) else 'spotify'
+            artist, title = _album_names.get(album, (None, None))
+            result.emit(url=album, id=album.rsplit('/', 1)[-1], artist=artist, title=title,
+                        provider=service, playlist=playlist_name)
+    elif args.no_clipboard:
         for album in sorted_albums:
             print(album)
     else:
@@ -313,9 +442,11 @@ Examples:
             import subprocess
             # Join all URLs with newlines
             album_text = '\n'.join(sorted_albums)
-            process = subprocess.Popen(['pbcopy'], stdin=subprocess.PIPE)
-            process.communicate(input=album_text.encode('utf-8'))
+            with stage('clipboard'):
+                process = subprocess.Popen(['pbcopy'], stdin=subprocess.PIPE)
+                process.communicate(input=album_text.encode('utf-8'))
             if process.returncode == 0:
+                ledger.mark(sorted_albums, 'queued', source='playlist-downloader')
                 if args.verbose:
                     for album in sorted_albums:
                         print(f"  {album}")
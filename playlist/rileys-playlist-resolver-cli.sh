@@ -41,11 +41,11 @@ echo -e "${BLUE}=== Playlist to Deemix (CLI) ===${NC}"
 echo -e "${BLUE}Getting albums you don't have and downloading...${NC}"
 echo ""
 
-# Get the URLs from the Python script
-URLS=$(python3 "$SCRIPT_DIR/rileys-playlist-resolver.py" "$URL" --no-clipboard 2>&1)
+# Get one JSON record per missing album from the Python script (no clipboard)
+RECORDS=$(python3 "$SCRIPT_DIR/rileys-playlist-resolver.py" "$URL" --format jsonl)
 
 # Extract and download each URL
-echo "$URLS" | grep -E 'https://(www\.)?deezer\.com/album/[0-9]+|https://open\.spotify\.com/album/[a-zA-Z0-9]+' | while IFS= read -r url; do
+echo "$RECORDS" | python3 "$SCRIPT_DIR/../scripts/kit-output.py" | while IFS= read -r url; do
     if [ -n "$url" ]; then
         echo -e "${BLUE}Downloading:${NC} $url"
         "$SCRIPT_DIR/../scripts/deemix-download.sh" "$url"
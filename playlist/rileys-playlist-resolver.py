@@ -12,15 +12,18 @@ Version: 2.0.0
 Created: February 2025
 """
 
+import os
 import sys
 import argparse
 import json
 import re
 import time
 import base64
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Set, Tuple, Optional, Dict, List
 import subprocess
+import importlib.util
 
 def load_deemixkit_path() -> Path:
     """Load DeemixKit path from credentials.json or use default."""
@@ -40,32 +43,75 @@ def load_deemixkit_path() -> Path:
     return default_path
 
 
-# Load collection matcher from file with dashes in name
-import importlib.util
 DEEMIXKIT = load_deemixkit_path()
-matcher_file = DEEMIXKIT / "scripts" / "rileys-collection-matcher.py"
 
-try:
-    spec = importlib.util.spec_from_file_location("rileys_collection_matcher", matcher_file)
+
+def load_kit_module(name: str):
+    """Load a shared module from DeemixKit's scripts/ folder (file names contain dashes)."""
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    module_file = DEEMIXKIT / "scripts" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
     module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
     spec.loader.exec_module(module)
-    CollectionMatcher = module.CollectionMatcher
-except Exception as e:
-    print(f"Error loading collection matcher: {e}", file=sys.stderr)
-    print(f"Expected at: {matcher_file}", file=sys.stderr)
-    sys.exit(1)
+    return module
+
+
+def load_collection_matcher():
+    """Load the CollectionMatcher class, exiting if the matcher module is missing or broken."""
+    try:
+        return load_kit_module("rileys-collection-matcher").CollectionMatcher
+    except Exception as e:
+        print(f"Error loading collection matcher: {e}", file=sys.stderr)
+        print(f"Expected at: {DEEMIXKIT / 'scripts' / 'rileys-collection-matcher.py'}", file=sys.stderr)
+        sys.exit(1)
+
+
+def start_metrics(metrics_file: Optional[str]) -> None:
+    """Collect per-stage timings and HTTP counters, written to metrics_file at exit (see kit-metrics)."""
+    if metrics_file:
+        load_kit_module("kit-metrics").start(metrics_file, tool="rileys-playlist-resolver")
+
+
+def start_profile(profile_file: Optional[str]) -> None:
+    """Profile the run; a per-stage breakdown and profiler data go to profile_file at exit (see kit-profile)."""
+    if profile_file:
+        load_kit_module("kit-metrics").start(tool="rileys-playlist-resolver")
+        load_kit_module("kit-profile").start(profile_file, tool="rileys-playlist-resolver")
+
+
+def start_rate_budget(priority: str = 'batch') -> None:
+    """Schedule Deezer requests through the shared rate budget at this priority class (see kit-cache)."""
+    try:
+        load_kit_module("kit-cache").install_rate_budget(os.environ.get("DEEMIXKIT_PRIORITY") or priority)
+    except OSError as e:
+        # DeemixKit lives elsewhere (paths.deemixkit); resolve without the budget rather than fail
+        sys.modules.pop("kit_cache", None)
+        print(f"Warning: rate budget unavailable: {e}", file=sys.stderr)
 
-# APIs
-SPOTIFY_PLAYLIST_API = "https://api.spotify.com/v1/playlists/"
-SPOTIFY_TOKEN_API = "https://accounts.spotify.com/api/token"
-DEEZER_PLAYLIST_API = "https://api.deezer.com/playlist/"
+
+def stage(name: str):
+    """Time a phase of the run for --metrics and --profile; does nothing when both are off."""
+    metrics = sys.modules.get('kit_metrics')
+    return metrics.stage(name) if metrics else nullcontext()
+
+
+# APIs (bases can point at a local stand-in server)
+SPOTIFY_API_BASE = os.environ.get("DEEMIXKIT_SPOTIFY_API", "https://api.spotify.com")
+SPOTIFY_ACCOUNTS_BASE = os.environ.get("DEEMIXKIT_SPOTIFY_ACCOUNTS", "https://accounts.spotify.com")
+DEEZER_API_BASE = os.environ.get("DEEMIXKIT_DEEZER_API", "https://api.deezer.com")
+SPOTIFY_PLAYLIST_API = f"{SPOTIFY_API_BASE}/v1/playlists/"
+SPOTIFY_TOKEN_API = f"{SPOTIFY_ACCOUNTS_BASE}/api/token"
+DEEZER_PLAYLIST_API = f"{DEEZER_API_BASE}/playlist/"
 
 # Credentials
 CREDS_FILE = Path.home() / ".config" / "deemixkit" / "credentials.json"
 
 
 def get_spotify_token() -> Optional[str]:
-    """Get Spotify API token using subprocess curl."""
+    """Get Spotify API token using subprocess curl (reused from the kit-cache backend while valid)."""
     if not CREDS_FILE.exists():
         return None
 
@@ -76,15 +122,20 @@ def get_spotify_token() -> Optional[str]:
                 client_id = config['spotify'].get('client_id')
                 client_secret = config['spotify'].get('client_secret')
                 if client_id and client_secret:
+                    kit_cache = load_kit_module("kit-cache")
+                    cached_token = kit_cache.get_token('spotify', client_id)
+                    if cached_token:
+                        return cached_token
                     result = subprocess.run([
                         'curl', '-s', '-X', 'POST',
-                        'https://accounts.spotify.com/api/token',
+                        SPOTIFY_TOKEN_API,
                         '-H', 'Content-Type: application/x-www-form-urlencoded',
                         '-d', f'grant_type=client_credentials&client_id={client_id}&client_secret={client_secret}'
                     ], capture_output=True, text=True, timeout=10)
 
                     if result.returncode == 0 and result.stdout:
                         token_data = json.loads(result.stdout)
+                        kit_cache.put_token('spotify', client_id, token_data)
                         return token_data.get('access_token')
     except json.JSONDecodeError as e:
         print(f"Error parsing Spotify token response: {e}", file=sys.stderr)
@@ -119,6 +170,7 @@ def get_deezer_playlist_albums(playlist_id: str) -> List[Dict]:
             response = requests.get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
+            load_kit_module("kit-catalog").record(data)
 
             for track in data.get('data', []):
                 if track.get('album'):
@@ -148,7 +200,8 @@ def get_deezer_playlist_albums(playlist_id: str) -> List[Dict]:
 def get_spotify_playlist_albums(playlist_id: str) -> List[Dict]:
     """Get albums from Spotify playlist. Returns list of album dicts."""
     albums = []
-    token = get_spotify_token()
+    with stage('token'):
+        token = get_spotify_token()
     if not token:
         print("Spotify credentials not configured", file=sys.stderr)
         return albums
@@ -201,6 +254,18 @@ def get_spotify_playlist_albums(playlist_id: str) -> List[Dict]:
     return albums
 
 
+def drop_unavailable_albums(albums: List[Dict]) -> List[Dict]:
+    """Drop Deezer albums that are unavailable or unreadable. Spotify albums pass through unchecked."""
+    deezer_api = load_kit_module("deezer-api")
+    deezer_ids = [album['id'] for album in albums if 'deezer.com/album/' in album['url']]
+    if not deezer_ids:
+        return albums
+
+    available_ids = set(deezer_api.filter_available_albums(deezer_ids, {"timeout": 10}))
+    return [album for album in albums
+            if 'deezer.com/album/' not in album['url'] or album['id'] in available_ids]
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Get albums from playlist that you don't own",
@@ -209,8 +274,25 @@ def main():
     parser.add_argument('url', nargs='?', help='Playlist URL')
     parser.add_argument('--clipboard', action='store_true', help='Use URL from clipboard')
     parser.add_argument('--verbose', '-v', action='store_true', help='Show details')
+    parser.add_argument('--check-availability', action='store_true',
+                        help='Drop Deezer albums that are unavailable or unreadable in your region')
+    parser.add_argument('--requeue', action='store_true',
+                        help='Include albums the download ledger has as queued, downloading or failed')
+    parser.add_argument('--format', choices=['text', 'jsonl'], default='text',
+                        help='Output format: text, or jsonl for one JSON record per missing album on stdout (no clipboard)')
+    parser.add_argument('--metrics', metavar='FILE', default=os.environ.get('DEEMIXKIT_METRICS'),
+                        help='Write per-stage timings and HTTP metrics to FILE at exit (.prom: Prometheus textfile, else JSON)')
+    parser.add_argument('--profile', metavar='FILE', default=os.environ.get('DEEMIXKIT_PROFILE'),
+                        help='Profile the run and write a per-stage time breakdown to FILE (plus .prof and .folded profiler data)')
 
     args = parser.parse_args()
+    start_metrics(args.metrics)
+    start_profile(args.profile)
+    start_rate_budget()
+    output = None
+    if args.format == 'jsonl':
+        output = load_kit_module("kit-output")
+        output.start()
 
     # Get URL
     url = args.url
@@ -228,24 +310,29 @@ def main():
         print("No URL provided")
         sys.exit(1)
 
+    result = output.Result(url) if output else None
+
     # Initialize collection matcher (this scans your library)
     print(f"Scanning collection...")
-    matcher = CollectionMatcher()
+    CollectionMatcher = load_collection_matcher()
+    with stage('collection'):
+        matcher = CollectionMatcher()
     stats = matcher.get_collection_stats()
     print(f"Indexed {stats['total_albums']} albums from {stats['total_artists']} artists")
     print()
 
     # Extract albums from playlist
     print("Fetching playlist albums...")
-    if 'deezer.com/playlist/' in url:
-        playlist_id = extract_playlist_id(url, 'deezer')
-        albums = get_deezer_playlist_albums(playlist_id)
-    elif 'spotify.com/playlist/' in url:
-        playlist_id = extract_playlist_id(url, 'spotify')
-        albums = get_spotify_playlist_albums(playlist_id)
-    else:
-        print("Invalid playlist URL")
-        sys.exit(1)
+    with stage('playlist'):
+        if 'deezer.com/playlist/' in url:
+            playlist_id = extract_playlist_id(url, 'deezer')
+            albums = get_deezer_playlist_albums(playlist_id)
+        elif 'spotify.com/playlist/' in url:
+            playlist_id = extract_playlist_id(url, 'spotify')
+            albums = get_spotify_playlist_albums(playlist_id)
+        else:
+            print("Invalid playlist URL")
+            sys.exit(1)
 
     if not albums:
         print("No albums found in playlist")
@@ -254,9 +341,25 @@ def main():
     print(f"Found {len(albums)} unique albums in playlist")
     print()
 
+    if args.check_availability:
+        print("Checking album availability...")
+        with stage('availability'):
+            available_albums = drop_unavailable_albums(albums)
+        if len(available_albums) < len(albums):
+            print(f"Dropped {len(albums) - len(available_albums)} unavailable albums")
+        albums = available_albums
+
     # Filter using collection matcher
     new_albums, existing_albums = matcher.filter_existing_albums(albums)
 
+    # Albums queued by an earlier run are not on disk yet; the download ledger knows them
+    ledger = load_kit_module("kit-ledger").open_ledger()
+    in_hand = {}
+    if not args.requeue:
+        with stage('ledger'):
+            _, in_hand = ledger.filter_new([album['url'] for album in new_albums])
+        new_albums = [album for album in new_albums if album['url'] not in in_hand]
+
     if args.verbose:
         print("=== Already in Collection ===")
         for album in existing_albums[:10]:
@@ -271,17 +374,27 @@ def main():
             print(f"  ... and {len(new_albums) - 10} more")
 
     print()
-    print(f"Summary: {len(new_albums)} new, {len(existing_albums)} already owned")
-
-    if new_albums:
+    print(f"Summary: {len(new_albums)} new, {len(existing_albums)} already owned, {len(in_hand)} already queued")
+
+    if new_albums and result:
+        for album in new_albums:
+            # The Spotify playlist is fetched with curl, which the request count does not see
+            result.emit(url=album['url'], id=album['id'], artist=album['artist'], title=album['album'],
+                        provider='deezer' if 'deezer.com' in album['url'] else 'spotify', cached=False)
+    elif new_albums:
         # Copy to clipboard
         album_urls = [album['url'] for album in new_albums]
         album_text = '\n'.join(album_urls)
-        process = subprocess.Popen(['pbcopy'], stdin=subprocess.PIPE)
-        process.communicate(input=album_text.encode('utf-8'))
-
-        print(f"\nCopied {len(new_albums)} album URLs to clipboard!")
-        print("Paste into Deemix to download.")
+        with stage('clipboard'):
+            process = subprocess.Popen(['pbcopy'], stdin=subprocess.PIPE)
+            process.communicate(input=album_text.encode('utf-8'))
+        if process.returncode == 0:
+            ledger.mark(album_urls, 'queued', source='rileys-playlist-resolver')
+            print(f"\nCopied {len(new_albums)} album URLs to clipboard!")
+            print("Paste into Deemix to download.")
+        else:
+            print("\n" + album_text)
+            print("Failed to copy to clipboard")
 
     sys.exit(0 if not new_albums else 1)
 
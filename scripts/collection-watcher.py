@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Collection Watcher - Keep the collection index current without rescanning
+
+Watches the music collection for album and artist folders being created,
+renamed or deleted and applies each change to a CollectionMatcher's index
+in place. Uses inotify on Linux and falls back to polling folder mtimes
+everywhere else (macOS) or when inotify runs out of watches.
+
+Run it on its own to keep the persisted index (used by --skip-owned and
+skip-owned.py) current, or start a CollectionWatcher inside a long-running
+process so its matcher never goes stale.
+
+Usage:
+    python3 collection-watcher.py
+    python3 collection-watcher.py --poll --interval 60 --verbose
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import errno
+import sys
+import time
+import struct
+import argparse
+import threading
+import importlib.util
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Optional, Set, Callable
+
+# Folder depths below the collection root: genre (1), alphabet (2), artist (3), album (4)
+ALBUM_DEPTH = 4
+
+# inotify event bits (linux/inotify.h)
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+INOTIFY_EVENT = struct.Struct('iIII')
+
+
+def load_kit_module(name: str):
+    """Load a shared module from DeemixKit's scripts/ folder (file names contain dashes)."""
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    module_file = Path(__file__).resolve().parent / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def depth(relative_path: str) -> int:
+    return len(Path(relative_path).parts)
+
+
+def list_folders(folder: Path) -> Set[str]:
+    """Names of the visible sub-folders of folder (empty if it is gone)."""
+    try:
+        return {entry.name for entry in os.scandir(folder)
+                if entry.is_dir() and not entry.name.startswith('.')}
+    except (FileNotFoundError, NotADirectoryError, PermissionError):
+        return set()
+
+
+class InotifyBackend:
+    """Reports changed folders using Linux inotify watches on every folder above album level."""
+
+    MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+
+    def __init__(self, root: Path):
+        import ctypes
+        import ctypes.util
+
+        self.root = root
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {}  # watch descriptor -> relative folder
+        self.watches = {}  # relative folder -> watch descriptor
+        self._watch_tree('')
+
+    def _watch(self, relative_path: str) -> None:
+        import ctypes
+
+        folder = os.fsencode(str(self.root / relative_path))
+        wd = self.libc.inotify_add_watch(self.fd, folder, self.MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            # The folder vanished between listing and watching; the parent reports it
+            if error == errno.ENOENT:
+                return
+            raise OSError(error, f"inotify_add_watch failed for {relative_path or self.root}")
+        self.paths[wd] = relative_path
+        self.watches[relative_path] = wd
+
+    def _watch_tree(self, relative_path: str) -> None:
+        """Watch relative_path and every folder below it down to artist level."""
+        pending = [relative_path]
+        while pending:
+            current = pending.pop()
+            self._watch(current)
+            if depth(current) < ALBUM_DEPTH - 1:
+                pending.extend(os.path.join(current, name) for name in list_folders(self.root / current))
+
+    def _unwatch_tree(self, relative_path: str) -> None:
+        prefix = relative_path + os.sep
+        for path in [path for path in self.watches if path == relative_path or path.startswith(prefix)]:
+            wd = self.watches.pop(path)
+            self.paths.pop(wd, None)
+            self.libc.inotify_rm_watch(self.fd, wd)
+
+    def changes(self, timeout: float) -> Set[str]:
+        """Wait up to timeout seconds and return the relative folders that changed."""
+        import select
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        try:
+            data = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b'\0'))
+            offset += INOTIFY_EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost, fall back to refreshing everything
+                changed.add('')
+                continue
+            if mask & IN_IGNORED:
+                relative_path = self.paths.pop(wd, None)
+                if relative_path is not None:
+                    self.watches.pop(relative_path, None)
+                continue
+            if not mask & IN_ISDIR or name.startswith('.') or wd not in self.paths:
+                continue
+
+            relative_path = os.path.join(self.paths[wd], name)
+            changed.add(relative_path)
+            if depth(relative_path) < ALBUM_DEPTH:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_tree(relative_path)
+                else:
+                    self._unwatch_tree(relative_path)
+
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingBackend:
+    """Reports changed folders by comparing folder mtimes and listings every interval seconds."""
+
+    def __init__(self, root: Path, interval: float = 30.0):
+        self.root = root
+        self.interval = interval
+        self.next_poll = time.monotonic() + interval
+        self.folders = {}  # relative folder -> (mtime_ns, sub-folder names)
+        self._record_tree('')
+
+    def _record(self, relative_path: str) -> Optional[Set[str]]:
+        try:
+            mtime = os.stat(self.root / relative_path).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        children = list_folders(self.root / relative_path)
+        self.folders[relative_path] = (mtime, children)
+        return children
+
+    def _record_tree(self, relative_path: str) -> None:
+        pending = [relative_path]
+        while pending:
+            current = pending.pop()
+            children = self._record(current)
+            if children is not None and depth(current) < ALBUM_DEPTH - 1:
+                pending.extend(os.path.join(current, name) for name in children)
+
+    def _forget_tree(self, relative_path: str) -> None:
+        prefix = relative_path + os.sep
+        for path in [path for path in self.folders if path == relative_path or path.startswith(prefix)]:
+            del self.folders[path]
+
+    def changes(self, timeout: float) -> Set[str]:
+        """Wait up to timeout seconds and, once per interval, return the relative folders that changed."""
+        wait = self.next_poll - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return set()
+        if wait > 0:
+            time.sleep(wait)
+        self.next_poll = time.monotonic() + self.interval
+
+        changed = set()
+        # Parents first, so a vanished subtree is reported once by its parent
+        for relative_path in sorted(self.folders, key=depth):
+            if relative_path not in self.folders:
+                continue
+            old_mtime, old_children = self.folders[relative_path]
+            try:
+                mtime = os.stat(self.root / relative_path).st_mtime_ns
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            # Creating, renaming or deleting a sub-folder updates the folder's mtime
+            if mtime == old_mtime:
+                continue
+
+            children = self._record(relative_path)
+            for name in old_children ^ children:
+                child = os.path.join(relative_path, name)
+                changed.add(child)
+                if depth(child) < ALBUM_DEPTH:
+                    self._forget_tree(child)
+                    if name in children:
+                        self._record_tree(child)
+
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class CollectionWatcher:
+    """Applies folder changes in the collection to a CollectionMatcher's index as they happen."""
+
+    def __init__(self, matcher, use_inotify: bool = True, interval: float = 30.0, settle: float = 2.0,
+                 save_delay: float = 10.0, on_change: Optional[Callable[[int, int], None]] = None):
+        """
+        Initialize the watcher.
+
+        Args:
+            matcher: CollectionMatcher whose index is kept current
+            use_inotify: Use inotify when available (polling otherwise)
+            interval: Seconds between polls when polling
+            settle: Seconds without new events before changes are applied (downloads arrive in bursts)
+            save_delay: Minimum seconds between writes of the persisted index/snapshot
+            on_change: Called with (albums removed, album folders indexed) after each update
+        """
+        self.matcher = matcher
+        self.root = matcher.collection_path
+        self.settle = settle
+        self.save_delay = save_delay
+        self.on_change = on_change
+        self.backend = None
+
+        if use_inotify and sys.platform.startswith('linux'):
+            try:
+                self.backend = InotifyBackend(self.root)
+            except OSError as e:
+                print(f"inotify unavailable ({e}), polling every {interval:.0f}s instead", file=sys.stderr)
+        if self.backend is None:
+            self.backend = PollingBackend(self.root, interval)
+
+        self.pending = set()
+        self.last_event = 0.0
+        # New album folders whose audio files have not arrived yet: relative path -> first seen
+        self.awaiting_audio = {}
+        self.dirty = False
+        self.last_save = time.monotonic()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @property
+    def mode(self) -> str:
+        return 'inotify' if isinstance(self.backend, InotifyBackend) else 'polling'
+
+    def _has_audio(self, relative_path: str) -> bool:
+        audio_extensions = load_kit_module("rileys-collection-matcher").AUDIO_EXTENSIONS
+        try:
+            return any(Path(entry.name).suffix.lower() in audio_extensions
+                       for entry in os.scandir(self.root / relative_path) if entry.is_file())
+        except (FileNotFoundError, NotADirectoryError):
+            return False
+
+    def _apply(self, paths: Set[str]) -> None:
+        removed, indexed = self.matcher.refresh_paths(list(paths))
+        self.dirty = True
+
+        # The file-name entry of an album needs its first track; check back until it lands
+        now = time.monotonic()
+        for relative_path in paths:
+            # A full refresh ('') comes from lost events, not new downloads
+            if not relative_path:
+                continue
+            album_paths = [relative_path]
+            for _ in range(ALBUM_DEPTH - depth(relative_path)):
+                album_paths = [os.path.join(path, name) for path in album_paths
+                               for name in list_folders(self.root / path)]
+            for album_path in album_paths:
+                if (self.root / album_path).is_dir() and not self._has_audio(album_path):
+                    self.awaiting_audio.setdefault(album_path, now)
+
+        if self.on_change:
+            self.on_change(removed, indexed)
+
+    def _check_awaiting_audio(self) -> Set[str]:
+        ready = set()
+        now = time.monotonic()
+        for relative_path, first_seen in list(self.awaiting_audio.items()):
+            if self._has_audio(relative_path):
+                ready.add(relative_path)
+            elif now - first_seen < 3600 and (self.root / relative_path).is_dir():
+                continue
+            del self.awaiting_audio[relative_path]
+        return ready
+
+    def save(self) -> None:
+        """Write the matcher's persisted index and snapshot, if it has them."""
+        if self.matcher.index_file:
+            self.matcher.save_index()
+        if self.matcher.snapshot_file:
+            self.matcher.save_snapshot()
+        self.dirty = False
+        self.last_save = time.monotonic()
+
+    def poll_once(self, timeout: float = 1.0) -> None:
+        """Collect changes for up to timeout seconds and apply them once they have settled."""
+        changed = self.backend.changes(timeout)
+        now = time.monotonic()
+        if changed:
+            self.pending |= changed
+            self.last_event = now
+
+        if self.pending and now - self.last_event >= self.settle:
+            paths, self.pending = self.pending, set()
+            self._apply(paths)
+
+        ready = self._check_awaiting_audio()
+        if ready:
+            self._apply(ready)
+
+        if self.dirty and now - self.last_save >= self.save_delay:
+            self.save()
+
+    def run(self) -> None:
+        """Watch until stop() is called."""
+        try:
+            while not self.stop_event.is_set():
+                self.poll_once()
+        finally:
+            if self.dirty:
+                self.save()
+            self.backend.close()
+
+    def start(self) -> 'CollectionWatcher':
+        """Watch in a background thread."""
+        self.thread = threading.Thread(target=self.run, name="collection-watcher", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Keep the collection index current as album and artist folders change",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                      # inotify on Linux, polling elsewhere
+  %(prog)s --poll --interval 60
+        """
+    )
+    parser.add_argument('--poll', action='store_true', help='Poll folder mtimes even if inotify is available')
+    parser.add_argument('--interval', type=float, default=30, help='Seconds between polls (default: 30)')
+    parser.add_argument('--settle', type=float, default=2, help='Quiet seconds before applying changes (default: 2)')
+    parser.add_argument('--rescan', action='store_true', help='Rescan the collection before watching')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Report every update')
+
+    args = parser.parse_args()
+
+    matcher_module = load_kit_module("rileys-collection-matcher")
+    with redirect_stdout(sys.stderr):
+        matcher = matcher_module.load_indexed_matcher(rescan=args.rescan)
+
+    if not matcher.collection_path.exists():
+        print(f"Collection not mounted at {matcher.collection_path}", file=sys.stderr)
+        sys.exit(1)
+
+    def report(removed: int, indexed: int) -> None:
+        if args.verbose:
+            stats = matcher.get_collection_stats()
+            print(f"Index updated: -{removed} +{indexed} "
+                  f"({stats['total_albums']} albums, {stats['total_artists']} artists)", file=sys.stderr)
+
+    watcher = CollectionWatcher(matcher, use_inotify=not args.poll, interval=args.interval,
+                                settle=args.settle, on_change=report)
+    print(f"Watching {matcher.collection_path} ({watcher.mode})", file=sys.stderr)
+
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("\nStopped", file=sys.stderr)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
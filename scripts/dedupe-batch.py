@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Dedupe Batch - Collapse duplicate albums in a batch file before resolving
+
+Batch files put together from several sources often list one album several
+times, spelled differently or with edition suffixes ("(Remastered)",
+"[Deluxe]", "2011 Remaster"). Every line costs a resolver run and its API
+requests, so this keeps only the first line of each album.
+
+Lines are compared with the collection matcher's normalization
+(CollectionMatcher._normalize_text), so "The Beatles - Abbey Road
+(Remastered)" and "Beatles: Abbey Road [Deluxe]" are the same album, just
+as they would match the same folder in the collection. Comments, blank
+lines and lines that cannot be parsed are kept as they are (with --format
+jsonl, comments and blank lines are dropped).
+
+Usage:
+    python3 dedupe-batch.py albums.txt > unique.txt
+    cat albums.txt | python3 dedupe-batch.py --verbose
+    python3 dedupe-batch.py --format jsonl albums.txt > unique.jsonl
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import sys
+import argparse
+import importlib.util
+from pathlib import Path
+from typing import List, Tuple
+
+
+def load_kit_module(name: str):
+    """Load a shared module from DeemixKit's scripts/ folder (file names contain dashes)."""
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    module_file = Path(__file__).resolve().parent / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def dedupe_lines(lines: List[str]) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Drop lines naming an album an earlier line already names.
+
+    Returns:
+        (kept lines in input order, [(dropped line, line it duplicates), ...])
+    """
+    parse_line = load_kit_module("skip-owned").parse_line
+    normalize = load_kit_module("rileys-collection-matcher").CollectionMatcher._normalize_text
+
+    first_seen = {}
+    kept = []
+    dropped = []
+    for line in lines:
+        stripped = line.strip()
+        parsed = parse_line(stripped) if stripped and not stripped.startswith('#') else None
+        key = (normalize(parsed[0]), normalize(parsed[1])) if parsed else None
+        # A name that normalizes to nothing cannot be compared; keep the line
+        if key and all(key):
+            if key in first_seen:
+                dropped.append((line, first_seen[key]))
+                continue
+            first_seen[key] = line
+        kept.append(line)
+    return kept, dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Collapse 'Artist - Album' lines that name the same album",
+        epilog="Example: python3 dedupe-batch.py albums.txt > unique.txt"
+    )
+    parser.add_argument('file', nargs='?', help='Input file (default: stdin)')
+    parser.add_argument('--verbose', '-v', action='store_true', help='List collapsed lines')
+    parser.add_argument('--format', choices=['text', 'jsonl'], default='text',
+                        help='Output format: the kept lines, or one JSON record per kept album (comments dropped)')
+
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, 'r') as f:
+            lines = f.read().splitlines()
+    else:
+        lines = sys.stdin.read().splitlines()
+
+    kept, dropped = dedupe_lines(lines)
+    if args.format == 'jsonl':
+        output = load_kit_module("kit-output")
+        parse_line = load_kit_module("skip-owned").parse_line
+        for line in output.input_lines(kept):
+            output.emit_line(line, *(parse_line(line) or ()))
+    else:
+        for line in kept:
+            print(line)
+
+    if args.verbose:
+        for line, original in dropped:
+            print(f"  = {line.strip()}  (same as: {original.strip()})", file=sys.stderr)
+    print(f"Collapsed {len(dropped)} duplicate albums, saving {len(dropped)} resolver requests",
+          file=sys.stderr)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
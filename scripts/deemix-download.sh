@@ -5,6 +5,7 @@ SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 BITRATE="3"
 OUTPUT_PATH=""
 PORTABLE=false
+REQUEUE=false
 
 while [[ $# -gt 0 ]]; do
   case $1 in
@@ -20,6 +21,10 @@ while [[ $# -gt 0 ]]; do
       PORTABLE=true
       shift
       ;;
+    -r|--requeue)
+      REQUEUE=true
+      shift
+      ;;
     -h|--help)
       echo "Usage: $0 [OPTIONS] URL..."
       echo ""
@@ -27,6 +32,7 @@ while [[ $# -gt 0 ]]; do
       echo "  -b, --bitrate TEXT    Bitrate: 1 (MP3 128), 3 (MP3 320), 9 (FLAC)"
       echo "  -p, --path TEXT       Download directory"
       echo "  --portable            Use portable config folder"
+      echo "  -r, --requeue         Download albums the ledger has as done or downloading again"
       echo "  -h, --help            Show this message"
       echo ""
       echo "Examples:"
@@ -65,4 +71,30 @@ for url in "$@"; do
   clean_urls+=("$clean_url")
 done
 
+LEDGER="$SCRIPT_DIR/kit-ledger.py"
+
+# Skip albums that are downloaded or being downloaded (failed ones are retried, as by
+# deemix-queue); a ledger error downloads everything
+if [ "$REQUEUE" = false ] && new_urls=$(python3 "$LEDGER" filter --only downloading --only done "${clean_urls[@]}"); then
+  clean_urls=()
+  while IFS= read -r url; do
+    [ -n "$url" ] && clean_urls+=("$url")
+  done <<< "$new_urls"
+  if [ ${#clean_urls[@]} -eq 0 ]; then
+    echo "Nothing to download (use --requeue to download again)"
+    exit 0
+  fi
+fi
+
+# Record the albums in the download ledger so other runs do not queue them again
+python3 "$LEDGER" downloading --source deemix-download "${clean_urls[@]}"
+
 python3 "$DEEMIX_MAIN" $PORTABLE_FLAG -b "$BITRATE" $OUTPUT_PATH "${clean_urls[@]}"
+DEEMIX_EXIT=$?
+
+if [ $DEEMIX_EXIT -eq 0 ]; then
+  python3 "$LEDGER" done --source deemix-download "${clean_urls[@]}"
+else
+  python3 "$LEDGER" failed --source deemix-download "${clean_urls[@]}"
+fi
+exit $DEEMIX_EXIT
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Deemix Download Queue for DeemixKit
+
+Downloads resolved album URLs through deemix's Python API in-process,
+instead of pasting them into the Deemix app or starting one deemix process
+per URL. Runs a configurable number of albums in parallel, reports
+per-album progress and retries albums that fail.
+
+Reads album URLs from arguments or stdin (one per line, or the JSONL
+records of a resolver run with --format jsonl), so any resolver can feed
+it directly:
+
+    python3 discography-resolver.py -b "Radiohead" -a "OK Computer" | \\
+        python3 deemix-queue.py -b 9 -j 3
+
+The backend only needs the `deezer` and `deemix` packages on the import
+path. bench/stub-deemix provides stand-ins with scripted delays and
+failures, and bench/queue-check.py runs the queue against them without
+touching the network:
+
+    PYTHONPATH=bench/stub-deemix python3 scripts/deemix-queue.py --config-folder /tmp/deemix ...
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable
+
+# Configuration
+DEEMIX_CONFIG_DIR = Path(os.environ.get("DEEMIX_DATA_DIR", Path.home() / ".config" / "deemix"))
+LOG_DIR = Path.home() / ".local" / "log" / "deemix-queue"
+LOG_FILE = LOG_DIR / "deemix-queue.log"
+FAILED_FILE = LOG_DIR / "failed.txt"
+
+# Deemix bitrate codes, as used by deemix-download.sh
+BITRATE_NAMES = {1: "MP3 128", 3: "MP3 320", 9: "FLAC"}
+
+
+def load_kit_module(name: str):
+    """Load a shared module from DeemixKit's scripts/ folder (file names contain dashes)."""
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    module_file = Path(__file__).resolve().parent / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def setup_logging(verbose: bool = False) -> None:
+    """Set up queued, size-rotated logging to LOG_FILE (once per process, see kit-logging)."""
+    format_str = '%(asctime)s - %(name)s - %(levelname)s - %(threadName)s - %(message)s'
+    load_kit_module("kit-logging").setup_logging(LOG_FILE, verbose, format_str)
+
+
+class DownloadError(Exception):
+    """Raised by a backend when an album could not be downloaded completely."""
+
+
+class ProgressListener:
+    """deemix listener that forwards download progress for one album to a callback."""
+
+    def __init__(self, on_progress: Callable[[float], None]):
+        self.on_progress = on_progress
+
+    def send(self, key: str, value: Any = None) -> None:
+        if key == 'updateQueue' and isinstance(value, dict) and 'progress' in value:
+            self.on_progress(float(value['progress']))
+
+
+class DeemixBackend:
+    """Downloads albums through deemix's Python API, one logged-in Deezer client per worker thread."""
+
+    def __init__(self, config_folder: Path = DEEMIX_CONFIG_DIR, bitrate: int = 3,
+                 output_path: Optional[str] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            config_folder: deemix config folder (holds config.json and .arl)
+            bitrate: Deemix bitrate code (1, 3 or 9)
+            output_path: Download directory (defaults to deemix's own setting)
+        """
+        # Imported here so --help works without deemix installed
+        from deemix.settings import load as load_settings
+
+        self.config_folder = Path(config_folder)
+        self.bitrate = bitrate
+        self.settings = load_settings(self.config_folder)
+        if output_path:
+            self.settings['downloadLocation'] = output_path
+
+        arl_file = self.config_folder / ".arl"
+        if not arl_file.exists():
+            raise DownloadError(f"No ARL found at {arl_file} - log in with deemix first")
+        self.arl = arl_file.read_text().strip()
+        self.local = threading.local()
+
+    def _client(self):
+        """Return this thread's logged-in Deezer client."""
+        if getattr(self.local, 'dz', None) is None:
+            from deezer import Deezer
+
+            dz = Deezer()
+            if not dz.login_via_arl(self.arl):
+                raise DownloadError("Deezer login failed - ARL may have expired")
+            self.local.dz = dz
+        return self.local.dz
+
+    def download(self, url: str, on_progress: Callable[[float], None]) -> str:
+        """
+        Download one album and return its 'Artist - Title' label.
+
+        Raises:
+            DownloadError: If any track of the album failed
+        """
+        from deemix import generateDownloadObject
+        from deemix.downloader import Downloader
+
+        dz = self._client()
+        listener = ProgressListener(on_progress)
+        download_object = generateDownloadObject(dz, url, self.bitrate, listener=listener)
+        if isinstance(download_object, list):
+            download_object = download_object[0]
+
+        Downloader(dz, download_object, self.settings, listener).start()
+
+        label = f"{download_object.artist} - {download_object.title}"
+        if download_object.failed:
+            raise DownloadError(f"{download_object.failed} of {download_object.size} tracks failed: {label}")
+        return label
+
+
+class DownloadQueue:
+    """Runs album downloads on a worker pool with retries and progress reporting."""
+
+    def __init__(self, backend, workers: int = 2, retries: int = 2, retry_delay: float = 5.0,
+                 report: Optional[Callable[[str], None]] = None, ledger=None):
+        """
+        Initialize the queue.
+
+        Args:
+            backend: Object with download(url, on_progress) -> label
+            workers: Number of albums downloaded in parallel
+            retries: Extra attempts per album after the first failure
+            retry_delay: Base delay in seconds between attempts (doubles each time)
+            report: Called with one line of progress text at a time
+            ledger: Download ledger (kit-ledger) that gets each album's status, if any
+        """
+        self.backend = backend
+        self.workers = workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.report = report or (lambda line: print(line, file=sys.stderr))
+        self.ledger = ledger
+        self.lock = threading.Lock()
+        self.total = 0
+        self.done = 0
+
+    def _emit(self, line: str) -> None:
+        with self.lock:
+            self.report(line)
+
+    def _mark(self, url: str, status: str) -> None:
+        if self.ledger is not None:
+            self.ledger.mark([url], status, source='deemix-queue')
+
+    def _download_one(self, index: int, url: str) -> Dict[str, Any]:
+        """Download one album, retrying on failure."""
+        tag = f"[{index}/{self.total}]"
+        last_reported = [-1]
+        self._mark(url, 'downloading')
+
+        def on_progress(progress: float) -> None:
+            # Report in 25% steps so parallel albums don't flood the terminal
+            step = int(progress // 25) * 25
+            if step > last_reported[0]:
+                last_reported[0] = step
+                self._emit(f"{tag} {url} {step}%")
+
+        error = None
+        queued = time.monotonic()
+        for attempt in range(1, self.retries + 2):
+            started = time.monotonic()
+            try:
+                label = self.backend.download(url, on_progress)
+                elapsed = time.monotonic() - started
+                with self.lock:
+                    self.done += 1
+                    self.report(f"{tag} ✓ {label} ({elapsed:.0f}s) - {self.done}/{self.total} done")
+                logging.info(f"Downloaded {url} ({label}) in {elapsed:.1f}s, attempt {attempt}")
+                self._mark(url, 'done')
+                return {'url': url, 'label': label, 'ok': True, 'attempts': attempt,
+                        'seconds': round(time.monotonic() - queued, 1)}
+            except Exception as e:
+                error = e
+                logging.warning(f"Attempt {attempt} failed for {url}: {e}")
+                if attempt <= self.retries:
+                    delay = self.retry_delay * 2 ** (attempt - 1)
+                    self._emit(f"{tag} ✗ {url}: {e} - retrying in {delay:.0f}s")
+                    time.sleep(delay)
+
+        self._emit(f"{tag} ✗ {url}: {error} - giving up")
+        self._mark(url, 'failed')
+        return {'url': url, 'label': None, 'ok': False, 'attempts': self.retries + 1,
+                'seconds': round(time.monotonic() - queued, 1), 'error': str(error)}
+
+    def run(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """
+        Download every URL and return one result dict per URL, in input order.
+        """
+        self.total = len(urls)
+        self.done = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="album") as executor:
+            return list(executor.map(self._download_one, range(1, len(urls) + 1), urls))
+
+
+def read_urls(args: argparse.Namespace) -> List[str]:
+    """Read album URLs (or JSONL records with a url) from arguments or stdin, dropping duplicates."""
+    lines = args.urls if args.urls else sys.stdin.read().splitlines()
+    urls = []
+    for line in lines:
+        line = line.strip()
+        if line.startswith('{'):
+            record = load_kit_module("kit-output").parse_record(line)
+            line = (record or {}).get('url') or ''
+        if line.startswith('http'):
+            urls.append(line)
+    return list(dict.fromkeys(urls))
+
+
+def emit_records(results: List[Dict[str, Any]]) -> None:
+    """Write one JSONL record per album (see kit-output); title is deemix's label for the album."""
+    output = load_kit_module("kit-output")
+    album_key = load_kit_module("kit-ledger").album_key
+    for result in results:
+        provider, _, album_id = (album_key(result['url']) or '').partition(':')
+        record = {
+            'input': result['url'],
+            'url': result['url'],
+            'id': album_id or None,
+            'artist': None,
+            'title': result['label'],
+            'provider': provider or None,
+            'type': 'album',
+            'cached': False,
+            'seconds': result['seconds'],
+            'status': 'done' if result['ok'] else 'failed',
+            'attempts': result['attempts'],
+        }
+        if not result['ok']:
+            record['error'] = result['error']
+        output.emit(record)
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Download album URLs through deemix in-process with parallelism and retries",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s https://www.deezer.com/album/302127
+  %(prog)s -b 9 -j 3 < urls.txt
+  discography-resolver.py -b "Pink Floyd" -a "The Wall" | %(prog)s -b 9
+  %(prog)s < ~/.local/log/deemix-queue/failed.txt  # Retry the last failures
+  deezer-resolver.py --format jsonl < albums.txt | %(prog)s --format jsonl
+        """
+    )
+
+    parser.add_argument(
+        'urls',
+        nargs='*',
+        help='Album URLs (read from stdin if omitted)'
+    )
+    parser.add_argument(
+        '--bitrate', '-b',
+        type=int,
+        choices=sorted(BITRATE_NAMES),
+        default=3,
+        help='Bitrate: 1 (MP3 128), 3 (MP3 320), 9 (FLAC) (default: 3)'
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=2,
+        help='Albums downloaded in parallel (default: 2)'
+    )
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=2,
+        help='Retries per failed album (default: 2)'
+    )
+    parser.add_argument(
+        '--retry-delay',
+        type=float,
+        default=5.0,
+        help='Seconds before the first retry, doubled for each one after (default: 5)'
+    )
+    parser.add_argument(
+        '--requeue',
+        action='store_true',
+        help='Also download albums the ledger has as done or being downloaded by another queue'
+    )
+    parser.add_argument(
+        '--path', '-p',
+        help='Download directory (default: deemix setting)'
+    )
+    parser.add_argument(
+        '--config-folder',
+        type=str,
+        default=str(DEEMIX_CONFIG_DIR),
+        help=f'deemix config folder (default: {DEEMIX_CONFIG_DIR})'
+    )
+    parser.add_argument(
+        '--format',
+        choices=['text', 'jsonl'],
+        default='text',
+        help='Output format: text progress on stderr only, or also one JSON record per album on stdout'
+    )
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose logging'
+    )
+
+    args = parser.parse_args()
+
+    setup_logging(args.verbose)
+    logger = logging.getLogger(__name__)
+
+    urls = read_urls(args)
+    if not urls:
+        print("No album URLs provided", file=sys.stderr)
+        sys.exit(1)
+
+    ledger = load_kit_module("kit-ledger").open_ledger()
+    if not args.requeue:
+        # Queued and failed albums are what this queue is for; skip only finished or running ones
+        urls, in_hand = ledger.filter_new(urls, only=('downloading', 'done'))
+        if in_hand:
+            print(f"Skipped {len(in_hand)} albums already downloaded or downloading", file=sys.stderr)
+        if not urls:
+            sys.exit(0)
+
+    try:
+        backend = DeemixBackend(Path(args.config_folder), args.bitrate, args.path)
+    except ImportError as e:
+        print(f"Error: deemix is not installed ({e})", file=sys.stderr)
+        print("Install with: pip install deemix", file=sys.stderr)
+        sys.exit(1)
+    except DownloadError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Downloading {len(urls)} albums as {BITRATE_NAMES[args.bitrate]}, "
+          f"{args.jobs} at a time...", file=sys.stderr)
+    logger.info(f"Queue started: {len(urls)} albums, bitrate {args.bitrate}, {args.jobs} workers")
+
+    try:
+        results = DownloadQueue(backend, workers=args.jobs, retries=args.retries,
+                               retry_delay=args.retry_delay, ledger=ledger).run(urls)
+    except KeyboardInterrupt:
+        logger.warning("Interrupted by user")
+        print("\nInterrupted by user", file=sys.stderr)
+        sys.exit(130)
+
+    failed = [result['url'] for result in results if not result['ok']]
+    print(f"\nDownloaded {len(results) - len(failed)} albums, {len(failed)} failed", file=sys.stderr)
+    logger.info(f"Queue finished: {len(results) - len(failed)} ok, {len(failed)} failed")
+
+    if args.format == 'jsonl':
+        emit_records(results)
+
+    if failed:
+        FAILED_FILE.write_text('\n'.join(failed) + '\n')
+        print(f"Failed URLs saved to {FAILED_FILE}", file=sys.stderr)
+        sys.exit(1)
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
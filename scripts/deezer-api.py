@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Deezer API helpers shared by the DeemixKit resolvers
+
+Provides a pooled HTTP session, a thread-safe rate limiter that keeps
+concurrent callers under Deezer's public quota, and a cached, concurrent
+album details lookup used to drop albums that cannot be downloaded.
+
+Loaded by the resolvers with importlib (the file name contains dashes).
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import sys
+import json
+import logging
+import threading
+import importlib.util
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterable
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+
+# Configuration
+CACHE_DIR = Path.home() / ".config" / "deemixkit"
+ALBUM_DETAILS_CACHE_FILE = CACHE_DIR / "album-details.json"
+ALBUM_DETAILS_TTL = 7 * 24 * 3600  # Availability changes rarely, re-check weekly
+
+# Deezer API endpoints (API base can point at a local stand-in server)
+DEEZER_API_BASE = os.environ.get("DEEMIXKIT_DEEZER_API", "https://api.deezer.com")
+DEEZER_ALBUM_API = DEEZER_API_BASE + "/album/{album_id}"
+
+# Deezer allows 50 requests per 5 seconds per client
+DEEZER_RATE_LIMIT = 50
+DEEZER_RATE_PERIOD = 5.0
+
+# Error code of Deezer's "no data" answer; every other error code (quota,
+# service busy, ...) is temporary and says nothing about the album
+DEEZER_DATA_NOT_FOUND = 800
+
+
+def _metrics():
+    """The kit-metrics module when the running tool collects metrics, else None."""
+    return sys.modules.get('kit_metrics')
+
+
+def _kit_cache():
+    """The kit-cache module, loaded from next to this file on first use."""
+    module = sys.modules.get('kit_cache')
+    if module is None:
+        spec = importlib.util.spec_from_file_location('kit_cache', Path(__file__).resolve().parent / "kit-cache.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['kit_cache'] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+def _catalog():
+    """The kit-catalog module when the running tool keeps the local catalog, else None."""
+    return sys.modules.get('kit_catalog')
+
+
+class RateLimiter:
+    """Token bucket shared by all threads issuing requests against one API."""
+
+    def __init__(self, rate: int = DEEZER_RATE_LIMIT, period: float = DEEZER_RATE_PERIOD):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            rate: Number of requests allowed per period
+            period: Period length in seconds
+        """
+        self.capacity = float(rate)
+        self.fill_rate = rate / period
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    metrics = _metrics()
+                    if metrics:
+                        metrics.observe('rate_limiter_wait', waited)
+                    return waited
+                delay = (1 - self.tokens) / self.fill_rate
+            time.sleep(delay)
+            waited += delay
+
+
+def create_pooled_session(config: Dict[str, Any], pool_size: int = 8) -> requests.Session:
+    """Create a requests session with retry strategy and a connection pool sized for pool_size threads."""
+    session = requests.Session()
+
+    retry_strategy = Retry(
+        total=config.get("max_retries", 3),
+        backoff_factor=config.get("retry_delay", 1),
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"]
+    )
+
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    session.headers.update({
+        'User-Agent': config.get("user_agent", "DeemixKit/1.0"),
+        'Accept': 'application/json',
+        'Accept-Language': 'en-US,en;q=0.9'
+    })
+
+    return session
+
+
+class AlbumDetailsCache:
+    """Cache of the album fields DeemixKit needs, keyed by Deezer album id, kept in the kit-cache backend."""
+
+    NAMESPACE = 'album-details'
+
+    def __init__(self, backend=None, ttl: int = ALBUM_DETAILS_TTL):
+        self.backend = backend if backend is not None else _kit_cache().open_backend()
+        self.ttl = ttl
+        self.entries = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self._import_legacy_file()
+
+    def _import_legacy_file(self) -> None:
+        """Move the entries of the old album-details.json into the backend, once."""
+        if not ALBUM_DETAILS_CACHE_FILE.exists():
+            return
+        try:
+            with open(ALBUM_DETAILS_CACHE_FILE, 'r') as f:
+                entries = json.load(f)
+            now = time.time()
+            for album_id, entry in entries.items():
+                remaining = self.ttl - (now - entry.get('fetched_at', 0))
+                if remaining > 0:
+                    self.backend.set(self.NAMESPACE, album_id, entry, ttl=remaining)
+            ALBUM_DETAILS_CACHE_FILE.replace(ALBUM_DETAILS_CACHE_FILE.with_suffix('.json.imported'))
+        except (json.JSONDecodeError, IOError, AttributeError) as e:
+            logging.warning(f"Error importing album details cache file: {e}")
+
+    def load(self, album_ids: Iterable[str]) -> None:
+        """Fetch the entries of many albums from the backend in one round trip."""
+        wanted = [str(album_id) for album_id in album_ids if str(album_id) not in self.entries]
+        found = self.backend.get_many(self.NAMESPACE, wanted) if wanted else {}
+        with self.lock:
+            self.entries.update(found)
+
+    def get(self, album_id: str) -> Optional[Dict[str, Any]]:
+        """Return cached details for album_id, or None when missing or expired."""
+        album_id = str(album_id)
+        with self.lock:
+            loaded = album_id in self.entries
+        if not loaded:
+            self.load([album_id])
+        with self.lock:
+            entry = self.entries.get(album_id)
+        fresh = entry is not None and time.time() - entry.get('fetched_at', 0) < self.ttl
+        metrics = _metrics()
+        if metrics:
+            metrics.incr('album_details_cache_hits' if fresh else 'album_details_cache_misses')
+        return entry if fresh else None
+
+    def put(self, album_id: str, details: Dict[str, Any]) -> None:
+        """Store details for album_id."""
+        with self.lock:
+            self.entries[str(album_id)] = details
+            self.pending[str(album_id)] = details
+
+    def save(self) -> None:
+        """Write the entries stored since the last save to the backend."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        self.backend.set_many(self.NAMESPACE, pending, ttl=self.ttl)
+
+
+def summarize_album(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Reduce a full album/{id} response to the fields kept in the cache.
+
+    Returns None for errors that say nothing about the album (quota,
+    service busy, ...), so the lookup counts as failed and is not cached.
+    """
+    if 'error' in data:
+        # Deezer answers 200 with an error object, for removed or unknown albums
+        # (DataException, code 800) as well as for temporary failures
+        error = data['error']
+        if error.get('code') != DEEZER_DATA_NOT_FOUND:
+            return None
+        return {'available': False, 'error': error.get('message', 'Unknown error'),
+                'fetched_at': time.time()}
+
+    tracks = data.get('tracks', {}).get('data', [])
+    return {
+        'id': data.get('id'),
+        'title': data.get('title', ''),
+        'artist': data.get('artist', {}).get('name', ''),
+        'record_type': data.get('record_type', ''),
+        'release_date': data.get('release_date', ''),
+        'available': data.get('available', True),
+        'nb_tracks': data.get('nb_tracks', len(tracks)),
+        'duration': data.get('duration', 0),
+        'readable_tracks': sum(1 for track in tracks if track.get('readable', True)),
+        'fetched_at': time.time()
+    }
+
+
+def is_album_available(details: Dict[str, Any]) -> bool:
+    """True unless the album is marked unavailable or none of its tracks are readable."""
+    if not details.get('available', True):
+        return False
+    if details.get('nb_tracks') and details.get('readable_tracks') == 0:
+        return False
+    return True
+
+
+def fetch_album_details(album_ids: Iterable[str], config: Dict[str, Any],
+                        max_workers: int = 8,
+                        cache: Optional[AlbumDetailsCache] = None,
+                        limiter: Optional[RateLimiter] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch album details for many albums concurrently.
+
+    Cached albums cost nothing; the rest are fetched through a pooled session
+    by max_workers threads sharing one rate limiter. Albums whose lookup
+    fails are left out of the result rather than being guessed at.
+
+    Returns:
+        Dict[str, Dict]: Album details keyed by album id
+    """
+    cache = cache if cache is not None else AlbumDetailsCache()
+    limiter = limiter if limiter is not None else RateLimiter()
+    results = {}
+    missing = []
+
+    album_ids = list(dict.fromkeys(str(album_id) for album_id in album_ids))
+    cache.load(album_ids)
+    for album_id in album_ids:
+        cached = cache.get(album_id)
+        if cached is not None:
+            results[album_id] = cached
+        else:
+            missing.append(album_id)
+
+    logging.info(f"Album details: {len(results)} cached, {len(missing)} to fetch")
+    if not missing:
+        return results
+
+    session = create_pooled_session(config, pool_size=max_workers)
+
+    metrics = _metrics()
+    catalog = _catalog()
+
+    def fetch(album_id: str) -> Optional[Dict[str, Any]]:
+        # Worker threads start outside any stage, so name theirs for the metrics
+        with metrics.stage('album_details') if metrics else nullcontext():
+            limiter.acquire()
+            try:
+                response = session.get(DEEZER_ALBUM_API.format(album_id=album_id),
+                                       timeout=config.get("timeout", 10))
+                response.raise_for_status()
+                data = response.json()
+                if catalog:
+                    catalog.record(data)
+                details = summarize_album(data)
+                if details is None:
+                    logging.error(f"Error fetching album {album_id}: {data['error'].get('message', 'Unknown error')}")
+                return details
+            except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+                logging.error(f"Error fetching album {album_id}: {e}")
+                return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for album_id, details in zip(missing, executor.map(fetch, missing)):
+            if details is not None:
+                cache.put(album_id, details)
+                results[album_id] = details
+
+    try:
+        cache.save()
+    except IOError as e:
+        logging.warning(f"Error saving album details cache: {e}")
+
+    return results
+
+
+def filter_available_albums(album_ids: List[str], config: Dict[str, Any], max_workers: int = 8) -> List[str]:
+    """
+    Return the album ids that are available for download, in their original order.
+
+    Albums whose details could not be fetched are kept, so a network hiccup
+    never silently drops part of a discography.
+    """
+    details = fetch_album_details(album_ids, config, max_workers=max_workers)
+    available = []
+    for album_id in album_ids:
+        album_details = details.get(str(album_id))
+        if album_details is None or is_album_available(album_details):
+            available.append(album_id)
+        else:
+            logging.info(f"Dropping unavailable album {album_id}: {album_details.get('title', '')}")
+    return available
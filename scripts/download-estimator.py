@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Download Estimator for DeemixKit
+
+Estimates how much disk space and transfer time a list of Deezer album URLs
+needs at each Deemix bitrate, and trims the list to a disk or time budget
+before anything is downloaded.
+
+Reads album URLs from arguments or stdin (one per line, or the JSONL
+records of a resolver run with --format jsonl) and writes the URLs that fit
+the budget to stdout, so it can sit between a resolver and Deemix:
+
+    python3 discography-resolver.py -b "Radiohead" -a "OK Computer" | \\
+        python3 download-estimator.py -b 9 --max-size 20G
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import sys
+import re
+import logging
+import argparse
+import importlib.util
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+# Configuration
+LOG_DIR = Path.home() / ".local" / "log" / "download-estimator"
+LOG_FILE = LOG_DIR / "download-estimator.log"
+
+DEEZER_ALBUM_PATTERN = re.compile(r'deezer\.com/(?:[a-z]{2}/)?album/(\d+)')
+
+# Average bitrates in kbit/s for the Deemix bitrate codes used by deemix-download.sh
+BITRATES = {
+    '1': ('MP3 128', 128),
+    '3': ('MP3 320', 320),
+    '9': ('FLAC', 900),  # 16-bit/44.1 kHz FLAC averages 700-1100 kbit/s
+}
+
+SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+TIME_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600}
+
+
+def load_kit_module(name: str):
+    """Load a shared module from DeemixKit's scripts/ folder (file names contain dashes)."""
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    module_file = Path(__file__).resolve().parent / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def start_rate_budget(priority: str = 'batch') -> None:
+    """Schedule Deezer requests through the shared rate budget at this priority class (see kit-cache)."""
+    load_kit_module("kit-cache").install_rate_budget(os.environ.get("DEEMIXKIT_PRIORITY") or priority)
+
+
+def setup_logging(verbose: bool = False) -> None:
+    """Set up queued, size-rotated logging to LOG_FILE (once per process, see kit-logging)."""
+    load_kit_module("kit-logging").setup_logging(LOG_FILE, verbose)
+
+
+def parse_size(value: str) -> int:
+    """Parse a size such as '500M', '20G' or '1.5T' into bytes."""
+    match = re.match(r'^\s*([\d.]+)\s*([KMGT]?)i?B?\s*$', value, re.IGNORECASE)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid size: {value} (use e.g. 500M, 20G, 1.5T)")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def parse_duration(value: str) -> float:
+    """Parse a duration such as '90m', '2h' or '3600' into seconds."""
+    match = re.match(r'^\s*([\d.]+)\s*([smh]?)\s*$', value, re.IGNORECASE)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid duration: {value} (use e.g. 90m, 2h, 3600)")
+    return float(match.group(1)) * TIME_UNITS[match.group(2).lower()]
+
+
+def format_size(num_bytes: float) -> str:
+    """Format bytes as a human readable size."""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as h:mm:ss."""
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def estimate_album_bytes(duration: int, bitrate: str) -> int:
+    """Estimate the download size of an album of duration seconds at a Deemix bitrate code."""
+    return int(duration * BITRATES[bitrate][1] * 1000 / 8)
+
+
+def read_urls(args: argparse.Namespace) -> List[str]:
+    """Read album URLs (or JSONL records with a url) from arguments or stdin."""
+    lines = args.urls if args.urls else sys.stdin.read().splitlines()
+    urls = []
+    for line in lines:
+        line = line.strip()
+        if line.startswith('{'):
+            record = load_kit_module("kit-output").parse_record(line)
+            line = (record or {}).get('url') or ''
+        if line.startswith('http'):
+            urls.append(line)
+    return urls
+
+
+def estimate(urls: List[str], config: Dict[str, Any], workers: int = 8) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    """
+    Pair every URL with its album details (nb_tracks, duration).
+
+    Details are fetched concurrently and cached by deezer-api. URLs that are
+    not Deezer albums, or whose details could not be fetched or are not on
+    Deezer, get None.
+    """
+    deezer_api = load_kit_module("deezer-api")
+    ids = {}
+    for url in urls:
+        match = DEEZER_ALBUM_PATTERN.search(url)
+        if match:
+            ids[url] = match.group(1)
+
+    details = deezer_api.fetch_album_details(ids.values(), config, max_workers=workers)
+    # Albums Deezer has no data for carry an error instead of a duration
+    details = {album_id: album for album_id, album in details.items() if 'error' not in album}
+    return [(url, details.get(ids[url]) if url in ids else None) for url in urls]
+
+
+def apply_budget(estimates: List[Tuple[str, Optional[Dict[str, Any]]]], bitrate: str,
+                 max_bytes: Optional[int], max_seconds: Optional[float],
+                 bandwidth: Optional[float]) -> Tuple[List[str], List[str]]:
+    """
+    Keep albums in input order until the next one would exceed a budget.
+
+    Albums without details cannot be sized: they are kept, uncounted, up to
+    the first album over the budget, so kept_urls stays a prefix of the input.
+
+    Returns:
+        Tuple[List[str], List[str]]: (kept_urls, trimmed_urls)
+    """
+    kept, trimmed = [], []
+    total_bytes = 0
+
+    for url, album in estimates:
+        if album is None:
+            (trimmed if trimmed else kept).append(url)
+            continue
+
+        album_bytes = estimate_album_bytes(album.get('duration', 0), bitrate)
+        over_size = max_bytes is not None and total_bytes + album_bytes > max_bytes
+        over_time = (max_seconds is not None and bandwidth
+                     and (total_bytes + album_bytes) / bandwidth > max_seconds)
+        if trimmed or over_size or over_time:
+            trimmed.append(url)
+            continue
+
+        total_bytes += album_bytes
+        kept.append(url)
+
+    return kept, trimmed
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Estimate download size/time for album URLs and trim to a budget",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Bitrates (same codes as deemix-download.sh):
+  1 = MP3 128, 3 = MP3 320, 9 = FLAC
+
+Examples:
+  %(prog)s https://www.deezer.com/album/302127
+  discography-resolver.py -b "Pink Floyd" -a "The Wall" | %(prog)s -b 9
+  %(prog)s -b 9 --max-size 20G < urls.txt
+  %(prog)s -b 3 --bandwidth 5M --max-time 1h --stop < urls.txt
+  %(prog)s -b 9 --max-size 20G --format jsonl < urls.txt  # One JSON record per kept album
+        """
+    )
+
+    parser.add_argument(
+        'urls',
+        nargs='*',
+        help='Album URLs (read from stdin if omitted)'
+    )
+    parser.add_argument(
+        '--bitrate', '-b',
+        choices=sorted(BITRATES),
+        default='3',
+        help='Bitrate used for budgeting: 1 (MP3 128), 3 (MP3 320), 9 (FLAC) (default: 3)'
+    )
+    parser.add_argument(
+        '--max-size',
+        type=parse_size,
+        help='Disk budget, e.g. 20G'
+    )
+    parser.add_argument(
+        '--bandwidth',
+        type=parse_size,
+        help='Download speed per second, e.g. 5M (used for time estimates)'
+    )
+    parser.add_argument(
+        '--max-time',
+        type=parse_duration,
+        help='Transfer time budget, e.g. 2h (requires --bandwidth)'
+    )
+    parser.add_argument(
+        '--stop',
+        action='store_true',
+        help='Exit with an error instead of trimming when the list exceeds the budget, '
+             'or when albums cannot be sized against it'
+    )
+    parser.add_argument(
+        '--allow-unknown',
+        action='store_true',
+        help='With --stop, let albums that cannot be sized (Spotify URLs, lookup failures) through uncounted'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Concurrent album lookups (default: 8)'
+    )
+    parser.add_argument(
+        '--format',
+        choices=['urls', 'jsonl'],
+        default='urls',
+        help='Output format: album URLs (default) or one JSON record per kept album with its estimate'
+    )
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose logging'
+    )
+
+    args = parser.parse_args()
+
+    if args.max_time is not None and not args.bandwidth:
+        parser.error("--max-time requires --bandwidth")
+
+    setup_logging(args.verbose)
+    start_rate_budget()
+    logger = logging.getLogger(__name__)
+
+    urls = read_urls(args)
+    if not urls:
+        print("No album URLs provided", file=sys.stderr)
+        sys.exit(1)
+
+    output = None
+    if args.format == 'jsonl':
+        output = load_kit_module("kit-output")
+        output.start()
+        # Details are looked up together, so every record carries the time of the whole lookup
+        results = {url: output.Result(url) for url in urls}
+
+    print(f"Estimating {len(urls)} albums...", file=sys.stderr)
+    estimates = estimate(urls, {"timeout": 10}, workers=args.workers)
+
+    sized = [album for _, album in estimates if album is not None]
+    total_tracks = sum(album.get('nb_tracks', 0) for album in sized)
+    total_duration = sum(album.get('duration', 0) for album in sized)
+
+    print(f"Albums: {len(sized)} sized, {len(urls) - len(sized)} unknown", file=sys.stderr)
+    print(f"Tracks: {total_tracks}, playing time {format_duration(total_duration)}", file=sys.stderr)
+    for code, (name, _) in sorted(BITRATES.items()):
+        total_bytes = estimate_album_bytes(total_duration, code)
+        line = f"  [{code}] {name:<8} {format_size(total_bytes):>10}"
+        if args.bandwidth:
+            line += f"  ~{format_duration(total_bytes / args.bandwidth)} at {format_size(args.bandwidth)}/s"
+        print(line, file=sys.stderr)
+    logger.info(f"Estimated {len(urls)} albums: {total_tracks} tracks, {total_duration}s")
+
+    unknown = len(urls) - len(sized)
+    if unknown and (args.max_size is not None or args.max_time is not None):
+        print(f"Warning: {unknown} albums could not be sized and are not counted against the budget",
+              file=sys.stderr)
+        logger.warning(f"{unknown} albums could not be sized against the budget")
+        if args.stop and not args.allow_unknown:
+            print("Budget cannot be checked, nothing emitted (use --allow-unknown to let them through)",
+                  file=sys.stderr)
+            sys.exit(1)
+
+    kept, trimmed = apply_budget(estimates, args.bitrate, args.max_size, args.max_time, args.bandwidth)
+
+    if trimmed:
+        if args.stop:
+            print(f"Over budget: {len(trimmed)} albums do not fit, nothing emitted", file=sys.stderr)
+            logger.warning(f"Over budget by {len(trimmed)} albums, stopping")
+            sys.exit(1)
+        print(f"Trimmed {len(trimmed)} albums to fit the budget", file=sys.stderr)
+        logger.info(f"Trimmed {len(trimmed)} albums to fit the budget")
+
+    if output:
+        details = dict(estimates)
+        for url in kept:
+            album = details.get(url) or {}
+            match = DEEZER_ALBUM_PATTERN.search(url)
+            results[url].emit(
+                url=url, id=match.group(1) if match else None,
+                artist=album.get('artist'), title=album.get('title'),
+                provider='deezer' if match else None,
+                tracks=album.get('nb_tracks'), duration=album.get('duration'),
+                bytes=estimate_album_bytes(album['duration'], args.bitrate) if 'duration' in album else None)
+    else:
+        for url in kept:
+            print(url)
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,7 @@ else
   for url in "${clean_urls[@]}"; do
     echo "$url"
   done | pbcopy
+  python3 "$SCRIPT_DIR/kit-ledger.py" queued --source download-to-deemix "${clean_urls[@]}"
 
   # Launch/activate Deemix and paste
   osascript "$SCRIPT_DIR/paste-to-deemix.applescript" 2>/dev/null
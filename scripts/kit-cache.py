@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Cache Backends for DeemixKit
+
+The caches the tools keep between runs (album details, Spotify access
+tokens, and with a shared backend also the catalog's resolution results)
+go through one small key-value interface with two implementations:
+
+  sqlite://PATH           local SQLite file (the default,
+                          ~/.config/deemixkit/cache.db)
+  redis://HOST:PORT/DB    a Redis server shared by several machines, spoken
+                          to over its wire protocol (no client library
+                          needed); bench/kv-server.py stands in for it in
+                          tests
+
+DEEMIXKIT_CACHE selects the backend. The backend also holds the rate
+budget that schedules Deezer requests: every request, from any tool on the
+machine (or on any machine sharing a redis:// backend), takes a slot in one
+fixed window of 50 requests per 5 seconds before it is sent.
+
+Requests belong to a priority class. Interactive resolves (one album, one
+URL) and batch traffic (batch downloads, discographies, playlists) may each
+take at most 40 slots of a window while the other class is active (took a
+slot in this window or the last). Neither class can use up the other's
+last 10 slots, so a hotkey resolve is never queued behind a batch job, and
+a batch job keeps moving under any amount of interactive use. A class
+running alone may take 48 slots; the last 2 are kept for the first
+requests of the other class.
+
+A networked backend that cannot be reached behaves like an empty cache
+and an unlimited budget, so a resolve never fails because of it.
+
+Loaded by the tools with importlib (the file name contains dashes):
+
+    cache = load_kit_module("kit-cache").open_backend()
+    cache.set("spotify-token", key, token, ttl=3000)
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import urllib.parse
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterable
+
+# Configuration
+CACHE_DIR = Path.home() / ".config" / "deemixkit"
+DEFAULT_URL = f"sqlite://{CACHE_DIR / 'cache.db'}"
+KEY_PREFIX = "deemixkit:"
+
+# Deezer allows 50 requests per 5 seconds per client; with a shared backend the budget is shared too
+DEEZER_API_BASE = os.environ.get("DEEMIXKIT_DEEZER_API", "https://api.deezer.com")
+DEEZER_BUDGET = ('deezer', 50, 5.0)
+
+# Priority classes; each may take every slot of a window except those reserved for the others
+PRIORITIES = ('interactive', 'batch')
+RESERVED_SLOTS = 10
+IDLE_RESERVED_SLOTS = 2
+
+_lock = threading.Lock()
+_backend = None
+
+
+def _metrics():
+    """The kit-metrics module when the running tool collects metrics, else None."""
+    return sys.modules.get('kit_metrics')
+
+
+class CacheBackend:
+    """
+    Interface of a cache backend: JSON values by namespace and key, with
+    optional expiry, plus fixed-window rate budgets.
+    """
+
+    # True when other machines see the same data
+    shared = False
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        """Values of the keys that are present and not expired."""
+        raise NotImplementedError
+
+    def set_many(self, namespace: str, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """Store values, expiring after ttl seconds (never when None)."""
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str) -> None:
+        raise NotImplementedError
+
+    def try_acquire(self, name: str, rate: int, period: float, priority: str = 'batch') -> float:
+        """
+        Take one slot of budget name (rate per period) for a priority class.
+
+        Returns:
+            float: 0 when a slot was taken, else seconds until the next window opens
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        return self.get_many(namespace, [key]).get(key)
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set_many(namespace, {key: value}, ttl)
+
+    def acquire(self, name: str, rate: int, period: float, priority: str = 'batch') -> float:
+        """
+        Block until budget name has a slot for priority.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(name, rate, period, priority)
+            if delay <= 0:
+                metrics = _metrics()
+                if metrics:
+                    metrics.observe(f'rate_budget_wait_{name}_{priority}', waited)
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+
+class SQLiteBackend(CacheBackend):
+    """Cache in a local SQLite file; its budgets are shared by the processes of one machine."""
+
+    def __init__(self, db_file: Path):
+        self.db_file = Path(db_file).expanduser()
+        self.lock = threading.Lock()
+        self.conn = None
+        self.broken = False
+
+    def _connect(self):
+        import sqlite3
+
+        if self.conn is None:
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_file), timeout=10, check_same_thread=False,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS kv (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL,
+                    PRIMARY KEY (namespace, key)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS budgets (
+                    name TEXT PRIMARY KEY,
+                    window INTEGER NOT NULL,
+                    used INTEGER NOT NULL
+                );
+            """)
+            conn.execute("DELETE FROM kv WHERE expires_at < ?", (time.time(),))
+            self.conn = conn
+        return self.conn
+
+    def _run(self, action, default=None):
+        """Run action(conn) under the lock; a broken database disables the cache instead of failing."""
+        import sqlite3
+
+        with self.lock:
+            if self.broken:
+                return default
+            try:
+                return action(self._connect())
+            except (sqlite3.Error, OSError) as e:
+                logging.warning(f"Cache disabled ({self.db_file}): {e}")
+                self.broken = True
+                return default
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = [str(key) for key in keys]
+        now = time.time()
+
+        def run(conn):
+            found = {}
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT key, value FROM kv WHERE namespace = ? AND key IN ({','.join('?' * len(chunk))}) "
+                    "AND (expires_at IS NULL OR expires_at >= ?)", [namespace] + chunk + [now])
+                found.update((key, json.loads(value)) for key, value in rows)
+            return found
+
+        return self._run(run, default={}) if keys else {}
+
+    def set_many(self, namespace: str, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        if not items:
+            return
+        expires_at = time.time() + ttl if ttl is not None else None
+        rows = [(namespace, str(key), json.dumps(value), expires_at) for key, value in items.items()]
+
+        def run(conn):
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) "
+                                 "VALUES (?, ?, ?, ?)", rows)
+            finally:
+                conn.execute("COMMIT")
+
+        self._run(run)
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._run(lambda conn: conn.execute("DELETE FROM kv WHERE namespace = ? AND key = ?",
+                                            (namespace, str(key))))
+
+    def try_acquire(self, name: str, rate: int, period: float, priority: str = 'batch') -> float:
+        now = time.time()
+        window = int(now // period)
+        names = [f"{name}:{other}" for other in PRIORITIES]
+
+        def run(conn):
+            # IMMEDIATE takes the write lock up front, so two processes cannot both see a free slot
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute("SELECT name, window, used FROM budgets WHERE name IN (?, ?)", names).fetchall()
+                used = {row[0]: row[2] for row in rows if row[1] == window}
+                own = used.get(f"{name}:{priority}", 0)
+                # The other class keeps its full reserve only while it is active (a slot in this window or the last)
+                active = any(row[0] != f"{name}:{priority}" and row[1] >= window - 1 for row in rows)
+                reserved = RESERVED_SLOTS if active else IDLE_RESERVED_SLOTS
+                if own < rate - reserved and sum(used.values()) < rate:
+                    conn.execute("INSERT OR REPLACE INTO budgets (name, window, used) VALUES (?, ?, ?)",
+                                 (f"{name}:{priority}", window, own + 1))
+                    return 0.0
+                return (window + 1) * period - now
+            finally:
+                conn.execute("COMMIT")
+
+        return self._run(run, default=0.0)
+
+    def close(self) -> None:
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+class RedisError(Exception):
+    """Error reply from a Redis server."""
+
+
+class RedisBackend(CacheBackend):
+    """Cache in a Redis server (or anything speaking its protocol), shared by every machine using it."""
+
+    shared = True
+
+    def __init__(self, url: str, timeout: float = 2.0):
+        parsed = urllib.parse.urlsplit(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.strip('/') or 0)
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.sock = None
+        self.reader = None
+        self.clock_offset = 0.0
+        self.down_until = 0.0
+
+    def _connect(self) -> None:
+        import socket
+
+        self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self.reader = self.sock.makefile('rb')
+        if self.password:
+            self._execute([('AUTH', self.password)])
+        if self.db:
+            self._execute([('SELECT', self.db)])
+        # Budget windows follow the server's clock, so machines with skewed clocks share them
+        seconds, micros = self._execute([('TIME',)])[0]
+        self.clock_offset = int(seconds) + int(micros) / 1e6 - time.time()
+
+    @staticmethod
+    def _encode(command) -> bytes:
+        parts = [f"*{len(command)}\r\n".encode()]
+        for arg in command:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        return b''.join(parts)
+
+    def _read_reply(self):
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode()
+        if kind == b'-':
+            return RedisError(rest.decode())
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(rest)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise ConnectionError(f"unexpected reply: {line[:40]!r}")
+
+    def _execute(self, commands: List[tuple]) -> List[Any]:
+        """Send commands in one pipeline and read their replies (caller holds the lock)."""
+        self.sock.sendall(b''.join(self._encode(command) for command in commands))
+        replies = [self._read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+    def _pipeline(self, commands: List[tuple]) -> Optional[List[Any]]:
+        """Run commands; None while the server is unreachable (retried after 30 seconds)."""
+        with self.lock:
+            if time.monotonic() < self.down_until:
+                return None
+            try:
+                if self.sock is None:
+                    self._connect()
+                return self._execute(commands)
+            except (OSError, ConnectionError, RedisError, ValueError) as e:
+                logging.warning(f"Shared cache {self.host}:{self.port} unavailable: {e}")
+                self._disconnect()
+                self.down_until = time.monotonic() + 30
+                return None
+
+    def _disconnect(self) -> None:
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+        self.reader = None
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{KEY_PREFIX}{namespace}:{key}"
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = [str(key) for key in keys]
+        if not keys:
+            return {}
+        replies = self._pipeline([('MGET',) + tuple(self._key(namespace, key) for key in keys)])
+        if replies is None:
+            return {}
+        return {key: json.loads(value) for key, value in zip(keys, replies[0]) if value is not None}
+
+    def set_many(self, namespace: str, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        commands = []
+        for key, value in items.items():
+            command = ('SET', self._key(namespace, key), json.dumps(value))
+            if ttl is not None:
+                command += ('PX', max(1, int(ttl * 1000)))
+            commands.append(command)
+        if commands:
+            self._pipeline(commands)
+
+    def delete(self, namespace: str, key: str) -> None:
+        self._pipeline([('DEL', self._key(namespace, key))])
+
+    def try_acquire(self, name: str, rate: int, period: float, priority: str = 'batch') -> float:
+        now = time.time() + self.clock_offset
+        window = int(now // period)
+        keys = {other: f"{KEY_PREFIX}budget:{name}:{other}:{window}" for other in PRIORITIES}
+        others = [key for other, key in keys.items() if other != priority]
+        previous = [f"{KEY_PREFIX}budget:{name}:{other}:{window - 1}" for other in PRIORITIES if other != priority]
+        replies = self._pipeline([('INCR', keys[priority]), ('PEXPIRE', keys[priority], int(period * 2000)),
+                                  ('MGET',) + tuple(others + previous)])
+        if replies is None:
+            return 0.0
+        own = replies[0]
+        counts = [int(used) if used is not None else 0 for used in replies[2]]
+        total = own + sum(counts[:len(others)])
+        # The other class keeps its full reserve only while it is active (a slot in this window or the last)
+        reserved = RESERVED_SLOTS if any(counts) else IDLE_RESERVED_SLOTS
+        if own <= rate - reserved and total <= rate:
+            return 0.0
+        # Give the slot back, so a refused attempt does not eat into the other class's share
+        self._pipeline([('DECR', keys[priority])])
+        return (window + 1) * period - now
+
+    def close(self) -> None:
+        with self.lock:
+            self._disconnect()
+
+
+def backend_from_url(url: str) -> CacheBackend:
+    """Create the backend a sqlite:// or redis:// URL names."""
+    scheme = url.split('://', 1)[0].lower()
+    if scheme == 'sqlite':
+        return SQLiteBackend(Path(url[len('sqlite://'):]))
+    if scheme in ('redis', 'tcp'):
+        return RedisBackend(url)
+    raise ValueError(f"Unknown cache backend URL: {url} (expected sqlite://PATH or redis://HOST:PORT/DB)")
+
+
+def open_backend() -> CacheBackend:
+    """The process-wide backend chosen by DEEMIXKIT_CACHE (local SQLite by default)."""
+    global _backend
+    with _lock:
+        if _backend is None:
+            url = os.environ.get("DEEMIXKIT_CACHE") or DEFAULT_URL
+            try:
+                _backend = backend_from_url(url)
+            except ValueError as e:
+                logging.error(f"{e}; using the local cache")
+                _backend = backend_from_url(DEFAULT_URL)
+        return _backend
+
+
+def _http():
+    """The kit-http module, loaded from this folder like the tools load it (the file name contains dashes)."""
+    module = sys.modules.get('kit_http')
+    if module is None:
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location('kit_http', Path(__file__).resolve().parent / "kit-http.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['kit_http'] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+def install_rate_budget(priority: str = 'batch') -> None:
+    """
+    Make every Deezer API request wait for a slot in the backend's budget.
+
+    Registers a kit-http hook, so requests made by any part of the tool,
+    through sessions or bare requests.get, wait. Neither requests nor the
+    backend is loaded until the tool sends its first request, so a hotkey
+    script's startup does not pay for the budget.
+
+    Args:
+        priority: Priority class of the tool's requests ('interactive' or 'batch')
+    """
+    if priority not in PRIORITIES:
+        logging.warning(f"Unknown priority class '{priority}', using 'batch'")
+        priority = 'batch'
+    name, rate, period = DEEZER_BUDGET
+
+    def wait_for_slot(request):
+        if request.url.startswith(DEEZER_API_BASE):
+            open_backend().acquire(name, rate, period, priority)
+
+    _http().register('rate-budget', before=wait_for_slot)
+
+
+def _token_key(client_id: str) -> str:
+    import hashlib
+
+    return hashlib.sha256(client_id.encode('utf-8')).hexdigest()[:32]
+
+
+def get_token(service: str, client_id: str) -> Optional[str]:
+    """An access token stored by put_token for this client, or None."""
+    return open_backend().get(f'{service}-token', _token_key(client_id))
+
+
+def put_token(service: str, client_id: str, token_data: Dict[str, Any]) -> None:
+    """Store an OAuth token response until a minute before it expires, for every tool sharing the backend."""
+    token = token_data.get('access_token')
+    ttl = float(token_data.get('expires_in', 3600)) - 60
+    if token and ttl > 0:
+        open_backend().set(f'{service}-token', _token_key(client_id), token, ttl=ttl)
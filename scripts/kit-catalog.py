@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Local Deezer Catalog for DeemixKit
+
+Keeps every album the tools see in Deezer API responses (search results,
+album details, artist discographies, playlist tracks) in a local SQLite
+database with a full-text index, so albums seen once resolve later without
+the network.
+
+record() takes any decoded Deezer response and picks out the albums and
+artists in it. Rows are buffered and written in one transaction before the
+next lookup and at exit, so recording costs no disk I/O on the request path.
+
+record_discography() marks an artist's album list as complete; within a day,
+artist_albums() returns it in Deezer's order without a request.
+
+find_album() and find_query() only return an album whose normalized artist
+and title equal the query: a confident hit the resolvers use instead of
+calling the API. search() ranks looser candidates with FTS5, for when the
+API cannot be reached.
+
+With a shared kit-cache backend (DEEMIXKIT_CACHE=redis://...), exact-match
+entries and complete album lists are also published there, and local misses
+are looked up there, so machines resolve what any one of them has seen.
+
+Loaded by the tools with importlib (the file name contains dashes):
+
+    catalog = load_kit_module("kit-catalog").open_catalog()
+    album = catalog.find_album("Radiohead", "OK Computer")
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import atexit
+import logging
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+# Configuration
+CACHE_DIR = Path.home() / ".config" / "deemixkit"
+CATALOG_FILE = Path(os.environ.get("DEEMIXKIT_CATALOG", CACHE_DIR / "catalog.db"))
+MAX_AGE = 90 * 24 * 3600  # Entries seen longer ago than this are not trusted to skip the API
+DISCOGRAPHY_MAX_AGE = 24 * 3600  # A stored album list older than this may miss new releases
+FLUSH_EVERY = 5000  # Buffered rows that force a write before the next lookup or exit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artists (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    seen_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS albums (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    artist_id INTEGER,
+    artist_name TEXT,
+    record_type TEXT,
+    release_date TEXT,
+    nb_tracks INTEGER,
+    artist_key TEXT,
+    title_key TEXT NOT NULL,
+    full_key TEXT GENERATED ALWAYS AS (artist_key || ' ' || title_key) VIRTUAL,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS albums_by_name ON albums (artist_key, title_key);
+CREATE INDEX IF NOT EXISTS albums_by_full_name ON albums (full_key);
+CREATE TABLE IF NOT EXISTS discographies (
+    artist_id INTEGER PRIMARY KEY,
+    album_ids TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+# External-content FTS5 index over albums, kept in sync by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS albums_fts USING fts5(
+    artist_name, title, content='albums', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS albums_fts_insert AFTER INSERT ON albums BEGIN
+    INSERT INTO albums_fts (rowid, artist_name, title) VALUES (new.id, new.artist_name, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS albums_fts_delete AFTER DELETE ON albums BEGIN
+    INSERT INTO albums_fts (albums_fts, rowid, artist_name, title)
+    VALUES ('delete', old.id, old.artist_name, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS albums_fts_update AFTER UPDATE OF artist_name, title ON albums
+WHEN old.artist_name IS NOT new.artist_name OR old.title IS NOT new.title BEGIN
+    INSERT INTO albums_fts (albums_fts, rowid, artist_name, title)
+    VALUES ('delete', old.id, old.artist_name, old.title);
+    INSERT INTO albums_fts (rowid, artist_name, title) VALUES (new.id, new.artist_name, new.title);
+END;
+"""
+
+UPSERT_ARTIST = """
+INSERT INTO artists (id, name, seen_at) VALUES (?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET name = excluded.name, seen_at = excluded.seen_at
+"""
+
+# Partial album objects (playlist tracks, discography pages) never erase known fields
+UPSERT_ALBUM = """
+INSERT INTO albums (id, title, artist_id, artist_name, record_type, release_date, nb_tracks,
+                    artist_key, title_key, seen_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    title = excluded.title,
+    artist_id = COALESCE(excluded.artist_id, albums.artist_id),
+    artist_name = COALESCE(excluded.artist_name, albums.artist_name),
+    record_type = COALESCE(excluded.record_type, albums.record_type),
+    release_date = COALESCE(excluded.release_date, albums.release_date),
+    nb_tracks = COALESCE(excluded.nb_tracks, albums.nb_tracks),
+    artist_key = COALESCE(excluded.artist_key, albums.artist_key),
+    title_key = excluded.title_key,
+    seen_at = excluded.seen_at
+"""
+
+ALBUM_COLUMNS = "id, title, artist_id, artist_name, record_type, release_date, nb_tracks"
+
+# Letters NFKD does not decompose into a base letter
+TRANSLITERATE = str.maketrans({'æ': 'ae', 'œ': 'oe', 'ø': 'o', 'ß': 'ss', 'ð': 'd', 'þ': 'th', 'ł': 'l'})
+
+_lock = threading.Lock()
+_catalog = None
+
+
+def _metrics():
+    """The kit-metrics module when the running tool collects metrics, else None."""
+    return sys.modules.get('kit_metrics')
+
+
+def _shared_backend():
+    """The kit-cache backend when DEEMIXKIT_CACHE names one shared between machines, else None."""
+    if not os.environ.get("DEEMIXKIT_CACHE"):
+        return None
+    module = sys.modules.get('kit_cache')
+    if module is None:
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location('kit_cache', Path(__file__).resolve().parent / "kit-cache.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['kit_cache'] = module
+        spec.loader.exec_module(module)
+    backend = module.open_backend()
+    return backend if backend.shared else None
+
+
+def normalize(text: Optional[str]) -> str:
+    """Lowercase, strip accents and punctuation, collapse spaces (like the FTS tokenizer)."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).casefold().translate(TRANSLITERATE)
+    return ' '.join(re.sub(r'[\W_]+', ' ', text).split())
+
+
+def extract(data: Any, artist: Optional[Dict[str, Any]] = None) -> Tuple[Dict[int, str], List[Tuple[Dict, Dict]]]:
+    """
+    Find the artists and albums in a decoded Deezer response.
+
+    Deezer tags its objects with 'type'. An album without its own artist
+    takes the one of the object it sits in (the track of a playlist entry),
+    or the artist given here (artist/{id}/albums pages carry none).
+
+    Returns:
+        ({artist_id: name}, [(album object, artist object or None), ...])
+    """
+    artists = {}
+    albums = []
+
+    def walk(node: Any, context: Optional[Dict[str, Any]]):
+        if isinstance(node, list):
+            for item in node:
+                walk(item, context)
+            return
+        if not isinstance(node, dict):
+            return
+        own_artist = node.get('artist') if isinstance(node.get('artist'), dict) else None
+        kind = node.get('type')
+        if kind == 'artist' and node.get('id') and node.get('name'):
+            artists[node['id']] = node['name']
+        elif kind == 'album' and node.get('id') and node.get('title'):
+            albums.append((node, own_artist or context))
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                walk(value, own_artist or context)
+
+    walk(data, artist)
+    return artists, albums
+
+
+class Catalog:
+    """SQLite mirror of the Deezer albums seen so far."""
+
+    def __init__(self, db_file: Path = CATALOG_FILE):
+        """
+        Initialize the catalog. The database is opened on first use.
+
+        Args:
+            db_file: SQLite database file
+        """
+        self.db_file = Path(db_file).expanduser()
+        self.lock = threading.Lock()
+        self.conn = None
+        self.fts = True
+        self.broken = False
+        self.pending_artists = {}
+        self.pending_albums = []
+        self.pending_discographies = {}
+        self.shared = _shared_backend()
+        self.received_keys = set()
+        self.received_discographies = set()
+
+    def _connect(self):
+        import sqlite3
+
+        if self.conn is None:
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_file), timeout=10, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            try:
+                conn.executescript(FTS_SCHEMA)
+            except sqlite3.OperationalError as e:
+                # SQLite built without FTS5: exact lookups still work
+                logging.warning(f"Catalog full-text search unavailable: {e}")
+                self.fts = False
+            self.conn = conn
+        return self.conn
+
+    def _run(self, action, default=None):
+        """Run action(conn) under the lock; a broken database disables the catalog instead of failing."""
+        import sqlite3
+
+        with self.lock:
+            if self.broken:
+                return default
+            try:
+                conn = self._connect()
+                self._flush(conn)
+                return action(conn)
+            except (sqlite3.Error, OSError) as e:
+                logging.warning(f"Catalog disabled ({self.db_file}): {e}")
+                self.broken = True
+                return default
+
+    def record(self, data: Any, artist: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Buffer the artists and albums of a Deezer API response.
+
+        Args:
+            data: Decoded JSON of any Deezer API response
+            artist: Artist of albums that carry none (e.g. {'id': 27} for artist/27/albums)
+        """
+        artists, albums = extract(data, artist)
+        if not artists and not albums:
+            return
+        seen_at = time.time()
+        with self.lock:
+            self.pending_artists.update(artists)
+            self.pending_albums.extend((album, album_artist, seen_at) for album, album_artist in albums)
+            backlog = len(self.pending_albums)
+        if backlog >= FLUSH_EVERY:
+            self.flush()
+
+    def record_discography(self, artist_id: int, albums: List[Dict[str, Any]]) -> None:
+        """
+        Buffer an artist's complete album list (all pages of artist/{id}/albums).
+
+        Args:
+            artist_id: Deezer artist id
+            albums: The albums in Deezer's order
+        """
+        self.record(albums, {'id': artist_id})
+        with self.lock:
+            self.pending_discographies[int(artist_id)] = ([album['id'] for album in albums if album.get('id')],
+                                                          time.time())
+
+    def _flush(self, conn) -> None:
+        """Write buffered rows in one transaction (caller holds the lock)."""
+        if not self.pending_artists and not self.pending_albums and not self.pending_discographies:
+            return
+        now = time.time()
+        known = dict(self.pending_artists)
+        for _, album_artist, _ in self.pending_albums:
+            if album_artist and album_artist.get('id') and album_artist.get('name'):
+                known[album_artist['id']] = album_artist['name']
+
+        # Albums of artist/{id}/albums pages only know the artist id; take the name from earlier responses
+        unnamed = {album_artist['id'] for _, album_artist, _ in self.pending_albums
+                   if album_artist and album_artist.get('id') and album_artist['id'] not in known}
+        if unnamed:
+            placeholders = ','.join('?' * len(unnamed))
+            for row in conn.execute(f"SELECT id, name FROM artists WHERE id IN ({placeholders})", list(unnamed)):
+                known.setdefault(row['id'], row['name'])
+
+        album_rows = []
+        for album, album_artist, seen_at in self.pending_albums:
+            artist_id = album_artist.get('id') if album_artist else None
+            artist_name = known.get(artist_id) if artist_id else (album_artist or {}).get('name')
+            album_rows.append((
+                album['id'], album['title'], artist_id, artist_name,
+                album.get('record_type'), album.get('release_date'), album.get('nb_tracks'),
+                normalize(artist_name) if artist_name else None, normalize(album['title']), seen_at,
+            ))
+
+        with conn:
+            conn.executemany(UPSERT_ARTIST, [(artist_id, name, now) for artist_id, name in known.items()])
+            conn.executemany(UPSERT_ALBUM, album_rows)
+            conn.executemany("INSERT OR REPLACE INTO discographies (artist_id, album_ids, fetched_at) VALUES (?, ?, ?)",
+                             [(artist_id, json.dumps(album_ids), fetched_at)
+                              for artist_id, (album_ids, fetched_at) in self.pending_discographies.items()])
+        logging.debug(f"Catalog: recorded {len(album_rows)} albums, {len(known)} artists, "
+                      f"{len(self.pending_discographies)} discographies")
+        if self.shared:
+            self._publish(conn, {row[7] + ' ' + row[8] for row in album_rows if row[7]} - self.received_keys,
+                          set(self.pending_discographies) - self.received_discographies)
+        self.pending_artists.clear()
+        self.pending_albums.clear()
+        self.pending_discographies.clear()
+
+    def _publish(self, conn, keys: set, artist_ids: set) -> None:
+        """Copy the preferred album of each name key and complete album lists to the shared backend."""
+        albums = {}
+        for key in keys:
+            row = conn.execute(f"SELECT {ALBUM_COLUMNS} FROM albums WHERE full_key = ? "
+                               "ORDER BY record_type = 'album' DESC, id LIMIT 1", (key,)).fetchone()
+            if row:
+                albums[key] = self._album(row)
+        self.shared.set_many('catalog-album', albums, ttl=MAX_AGE)
+
+        discographies = {}
+        for artist_id in artist_ids:
+            album_ids, fetched_at = self.pending_discographies[artist_id]
+            rows = self._discography_rows(conn, album_ids)
+            if rows is not None:
+                discographies[str(artist_id)] = {'albums': [self._album(row) for row in rows],
+                                                 'fetched_at': fetched_at}
+        self.shared.set_many('catalog-discography', discographies, ttl=DISCOGRAPHY_MAX_AGE)
+
+    def flush(self) -> None:
+        """Write buffered rows now."""
+        self._run(lambda conn: None)
+
+    @staticmethod
+    def _album(row) -> Dict[str, Any]:
+        """A catalog row as a Deezer-style album object."""
+        album = {'id': row['id'], 'title': row['title'], 'type': 'album'}
+        if row['artist_name']:
+            album['artist'] = {'id': row['artist_id'], 'name': row['artist_name'], 'type': 'artist'}
+        for key in ('record_type', 'release_date', 'nb_tracks'):
+            if row[key] is not None:
+                album[key] = row[key]
+        return album
+
+    def _find(self, where: str, params: List[Any], max_age: float) -> Optional[Dict[str, Any]]:
+        # Several releases can share a name (reissues); prefer full albums, then the oldest id
+        query = (f"SELECT {ALBUM_COLUMNS} FROM albums WHERE {where} AND seen_at >= ? "
+                 "ORDER BY record_type = 'album' DESC, id LIMIT 1")
+        row = self._run(lambda conn: conn.execute(query, params + [time.time() - max_age]).fetchone())
+        album = self._album(row) if row else None
+        if album is None and self.shared:
+            # Another machine may have seen it; shared entries expire after MAX_AGE themselves
+            album = self.shared.get('catalog-album', ' '.join(params))
+            if album is not None:
+                with self.lock:
+                    self.received_keys.add(' '.join(params))
+                self.record(album)
+        metrics = _metrics()
+        if metrics:
+            metrics.incr('catalog_hits' if album else 'catalog_misses')
+        return album
+
+    def find_album(self, artist: str, title: str, max_age: float = MAX_AGE) -> Optional[Dict[str, Any]]:
+        """The album whose artist and title match exactly after normalizing, or None."""
+        artist_key, title_key = normalize(artist), normalize(title)
+        if not artist_key or not title_key:
+            return None
+        return self._find("artist_key = ? AND title_key = ?", [artist_key, title_key], max_age)
+
+    def find_query(self, query: str, max_age: float = MAX_AGE) -> Optional[Dict[str, Any]]:
+        """The album whose 'artist title' matches a free-text query exactly after normalizing, or None."""
+        key = normalize(query)
+        if not key:
+            return None
+        return self._find("full_key = ?", [key], max_age)
+
+    @staticmethod
+    def _discography_rows(conn, album_ids: List[int]) -> Optional[List[Any]]:
+        """Album rows of album_ids in that order, or None if any is missing."""
+        rows = {}
+        # Stay below SQLite's bound-parameter limit on huge discographies
+        for start in range(0, len(album_ids), 500):
+            chunk = album_ids[start:start + 500]
+            query = f"SELECT {ALBUM_COLUMNS} FROM albums WHERE id IN ({','.join('?' * len(chunk))})"
+            rows.update((found['id'], found) for found in conn.execute(query, chunk))
+        if not all(album_id in rows for album_id in album_ids):
+            return None
+        return [rows[album_id] for album_id in album_ids]
+
+    def artist_albums(self, artist_id: int, max_age: float = DISCOGRAPHY_MAX_AGE) -> Optional[List[Dict[str, Any]]]:
+        """An artist's stored album list in Deezer's order, or None if there is none this fresh."""
+        def run(conn):
+            row = conn.execute("SELECT album_ids FROM discographies WHERE artist_id = ? AND fetched_at >= ?",
+                               (int(artist_id), time.time() - max_age)).fetchone()
+            if row is None:
+                return None
+            return self._discography_rows(conn, json.loads(row['album_ids']))
+
+        rows = self._run(run)
+        albums = [self._album(row) for row in rows] if rows is not None else None
+        if albums is None and self.shared:
+            shared = self.shared.get('catalog-discography', str(artist_id))
+            if shared and time.time() - shared.get('fetched_at', 0) < max_age:
+                albums = shared['albums']
+                self.record(albums, {'id': artist_id})
+                with self.lock:
+                    self.received_discographies.add(int(artist_id))
+                    self.pending_discographies[int(artist_id)] = ([album['id'] for album in albums],
+                                                                  shared['fetched_at'])
+        metrics = _metrics()
+        if metrics:
+            metrics.incr('catalog_discography_hits' if albums is not None else 'catalog_discography_misses')
+        return albums
+
+    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Albums containing every word of query, best match first (empty without FTS5)."""
+        words = normalize(query).split()
+        if not words:
+            return []
+        match = ' '.join(f'"{word}"' for word in words)
+        sql = (f"SELECT {', '.join('a.' + column for column in ALBUM_COLUMNS.split(', '))} "
+               "FROM albums_fts JOIN albums a ON a.id = albums_fts.rowid "
+               "WHERE albums_fts MATCH ? ORDER BY bm25(albums_fts) LIMIT ?")
+
+        def run(conn):
+            return conn.execute(sql, (match, limit)).fetchall() if self.fts else []
+
+        return [self._album(row) for row in self._run(run, default=[])]
+
+    def close(self) -> None:
+        """Write buffered rows and close the database."""
+        self.flush()
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+def open_catalog(db_file: Optional[Path] = None) -> Catalog:
+    """The process-wide catalog, written out at exit."""
+    global _catalog
+    with _lock:
+        if _catalog is None:
+            _catalog = Catalog(db_file or CATALOG_FILE)
+            atexit.register(_catalog.close)
+        return _catalog
+
+
+def record(data: Any, artist: Optional[Dict[str, Any]] = None) -> None:
+    """Buffer the albums of a Deezer API response in the process-wide catalog."""
+    open_catalog().record(data, artist)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+HTTP Hooks for DeemixKit
+
+The one wrapper around requests.Session.send, which sessions and bare
+requests.get both go through. Shared modules register hooks with it
+instead of wrapping send themselves:
+
+  kit-cache    waits for a slot in the Deezer rate budget
+  kit-output   counts requests for the records' 'cached' field
+  kit-metrics  records latency, retries, pages and bytes per stage
+
+Before a request is sent, every 'before' hook runs in registration order;
+the clock for 'after' starts once they are done, so time spent waiting for
+the rate budget is not counted as latency. After the response (or the
+exception, with response None) every 'after' hook runs with the seconds
+the request took and whether its body is streamed (not read yet).
+
+register() does not import requests. The wrapper is installed when the
+tool first imports it, so a hotkey script that never reaches the network
+(or only after its prompt) does not pay for requests at startup.
+
+Loaded by the tools with importlib (the file name contains dashes):
+
+    http = load_kit_module("kit-http")
+    http.register('metrics', after=lambda request, response, seconds, stream: ...)
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import sys
+import time
+import threading
+from typing import Optional, Dict, Callable, Tuple
+
+_lock = threading.Lock()
+_hooks: Dict[str, Tuple[Optional[Callable], Optional[Callable]]] = {}
+_installed = False
+
+
+def register(name: str, before: Optional[Callable] = None, after: Optional[Callable] = None) -> None:
+    """
+    Run hooks around every request sent through requests.
+
+    Args:
+        name: Registering the same name again replaces its hooks
+        before: Called with the PreparedRequest before it is sent
+        after: Called with (request, response or None on an exception, seconds, stream)
+    """
+    global _installed
+    with _lock:
+        _hooks[name] = (before, after)
+        if _installed:
+            return
+        _installed = True
+    requests = sys.modules.get('requests')
+    if requests is not None and hasattr(requests, 'Session'):
+        _wrap_send(requests)
+    else:
+        sys.meta_path.insert(0, _RequestsImportHook())
+
+
+def _wrap_send(requests) -> None:
+    original_send = requests.Session.send
+
+    def send(self, request, **kwargs):
+        hooks = list(_hooks.values())
+        stream = bool(kwargs.get('stream'))
+        for before, _ in hooks:
+            if before:
+                before(request)
+        started = time.perf_counter()
+        try:
+            response = original_send(self, request, **kwargs)
+        except requests.exceptions.RequestException:
+            for _, after in hooks:
+                if after:
+                    after(request, None, time.perf_counter() - started, stream)
+            raise
+        seconds = time.perf_counter() - started
+        for _, after in hooks:
+            if after:
+                after(request, response, seconds, stream)
+        return response
+
+    requests.Session.send = send
+
+
+class _RequestsImportHook:
+    """Installs the wrapper as soon as requests has been imported, wherever the tool imports it."""
+
+    def find_spec(self, name, path, target=None):
+        if name != 'requests':
+            return None
+        sys.meta_path.remove(self)
+        import importlib.util
+
+        spec = importlib.util.find_spec(name)
+        if spec is not None and spec.loader is not None:
+            exec_module = spec.loader.exec_module
+
+            def exec_and_wrap(module):
+                exec_module(module)
+                _wrap_send(module)
+
+            spec.loader.exec_module = exec_and_wrap
+        return spec
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Download Ledger for DeemixKit
+
+Remembers every album the tools have handed to Deemix, with its status and
+when it last changed, so albums that are queued or still downloading (and
+therefore not on disk yet for the collection matcher) are not queued again
+by the next run.
+
+  queued       copied to the clipboard for Deemix by a tool or shell wrapper
+  downloading  picked up by deemix-queue or deemix-download.sh
+  done         downloaded by deemix-queue or deemix-download.sh
+  failed       deemix-queue or deemix-download.sh gave up on it
+
+URLs a tool only prints (--no-clipboard, --format jsonl) are not recorded:
+nothing has reached Deemix yet, and whatever the output is piped into
+records them when it hands them over.
+
+An album is skipped while its status is recent enough to trust: queued for
+a day, downloading for six hours (longer means the downloader died), failed
+for a week and done for a year. After that it counts as new work again.
+
+The ledger is an SQLite table keyed by service and album id, so each
+lookup is one primary-key probe however large the ledger grows. Move it
+with DEEMIXKIT_LEDGER.
+
+Loaded by the tools with importlib (the file name contains dashes):
+
+    ledger = load_kit_module("kit-ledger").open_ledger()
+    new_urls, skipped = ledger.filter_new(urls)
+    ledger.mark(new_urls, 'queued', source='playlist-downloader')
+
+The shell wrappers drop albums the ledger has in hand and record what they
+hand to Deemix with the command line:
+
+    URLS=$(echo "$URLS" | python3 scripts/kit-ledger.py filter)
+    echo "$URLS" | python3 scripts/kit-ledger.py queued --source discography-to-deemix
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import re
+import sys
+import time
+import atexit
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple, Iterable
+
+# Configuration
+CACHE_DIR = Path.home() / ".config" / "deemixkit"
+LEDGER_FILE = Path(os.environ.get("DEEMIXKIT_LEDGER", CACHE_DIR / "ledger.db"))
+
+# Seconds a status keeps an album out of new work
+STATUS_MAX_AGE = {
+    'queued': 24 * 3600,
+    'downloading': 6 * 3600,
+    'failed': 7 * 24 * 3600,
+    'done': 365 * 24 * 3600,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS albums (
+    album_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    source TEXT,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS albums_by_status ON albums (status, updated_at);
+"""
+
+ALBUM_URL_PATTERN = re.compile(r'(deezer|spotify)\.com/(?:[a-z]{2}(?:-[a-z]{2})?/)?album/([A-Za-z0-9]+)')
+
+_lock = threading.Lock()
+_ledger = None
+
+
+def _metrics():
+    """The kit-metrics module when the running tool collects metrics, else None."""
+    return sys.modules.get('kit_metrics')
+
+
+def album_key(url: str) -> Optional[str]:
+    """'service:id' for a Deezer or Spotify album URL, or None for anything else."""
+    match = ALBUM_URL_PATTERN.search(url or '')
+    return f"{match.group(1)}:{match.group(2)}" if match else None
+
+
+class Ledger:
+    """SQLite record of the albums handed to Deemix and what became of them."""
+
+    def __init__(self, db_file: Path = LEDGER_FILE):
+        """
+        Initialize the ledger. The database is opened on first use.
+
+        Args:
+            db_file: SQLite database file
+        """
+        self.db_file = Path(db_file).expanduser()
+        self.lock = threading.Lock()
+        self.conn = None
+        self.broken = False
+
+    def _connect(self):
+        import sqlite3
+
+        if self.conn is None:
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_file), timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            with conn:
+                conn.execute("DELETE FROM albums WHERE updated_at < ?", (time.time() - max(STATUS_MAX_AGE.values()),))
+            self.conn = conn
+        return self.conn
+
+    def _run(self, action, default=None):
+        """Run action(conn) under the lock; a broken database disables the ledger instead of failing."""
+        import sqlite3
+
+        with self.lock:
+            if self.broken:
+                return default
+            try:
+                return action(self._connect())
+            except (sqlite3.Error, OSError) as e:
+                logging.warning(f"Download ledger disabled ({self.db_file}): {e}")
+                self.broken = True
+                return default
+
+    def statuses(self, urls: Iterable[str], only: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Current status of each URL the ledger still holds an album out of new work for.
+
+        Args:
+            urls: Album URLs
+            only: Statuses to consider (default: all)
+
+        Returns:
+            Dict[str, str]: Status keyed by URL, for URLs with a recent enough entry
+        """
+        keys = {}
+        for url in urls:
+            key = album_key(url)
+            if key:
+                keys.setdefault(key, []).append(url)
+        wanted = set(only) if only is not None else set(STATUS_MAX_AGE)
+        now = time.time()
+
+        def run(conn):
+            found = {}
+            key_list = list(keys)
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                rows = conn.execute(f"SELECT album_key, status, updated_at FROM albums "
+                                    f"WHERE album_key IN ({','.join('?' * len(chunk))})", chunk)
+                for key, status, updated_at in rows:
+                    if status in wanted and now - updated_at < STATUS_MAX_AGE.get(status, 0):
+                        found.update((url, status) for url in keys[key])
+            return found
+
+        return self._run(run, default={}) if keys else {}
+
+    def filter_new(self, urls: List[str], only: Optional[Iterable[str]] = None) -> Tuple[List[str], Dict[str, str]]:
+        """
+        Split URLs into new work and albums the ledger already has in hand.
+
+        Returns:
+            (new URLs in input order, {skipped URL: status})
+        """
+        skipped = self.statuses(urls, only)
+        metrics = _metrics()
+        if metrics:
+            metrics.incr('ledger_skipped', len(skipped))
+        return [url for url in urls if url not in skipped], skipped
+
+    def mark(self, urls: Iterable[str], status: str, source: Optional[str] = None) -> None:
+        """Set the status of albums (URLs that are not album URLs are ignored)."""
+        if status not in STATUS_MAX_AGE:
+            raise ValueError(f"Unknown ledger status: {status}")
+        now = time.time()
+        rows = {}
+        for url in urls:
+            key = album_key(url)
+            if key:
+                rows[key] = (key, url, status, source, now)
+        if not rows:
+            return
+
+        def run(conn):
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO albums (album_key, url, status, source, updated_at) "
+                                 "VALUES (?, ?, ?, ?, ?)", list(rows.values()))
+
+        self._run(run)
+
+    def close(self) -> None:
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+def open_ledger(db_file: Optional[Path] = None) -> Ledger:
+    """The process-wide ledger, closed at exit."""
+    global _ledger
+    with _lock:
+        if _ledger is None:
+            _ledger = Ledger(db_file or LEDGER_FILE)
+            atexit.register(_ledger.close)
+        return _ledger
+
+
+def main():
+    """Filter or set the status of album URLs from the command line (used by the shell wrappers)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Record album URLs in the download ledger, or drop the ones it already has in hand",
+        epilog="""
+Examples:
+  echo "$URLS" | pbcopy && echo "$URLS" | %(prog)s queued --source discography-to-deemix
+  %(prog)s done --source deemix-download https://www.deezer.com/album/302127
+  echo "$URLS" | %(prog)s filter                              # Print only the new albums
+  %(prog)s filter --only downloading --only done "$URL"       # Skip only albums in progress or done
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('command', choices=sorted(STATUS_MAX_AGE) + ['filter'],
+                        help='Status to record, or filter to print the URLs that are new work')
+    parser.add_argument('urls', nargs='*', help='Album URLs (read from stdin if omitted)')
+    parser.add_argument('--source', help='Tool that handed the albums to Deemix')
+    parser.add_argument('--only', action='append', choices=sorted(STATUS_MAX_AGE), metavar='STATUS',
+                        help='With filter, skip only albums with this status (repeatable; default: all)')
+    parser.add_argument('--requeue', action='store_true',
+                        help='With filter, let every URL through (queue albums the ledger has in hand again)')
+    args = parser.parse_intermixed_args()
+
+    urls = args.urls or [line.strip() for line in sys.stdin if line.strip()]
+    if args.command != 'filter':
+        open_ledger().mark(urls, args.command, source=args.source)
+        return
+
+    skipped = {}
+    if not args.requeue:
+        urls, skipped = open_ledger().filter_new(urls, args.only)
+    for url in urls:
+        print(url)
+    if skipped:
+        statuses = sorted(set(skipped.values()), key=list(STATUS_MAX_AGE).index)
+        named = ', '.join(statuses[:-1]) + ' or ' + statuses[-1] if len(statuses) > 1 else statuses[0]
+        print(f"Skipped {len(skipped)} albums already {named}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Logging Setup for DeemixKit
+
+One logging configuration shared by every tool. Log calls only put the
+record on an in-memory queue (QueueHandler); a single listener thread
+formats it and writes it to a size-rotated log file (and to stderr in
+verbose mode), so worker threads never wait on disk I/O and the logs stay
+bounded on an always-on machine.
+
+Several processes of a tool often log to the same file at once (batch
+runs, the discography prefetch, parallel hotkey presses). The file is
+opened for appending, so their lines never overwrite each other, and it is
+rotated under an exclusive lock by whichever process first finds it full.
+The others notice the new file before their next write and reopen it, as
+they do after rotation by newsyslog or logrotate.
+
+setup_logging() configures the root logger once per process. Later calls
+are cheap no-ops, so library-style entry points such as
+global-resolver.resolve_url() can keep calling it.
+
+Loaded by the tools with importlib (the file name contains dashes).
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import sys
+import fcntl
+import queue
+import atexit
+import logging
+import logging.handlers
+import threading
+from pathlib import Path
+
+DEFAULT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Rotate at 5 MB and keep 3 old files; override with DEEMIXKIT_LOG_MAX_BYTES / DEEMIXKIT_LOG_BACKUPS
+MAX_BYTES = int(os.environ.get("DEEMIXKIT_LOG_MAX_BYTES", 5 * 1024 * 1024))
+BACKUP_COUNT = int(os.environ.get("DEEMIXKIT_LOG_BACKUPS", 3))
+
+_lock = threading.Lock()
+_listener = None
+
+
+class SharedRotatingFileHandler(logging.handlers.WatchedFileHandler):
+    """
+    Size-rotated log file that several processes append to.
+
+    RotatingFileHandler assumes one writer: each process rotates on its own
+    count of the file size, so concurrent processes rename the file under
+    each other's open handles and shift backups twice.
+    """
+
+    def __init__(self, filename: Path, max_bytes: int, backup_count: int, encoding: str = 'utf-8'):
+        super().__init__(filename, mode='a', encoding=encoding)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.lock_file = f"{self.baseFilename}.lock"
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            # Our own position is a cheap lower bound of the size; the file is checked under the lock
+            if self.max_bytes > 0 and self.stream is not None and self.stream.tell() >= self.max_bytes:
+                self.rotate()
+        except Exception:
+            self.handleError(record)
+            return
+        super().emit(record)
+
+    def rotate(self) -> None:
+        """Shift log_file to .1, .2, ... unless another process already did."""
+        with open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) >= self.max_bytes:
+                    for n in range(self.backup_count - 1, 0, -1):
+                        if os.path.exists(f"{self.baseFilename}.{n}"):
+                            os.replace(f"{self.baseFilename}.{n}", f"{self.baseFilename}.{n + 1}")
+                    if self.backup_count > 0:
+                        os.replace(self.baseFilename, f"{self.baseFilename}.1")
+                    else:
+                        os.remove(self.baseFilename)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        self.reopenIfNeeded()
+
+
+def setup_logging(log_file: Path, verbose: bool = False, format_str: str = DEFAULT_FORMAT) -> None:
+    """
+    Route the root logger through a queue to a rotating log file.
+
+    Args:
+        log_file: Log file (its folder is created); rotated to log_file.1, .2, ...
+        verbose: Log DEBUG and also echo records to stderr
+        format_str: Record format for both the file and stderr
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+
+        log_file = Path(log_file).expanduser()
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        formatter = logging.Formatter(format_str)
+
+        handlers = [SharedRotatingFileHandler(log_file, MAX_BYTES, BACKUP_COUNT)]
+        if verbose:
+            handlers.append(logging.StreamHandler(sys.stderr))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        records = queue.SimpleQueue()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(logging.handlers.QueueHandler(records))
+        root.setLevel(logging.DEBUG if verbose else logging.INFO)
+
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown)
+
+
+def shutdown() -> None:
+    """Write out queued records and stop the listener thread (runs at exit)."""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Run Metrics for DeemixKit
+
+Collects per-stage wall-clock timings and HTTP counters for one run of a
+DeemixKit tool and writes them, when the run ends, as a JSON summary or a
+Prometheus textfile (for node_exporter's textfile collector).
+
+Once start() is called, every HTTP request made through requests (sessions
+and bare requests.get alike, see kit-http) is recorded against the stage
+that issued it: latency, retries, pages, bytes received and errors. Shared
+modules add cache hits and rate-limiter waits with incr() and observe();
+they only do so when this module has been loaded, so tools that run
+without --metrics pay nothing.
+
+Loaded by the tools with importlib (the file name contains dashes):
+
+    metrics = load_kit_module("kit-metrics")
+    metrics.start("/tmp/deezer-resolver.prom", tool="deezer-resolver")
+    with metrics.stage("search"):
+        ...
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+import urllib.parse
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+# Query parameters that mark a request as one page of a paged listing
+PAGING_PARAMS = {'index', 'offset', 'limit', 'cursor'}
+
+# Latency samples kept per stage for percentiles; totals stay exact beyond this
+MAX_SAMPLES = 10000
+
+_lock = threading.Lock()
+_local = threading.local()
+_active = {}
+_run = None
+
+
+class Timing:
+    """Count, total and percentiles of a series of durations in seconds."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'total_s': round(self.total, 4),
+            'p50_ms': round(self.quantile(0.5) * 1000, 2),
+            'p95_ms': round(self.quantile(0.95) * 1000, 2),
+            'max_ms': round(self.max * 1000, 2),
+        }
+
+
+class StageStats:
+    """Wall-clock time of one stage and the HTTP requests issued inside it."""
+
+    def __init__(self):
+        self.wall = Timing()
+        self.latency = Timing()
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.pages = 0
+        self.bytes = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'wall': self.wall.summary(),
+            'http': {
+                'requests': self.requests,
+                'errors': self.errors,
+                'retries': self.retries,
+                'pages': self.pages,
+                'bytes': self.bytes,
+                'latency': self.latency.summary(),
+            },
+        }
+
+
+class RunMetrics:
+    """Everything recorded during one run."""
+
+    def __init__(self, output_file: Optional[Path], tool: str):
+        self.output_file = output_file
+        self.tool = tool
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self.observations = {}
+
+    def stage_stats(self, name: str) -> StageStats:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        return stats
+
+
+def start(output_file: Optional[str] = None, tool: str = 'deemixkit') -> None:
+    """
+    Start collecting metrics for this run.
+
+    Args:
+        output_file: Written at exit; '.prom' gives a Prometheus textfile, anything else JSON
+        tool: Tool name, used as a label in the Prometheus output
+    """
+    global _run
+    with _lock:
+        if _run is not None:
+            return
+        _run = RunMetrics(Path(output_file).expanduser() if output_file else None, tool)
+    _http().register('metrics', after=_record_response)
+    if output_file:
+        atexit.register(write)
+
+
+def enabled() -> bool:
+    """Whether start() has been called."""
+    return _run is not None
+
+
+def current_stage() -> str:
+    """Name of the innermost stage on this thread ('other' outside any stage)."""
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else 'other'
+
+
+@contextmanager
+def _timed_stage(name: str):
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = _active[threading.get_ident()] = []
+    # Nested stages are reported by path, e.g. 'resolve/search'
+    path = f"{stack[-1]}/{name}" if stack else name
+    stack.append(path)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        stack.pop()
+        with _lock:
+            _run.stage_stats(path).wall.add(elapsed)
+
+
+def active_stages() -> Dict[int, str]:
+    """Innermost stage of every thread currently inside one, by thread id (for samplers)."""
+    stages = {}
+    for ident, stack in list(_active.items()):
+        # Slicing cannot fail if the thread leaves its stage meanwhile
+        innermost = stack[-1:]
+        if innermost:
+            stages[ident] = innermost[0]
+    return stages
+
+
+def stage(name: str):
+    """Context manager timing a stage; HTTP requests inside it are counted against it."""
+    if _run is None:
+        return nullcontext()
+    return _timed_stage(name)
+
+
+def incr(name: str, amount: int = 1) -> None:
+    """Add amount to a named counter (cache hits, albums matched, ...)."""
+    if _run is None:
+        return
+    with _lock:
+        _run.counters[name] = _run.counters.get(name, 0) + amount
+
+
+def observe(name: str, seconds: float) -> None:
+    """Record one duration for a named series (rate-limiter waits, ...)."""
+    if _run is None:
+        return
+    with _lock:
+        timing = _run.observations.get(name)
+        if timing is None:
+            timing = _run.observations[name] = Timing()
+        timing.add(seconds)
+
+
+def record_request(url: str, seconds: float, retries: int = 0, received: int = 0, error: bool = False) -> None:
+    """Count one HTTP request against the current stage."""
+    if _run is None:
+        return
+    query = urllib.parse.urlsplit(url).query
+    paged = bool(PAGING_PARAMS.intersection(urllib.parse.parse_qs(query)))
+    with _lock:
+        stats = _run.stage_stats(current_stage())
+        stats.requests += 1
+        stats.latency.add(seconds)
+        stats.retries += retries
+        stats.bytes += received
+        stats.errors += int(error)
+        stats.pages += int(paged and not error)
+
+
+def _http():
+    """The kit-http module, loaded from this folder like the tools load it (the file name contains dashes)."""
+    module = sys.modules.get('kit_http')
+    if module is None:
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location('kit_http', Path(__file__).resolve().parent / "kit-http.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['kit_http'] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+def _record_response(request, response, seconds: float, stream: bool) -> None:
+    """kit-http hook: count a request sent through requests (sessions and requests.get alike)."""
+    if response is None:
+        record_request(request.url, seconds, error=True)
+        return
+    retries = getattr(getattr(response.raw, 'retries', None), 'history', ()) or ()
+    # A streamed body has not been read yet; reading it here would defeat the stream
+    if stream:
+        received = int(response.headers.get('Content-Length') or 0)
+    else:
+        received = len(response.content)
+    record_request(request.url, seconds, len(retries), received, error=response.status_code >= 400)
+
+
+def summary() -> Dict[str, Any]:
+    """The run's metrics as a JSON-ready dict."""
+    if _run is None:
+        return {}
+    with _lock:
+        stages = {name: stats.summary() for name, stats in sorted(_run.stages.items())}
+        http = {key: sum(stage['http'][key] for stage in stages.values())
+                for key in ('requests', 'errors', 'retries', 'pages', 'bytes')}
+        return {
+            'tool': _run.tool,
+            'started_at': _run.started_at,
+            'run_seconds': round(time.perf_counter() - _run.started, 4),
+            'http': http,
+            'stages': stages,
+            'counters': dict(sorted(_run.counters.items())),
+            'observations': {name: timing.summary() for name, timing in sorted(_run.observations.items())},
+        }
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(data: Dict[str, Any]) -> str:
+    """
+    Render summary() in the Prometheus text exposition format.
+
+    Every value describes the last run only and the file is replaced by the
+    next one, so all metrics are gauges: as counters, a shorter run would
+    read as a counter reset to rate() and increase().
+    """
+    tool = _label(data['tool'])
+    lines = []
+
+    def metric(name: str, kind: str, help_text: str, samples: List[tuple]):
+        lines.append(f"# HELP deemixkit_{name} {help_text}")
+        lines.append(f"# TYPE deemixkit_{name} {kind}")
+        for labels, value in samples:
+            label_text = ','.join([f'tool="{tool}"'] + [f'{key}="{_label(str(val))}"' for key, val in labels])
+            lines.append(f"deemixkit_{name}{{{label_text}}} {value}")
+
+    stages = data['stages']
+    metric('run_seconds', 'gauge', 'Wall-clock time of the last run', [((), data['run_seconds'])])
+    metric('run_timestamp_seconds', 'gauge', 'Start time of the last run', [((), round(data['started_at'], 3))])
+    metric('stage_seconds', 'gauge', 'Wall-clock time spent in a stage in the last run',
+           [((('stage', name),), stage['wall']['total_s']) for name, stage in stages.items()])
+    metric('stage_calls', 'gauge', 'Times a stage was entered in the last run',
+           [((('stage', name),), stage['wall']['count']) for name, stage in stages.items()])
+    for key, help_text in (('requests', 'HTTP requests'), ('errors', 'Failed HTTP requests'),
+                           ('retries', 'HTTP retries made by the retry adapter'),
+                           ('pages', 'Pages of paged listings fetched'), ('bytes', 'Response bytes received')):
+        metric(f'http_{key}', 'gauge', f'{help_text} per stage in the last run',
+               [((('stage', name),), stage['http'][key]) for name, stage in stages.items()])
+    latency = []
+    for name, stage in stages.items():
+        for quantile, key in (('0.5', 'p50_ms'), ('0.95', 'p95_ms')):
+            latency.append(((('stage', name), ('quantile', quantile)), stage['http']['latency'][key] / 1000))
+    metric('http_request_seconds', 'gauge', 'HTTP request latency quantiles per stage', latency)
+    metric('events', 'gauge', 'Named event counts of the last run (cache hits, matches, ...)',
+           [((('name', name),), value) for name, value in data['counters'].items()])
+    metric('wait_seconds', 'gauge', 'Total time of named waits in the last run (rate limiter, ...)',
+           [((('name', name),), timing['total_s']) for name, timing in data['observations'].items()])
+    metric('wait_count', 'gauge', 'Number of named waits in the last run',
+           [((('name', name),), timing['count']) for name, timing in data['observations'].items()])
+    return '\n'.join(lines) + '\n'
+
+
+def write(output_file: Optional[str] = None) -> None:
+    """Write the metrics (atomically, so a textfile collector never reads half a file)."""
+    if _run is None:
+        return
+    target = Path(output_file).expanduser() if output_file else _run.output_file
+    if target is None:
+        return
+    data = summary()
+    text = prometheus_text(data) if target.suffix == '.prom' else json.dumps(data, indent=2) + '\n'
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        with open(tmp_file, 'w') as f:
+            f.write(text)
+        tmp_file.replace(target)
+    except OSError as e:
+        print(f"Warning: could not write metrics to {target}: {e}", file=sys.stderr)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Machine-Readable Output for DeemixKit
+
+With --format jsonl a tool writes one JSON object per result to stdout,
+one per line, and nothing else; banners, progress and prompts go to
+stderr. The tools then chain with plain pipes:
+
+    python3 scripts/dedupe-batch.py albums.txt \\
+        | python3 deezer/deezer-resolver.py --format jsonl \\
+        | python3 scripts/deemix-queue.py
+
+Every record has the same fields, in this order:
+
+  input     the line, query or URL the result was resolved from
+  url       the resolved URL, null when nothing was found
+  id        the provider's id of the result
+  artist    artist name
+  title     album (or track, playlist) title
+  provider  'deezer' or 'spotify'
+  type      'album', 'track', 'artist' or 'playlist'
+  cached    true when no HTTP request was sent for the result (local
+            catalog, shared cache, saved state)
+  seconds   time spent on the result
+
+Failed results also carry 'error'; tools add their own fields after these.
+The tools that read URLs (deemix-queue, download-estimator) accept these
+records as input lines as well as plain URLs, the resolvers take the
+artist and title of a record as their query, and the batch line filters
+(dedupe-batch, skip-owned) pass records through unchanged.
+
+Loaded by the tools with importlib (the file name contains dashes):
+
+    output = load_kit_module("kit-output")
+    output.start()
+    result = output.Result(query)
+    ...
+    result.emit(url=album_url, id=album_id, artist=artist, title=title)
+
+The shell wrappers take the URLs out of the records with the command line,
+which reports failed results on stderr:
+
+    python3 deezer/deezer-resolver.py --format jsonl < albums.txt | python3 scripts/kit-output.py
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import sys
+import json
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterable, Iterator
+
+FIELDS = ('input', 'url', 'id', 'artist', 'title', 'provider', 'type', 'cached', 'seconds')
+
+_stdout = None
+_requests = 0
+
+
+def start() -> None:
+    """Keep stdout for records and send everything else the tool prints to stderr."""
+    global _stdout
+    if _stdout is None:
+        _stdout = sys.stdout
+        sys.stdout = sys.stderr
+        _http().register('output', before=_count_request)
+
+
+def _http():
+    """The kit-http module, loaded from this folder like the tools load it (the file name contains dashes)."""
+    module = sys.modules.get('kit_http')
+    if module is None:
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location('kit_http', Path(__file__).resolve().parent / "kit-http.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['kit_http'] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+def _count_request(request) -> None:
+    global _requests
+    _requests += 1
+
+
+def _requests_sent() -> int:
+    # Requests sent through requests (see kit-http); curl calls are not seen
+    return _requests
+
+
+def emit(record: Dict[str, Any]) -> None:
+    """Write one record as a JSON line, flushed so a reader down the pipe gets it at once."""
+    out = _stdout or sys.stdout
+    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+    out.flush()
+
+
+class Result:
+    """Clock for one result: the time and HTTP requests spent since it was created."""
+
+    def __init__(self, input: str, provider: str = 'deezer', type: str = 'album'):
+        self.input = input
+        self.provider = provider
+        self.type = type
+        self.started = time.perf_counter()
+        self.requests = _requests_sent()
+
+    def record(self, url: Optional[str] = None, id: Any = None, artist: Optional[str] = None,
+               title: Optional[str] = None, cached: Optional[bool] = None, **extra) -> Dict[str, Any]:
+        """
+        The record of this result.
+
+        Args:
+            cached: Override for results fetched without requests (curl)
+            **extra: Tool-specific fields, e.g. error='not found'
+        """
+        if cached is None:
+            cached = _requests_sent() == self.requests
+        record = {
+            'input': self.input,
+            'url': url,
+            'id': id,
+            'artist': artist,
+            'title': title,
+            'provider': extra.pop('provider', self.provider),
+            'type': extra.pop('type', self.type),
+            'cached': cached,
+            'seconds': round(time.perf_counter() - self.started, 4),
+        }
+        record.update(extra)
+        return record
+
+    def emit(self, **fields) -> Dict[str, Any]:
+        """Write the record of this result (see record()) and return it."""
+        record = self.record(**fields)
+        emit(record)
+        return record
+
+
+def parse_record(line: str) -> Optional[Dict[str, Any]]:
+    """The record on a JSONL line, or None when the line is not a JSON object."""
+    line = line.strip()
+    if not line.startswith('{'):
+        return None
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def emit_line(line: str, artist: Optional[str] = None, title: Optional[str] = None) -> None:
+    """Pass a line that is already a record on unchanged, or write the record of a plain batch line."""
+    record = parse_record(line)
+    if record is None:
+        record = Result(line.strip(), provider=None).record(artist=artist, title=title, cached=True)
+    emit(record)
+
+
+def input_lines(stream: Iterable[str]) -> Iterator[str]:
+    """Lines of a batch stream, without blank lines and # comments."""
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+
+def main():
+    """Print the URLs of the records on stdin (used by the shell wrappers)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Print the URLs of JSONL records read from stdin; failures go to stderr",
+        epilog="""
+Examples:
+  discography-resolver.py -b "Radiohead" -a "OK Computer" --format jsonl | %(prog)s
+  deezer-resolver.py --format jsonl < albums.txt | %(prog)s --keep-failed
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--keep-failed', action='store_true',
+                        help='Write an empty line for every failed record, so output lines match input lines')
+    args = parser.parse_args()
+
+    failed = 0
+    for line in input_lines(sys.stdin):
+        record = parse_record(line)
+        if record is None:
+            print(f"Not a JSON record: {line}", file=sys.stderr)
+        elif not record.get('url'):
+            print(f"{record.get('input') or 'Unknown input'}: {record.get('error') or 'no URL'}", file=sys.stderr)
+        else:
+            print(record['url'], flush=True)
+            continue
+        failed += 1
+        if args.keep_failed:
+            print(flush=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
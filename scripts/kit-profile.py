@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Run Profiler for DeemixKit
+
+Profiles one run of a DeemixKit tool so a slow run can be diagnosed after
+the fact. When the run ends, three files are written (the data files take
+the report's name with its suffix replaced, e.g. run.txt -> run.prof):
+
+  FILE          report: wall-clock time per stage (search, token, playlist,
+                collection scan, matching, ...), sampled time per stage
+                and the slowest functions by cumulative time
+  FILE.prof     cProfile data of the main thread (pstats, snakeviz)
+  FILE.folded   sampled stacks of the run's threads in collapsed form, rooted at
+                the stage they were taken in (flamegraph.pl, speedscope)
+
+Stages come from kit-metrics, which must be started first (with or without
+its own output file). The sampler looks at the run's threads every few
+milliseconds, so work done in thread pools shows up too; cProfile only
+sees the main thread. Daemon threads such as the log listener are skipped.
+
+Loaded by the tools with importlib (the file name contains dashes):
+
+    load_kit_module("kit-metrics").start(tool="deezer-resolver")
+    load_kit_module("kit-profile").start("/tmp/deezer-resolver.txt", tool="deezer-resolver")
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import io
+import os
+import sys
+import time
+import atexit
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from pathlib import Path
+
+# Seconds between stack samples; override with DEEMIXKIT_PROFILE_INTERVAL
+SAMPLE_INTERVAL = float(os.environ.get("DEEMIXKIT_PROFILE_INTERVAL", 0.005))
+
+# Functions listed in the report
+TOP_FUNCTIONS = 30
+
+_profile = None
+
+
+class Sampler(threading.Thread):
+    """Counts the stacks of the run's threads at a fixed interval."""
+
+    def __init__(self, interval: float):
+        super().__init__(name="kit-profile-sampler", daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        metrics = sys.modules.get('kit_metrics')
+        stages = metrics.active_stages() if metrics else {}
+        # Daemon threads (this sampler, the log listener) only wait; leave them out
+        daemons = {thread.ident for thread in threading.enumerate() if thread.daemon}
+        for ident, frame in sys._current_frames().items():
+            if ident in daemons:
+                continue
+            stage = stages.get(ident, 'other')
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            frames.append(stage)
+            self.stacks[';'.join(reversed(frames))] += 1
+            self.samples[stage] += 1
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
+
+
+class RunProfile:
+    """The profilers of one run and where their output goes."""
+
+    def __init__(self, output_file: Path, tool: str):
+        self.output_file = output_file
+        self.tool = tool
+        self.started_at = time.time()
+        self.profiler = cProfile.Profile()
+        self.sampler = Sampler(SAMPLE_INTERVAL)
+
+    def data_file(self, suffix: str) -> Path:
+        target = self.output_file.with_suffix(suffix)
+        return target if target != self.output_file else self.output_file.with_name(self.output_file.name + suffix)
+
+
+def start(output_file: str, tool: str = 'deemixkit') -> None:
+    """
+    Start profiling this run.
+
+    Args:
+        output_file: Report written at exit; .prof and .folded data files go next to it
+        tool: Tool name, shown in the report
+    """
+    global _profile
+    if _profile is not None:
+        return
+    _profile = RunProfile(Path(output_file).expanduser(), tool)
+    _profile.sampler.start()
+    _profile.profiler.enable()
+    atexit.register(write)
+
+
+def stage_report(summary: dict, samples: Counter) -> str:
+    """Wall-clock and sampled time per stage, as a table."""
+    run_seconds = summary.get('run_seconds') or 0
+    total_samples = sum(samples.values())
+    lines = [f"{'stage':<36} {'calls':>6} {'wall s':>9} {'of run':>7} {'requests':>9} {'samples':>8} {'share':>6}"]
+    names = sorted(set(summary.get('stages', {})) | set(samples))
+    for name in names:
+        stage = summary.get('stages', {}).get(name)
+        wall = stage['wall']['total_s'] if stage else 0.0
+        calls = stage['wall']['count'] if stage else 0
+        requests = stage['http']['requests'] if stage else 0
+        of_run = wall / run_seconds * 100 if run_seconds else 0.0
+        share = samples[name] / total_samples * 100 if total_samples else 0.0
+        lines.append(f"{name:<36} {calls:>6} {wall:>9.3f} {of_run:>6.1f}% {requests:>9} "
+                     f"{samples[name]:>8} {share:>5.1f}%")
+    return '\n'.join(lines)
+
+
+def write() -> None:
+    """Stop profiling and write the report and data files."""
+    global _profile
+    profile, _profile = _profile, None
+    if profile is None:
+        return
+    profile.profiler.disable()
+    profile.sampler.stop()
+
+    metrics = sys.modules.get('kit_metrics')
+    summary = metrics.summary() if metrics else {}
+    prof_file = profile.data_file('.prof')
+    folded_file = profile.data_file('.folded')
+
+    functions = io.StringIO()
+    stats = pstats.Stats(profile.profiler, stream=functions)
+    stats.strip_dirs().sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+
+    started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(profile.started_at))
+    report = [
+        f"{profile.tool} profile, started {started}, {summary.get('run_seconds', 0):.3f} s",
+        "",
+        f"Stages (wall clock from kit-metrics; samples of non-daemon threads every {SAMPLE_INTERVAL * 1000:g} ms)",
+        stage_report(summary, profile.sampler.samples),
+        "",
+        "Slowest functions (main thread, cProfile, by cumulative time)",
+        functions.getvalue().strip('\n'),
+        "",
+        f"cProfile data: {prof_file}",
+        f"Sampled stacks: {folded_file}",
+    ]
+
+    try:
+        profile.output_file.parent.mkdir(parents=True, exist_ok=True)
+        profile.profiler.dump_stats(str(prof_file))
+        with open(folded_file, 'w') as f:
+            for stack, count in profile.sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(profile.output_file, 'w') as f:
+            f.write('\n'.join(report) + '\n')
+    except OSError as e:
+        print(f"Warning: could not write profile to {profile.output_file}: {e}", file=sys.stderr)
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Missing Albums - What is missing from my collection?
+
+Goes through every artist in the CollectionMatcher index, finds the artist
+on Deezer, fetches their discography and reports the albums that are not in
+the local collection, as Deezer album URLs or JSON lines.
+
+Artists are looked up concurrently under deezer-api's shared rate limiter.
+The Deezer artist id and the result of every artist check are kept in a
+state file, so an interrupted run picks up where it stopped, and later runs
+only re-check artists whose result is older than --max-age.
+
+Usage:
+    python3 missing-albums.py > missing.txt
+    python3 missing-albums.py --format jsonl --max-age 30 > missing.jsonl
+    python3 missing-albums.py --limit 500   # Check 500 more artists, then stop
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext, redirect_stdout
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+# Configuration
+STATE_FILE = Path.home() / ".config" / "deemixkit" / "missing-albums-state.json"
+LOG_DIR = Path.home() / ".local" / "log" / "missing-albums"
+LOG_FILE = LOG_DIR / "missing-albums.log"
+
+DEEZER_ALBUM_BASE = "https://www.deezer.com/album/"
+
+# Save progress after this many checked artists
+SAVE_EVERY = 25
+
+
+def load_kit_module(name: str):
+    """Load a shared module from DeemixKit's scripts/ folder (file names contain dashes)."""
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    module_file = Path(__file__).resolve().parent / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def setup_logging(verbose: bool = False) -> None:
+    """Set up queued, size-rotated logging to LOG_FILE (once per process, see kit-logging)."""
+    load_kit_module("kit-logging").setup_logging(LOG_FILE, verbose)
+
+
+def start_metrics(metrics_file: Optional[str]) -> None:
+    """Collect per-stage timings and HTTP counters, written to metrics_file at exit (see kit-metrics)."""
+    if metrics_file:
+        load_kit_module("kit-metrics").start(metrics_file, tool="missing-albums")
+
+
+def start_rate_budget(priority: str = 'batch') -> None:
+    """Schedule Deezer requests through the shared rate budget at this priority class (see kit-cache)."""
+    load_kit_module("kit-cache").install_rate_budget(os.environ.get("DEEMIXKIT_PRIORITY") or priority)
+
+
+def stage(name: str):
+    """Time a phase of the run for --metrics; does nothing when metrics are off."""
+    metrics = sys.modules.get('kit_metrics')
+    return metrics.stage(name) if metrics else nullcontext()
+
+
+def load_state(state_file: Path) -> Dict[str, Any]:
+    """Load per-artist results (Deezer id, check time, missing albums) keyed by normalized artist."""
+    state = {"artists": {}}
+    if state_file.exists():
+        try:
+            with open(state_file, 'r') as f:
+                state.update(json.load(f))
+        except (json.JSONDecodeError, IOError) as e:
+            logging.warning(f"Error loading state: {e}. Starting fresh.")
+    return state
+
+
+def save_state(state_file: Path, state: Dict[str, Any]) -> None:
+    """Write state atomically so an interrupted run never corrupts it."""
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = state_file.with_suffix('.tmp')
+    with open(tmp_file, 'w') as f:
+        json.dump(state, f)
+    tmp_file.replace(state_file)
+
+
+def collection_artists(matcher) -> List[Tuple[str, str, List[str]]]:
+    """(artist key, display name, owned album titles) for every artist in the index, sorted by key."""
+    artists = []
+    for artist_key in sorted(matcher.collection_cache):
+        records = list(matcher.collection_cache[artist_key].values())
+        if records:
+            artists.append((artist_key, records[0].artist, [record.album for record in records]))
+    return artists
+
+
+class DeezerCatalog:
+    """Deezer lookups for the missing-albums job, sharing one pooled session and rate limiter."""
+
+    def __init__(self, config: Dict[str, Any], workers: int):
+        self.deezer_api = load_kit_module("deezer-api")
+        self.config = config
+        self.session = self.deezer_api.create_pooled_session(config, pool_size=workers)
+        self.limiter = self.deezer_api.RateLimiter()
+        self.base = self.deezer_api.DEEZER_API_BASE
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+            artist: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        GET a Deezer API URL under the rate limiter; raises on network errors and API error objects.
+
+        The albums in the response are kept in the local catalog (kit-catalog),
+        attributed to artist when they carry none.
+        """
+        self.limiter.acquire()
+        response = self.session.get(url, params=params, timeout=self.config.get("timeout", 10))
+        response.raise_for_status()
+        data = response.json()
+        if 'error' in data:
+            raise ValueError(data['error'].get('message', 'Deezer API error'))
+        load_kit_module("kit-catalog").record(data, artist)
+        return data
+
+    def find_artist(self, artist_key: str, owned_titles: List[str], normalize) -> Optional[Dict[str, Any]]:
+        """
+        Identify the Deezer artist through an owned album, like discography-resolver does.
+
+        Search results are only accepted when the album's artist normalizes to
+        the same key as the collection's artist, so a common album title can
+        never attach another artist's discography. Albums already in the local
+        (or shared) catalog identify the artist without a search.
+        """
+        kit_catalog = load_kit_module("kit-catalog").open_catalog()
+        for title in owned_titles[:3]:
+            album = kit_catalog.find_album(artist_key, title)
+            artist = (album or {}).get('artist') or {}
+            if artist.get('id') and normalize(artist.get('name', '')) == artist_key:
+                return {'id': artist['id'], 'name': artist.get('name', '')}
+        for title in owned_titles[:3]:
+            data = self.get(f"{self.base}/search/album", {'q': f"{artist_key} {title}", 'limit': 10})
+            for alb in data.get('data', []):
+                artist = alb.get('artist') or {}
+                if artist.get('id') and normalize(artist.get('name', '')) == artist_key:
+                    return {'id': artist['id'], 'name': artist.get('name', '')}
+        return None
+
+    def discography(self, artist_id: int) -> List[Dict[str, Any]]:
+        """Every album of an artist, following Deezer's paging."""
+        albums = []
+        url = f"{self.base}/artist/{artist_id}/albums"
+        params = {'limit': 100}
+        while url:
+            data = self.get(url, params, artist={'id': artist_id})
+            albums.extend(data.get('data', []))
+            url = data.get('next')
+            params = None  # 'next' already carries the paging parameters
+        # A complete list also serves discography-resolver runs for this artist
+        load_kit_module("kit-catalog").open_catalog().record_discography(artist_id, albums)
+        return albums
+
+
+def check_artist(catalog: DeezerCatalog, matcher, artist_key: str, name: str, owned_titles: List[str],
+                 cached: Dict[str, Any], include_singles: bool) -> Dict[str, Any]:
+    """
+    Find the albums of one artist that the collection does not have.
+
+    Returns the artist's new state entry: Deezer id (reused from cached when
+    known), check time and the missing albums.
+    """
+    import requests
+
+    entry = {'name': name, 'deezer_id': cached.get('deezer_id'), 'checked_at': time.time(), 'missing': []}
+    try:
+        if entry['deezer_id'] is None:
+            with stage('find_artist'):
+                artist = catalog.find_artist(artist_key, owned_titles, matcher._normalize_text)
+            if artist is None:
+                entry['not_found'] = True
+                return entry
+            entry['deezer_id'] = artist['id']
+
+        with stage('discography'):
+            albums = catalog.discography(entry['deezer_id'])
+
+        seen_titles = set()
+        for alb in albums:
+            record_type = alb.get('record_type', '').lower()
+            if not include_singles and record_type not in ('album', 'ep'):
+                continue
+            title = alb.get('title', '')
+            if title.lower() in seen_titles:
+                continue
+            seen_titles.add(title.lower())
+            year = alb.get('release_date', '')[:4]
+            if not matcher.is_album_in_collection(name, title, year):
+                entry['missing'].append({'id': alb.get('id'), 'title': title, 'year': year,
+                                         'record_type': record_type})
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logging.error(f"Error checking {name}: {e}")
+        # Keep the last good result; the artist is retried on the next run
+        failed = dict(cached, error=str(e))
+        failed.setdefault('name', name)
+        return failed
+
+    entry['seconds'] = round(time.time() - entry['checked_at'], 3)
+    return entry
+
+
+def run_checks(matcher, artists: List[Tuple[str, str, List[str]]], state: Dict[str, Any], state_file: Path,
+               config: Dict[str, Any], workers: int, max_age: float, limit: Optional[int],
+               include_singles: bool) -> int:
+    """
+    Check every artist whose result is missing, failed or older than max_age.
+
+    State is saved every SAVE_EVERY artists and once more at the end (also on
+    Ctrl-C), so no finished check is lost.
+
+    Returns:
+        int: Number of artists checked in this run
+    """
+    now = time.time()
+    due = [artist for artist in artists
+           if artist[0] not in state['artists']
+           or 'error' in state['artists'][artist[0]]
+           or now - state['artists'][artist[0]].get('checked_at', 0) > max_age]
+    if limit is not None:
+        due = due[:limit]
+
+    print(f"{len(artists)} artists in collection, {len(due)} to check", file=sys.stderr)
+    if not due:
+        return 0
+
+    catalog = DeezerCatalog(config, workers)
+    lock = threading.Lock()
+    checked = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(check_artist, catalog, matcher, artist_key, name, titles,
+                            state['artists'].get(artist_key, {}), include_singles): artist_key
+            for artist_key, name, titles in due
+        }
+        try:
+            for future in as_completed(futures):
+                entry = future.result()
+                with lock:
+                    state['artists'][futures[future]] = entry
+                    checked += 1
+                    if checked % SAVE_EVERY == 0:
+                        save_state(state_file, state)
+                        print(f"  {checked}/{len(due)} artists checked", file=sys.stderr)
+                logging.debug(f"{entry.get('name')}: {len(entry.get('missing', []))} missing")
+        except KeyboardInterrupt:
+            for future in futures:
+                future.cancel()
+            save_state(state_file, state)
+            raise
+
+    save_state(state_file, state)
+    return checked
+
+
+def missing_albums(matcher, artists: List[Tuple[str, str, List[str]]],
+                   state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Missing albums of every artist in the collection, from the saved results.
+
+    Saved results are matched against the collection again, so albums
+    downloaded since an artist was checked drop out without an API call.
+    """
+    albums = []
+    for artist_key, name, _ in artists:
+        entry = state['artists'].get(artist_key)
+        if not entry:
+            continue
+        for alb in entry.get('missing', []):
+            if not matcher.is_album_in_collection(name, alb['title'], alb.get('year')):
+                albums.append(dict(alb, artist=name, deezer_artist_id=entry.get('deezer_id'),
+                                   url=f"{DEEZER_ALBUM_BASE}{alb['id']}",
+                                   checked_at=entry.get('checked_at', 0), seconds=entry.get('seconds')))
+    return albums
+
+
+def album_record(alb: Dict[str, Any], run_started: float) -> Dict[str, Any]:
+    """
+    The JSONL record of a missing album (see kit-output). Albums from a check
+    made before this run came from the state file and count as cached.
+    """
+    cached = alb['checked_at'] < run_started
+    return {
+        'input': alb['artist'],
+        'url': alb['url'],
+        'id': alb['id'],
+        'artist': alb['artist'],
+        'title': alb['title'],
+        'provider': 'deezer',
+        'type': 'album',
+        'cached': cached,
+        'seconds': 0.0 if cached else alb['seconds'],
+        'year': alb.get('year'),
+        'record_type': alb.get('record_type'),
+        'deezer_artist_id': alb.get('deezer_artist_id'),
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Find the albums of every artist in your collection that you do not have",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s > missing.txt
+  %(prog)s --format jsonl > missing.jsonl
+  %(prog)s --limit 500          # Check 500 more artists, then stop
+  %(prog)s --max-age 0          # Re-check every artist
+  %(prog)s --offline            # Report saved results without API calls
+
+Interrupted runs resume where they stopped; state is kept in
+~/.config/deemixkit/missing-albums-state.json
+        """
+    )
+
+    parser.add_argument(
+        '--format',
+        choices=['urls', 'jsonl'],
+        default='urls',
+        help='Output album URLs (one per line) or one JSON record per album (default: urls)'
+    )
+    parser.add_argument(
+        '--workers', '-j',
+        type=int,
+        default=8,
+        help='Artists checked concurrently (default: 8)'
+    )
+    parser.add_argument(
+        '--max-age',
+        type=float,
+        default=7,
+        help='Re-check artists whose result is older than this many days (default: 7)'
+    )
+    parser.add_argument(
+        '--limit',
+        type=int,
+        help='Check at most this many artists in this run'
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Only report saved results, do not call the API'
+    )
+    parser.add_argument(
+        '--requeue',
+        action='store_true',
+        help='Include albums the download ledger has as queued, downloading or failed'
+    )
+    parser.add_argument(
+        '--include-singles',
+        action='store_true',
+        help='Include singles (default: only albums and EPs)'
+    )
+    parser.add_argument(
+        '--rescan',
+        action='store_true',
+        help='Rescan the collection and refresh the index'
+    )
+    parser.add_argument(
+        '--state',
+        type=str,
+        help=f'State file (default: {STATE_FILE})'
+    )
+    parser.add_argument(
+        '--metrics',
+        metavar='FILE',
+        default=os.environ.get('DEEMIXKIT_METRICS'),
+        help='Write per-stage timings and HTTP metrics to FILE at exit (.prom: Prometheus textfile, else JSON)'
+    )
+    parser.add_argument(
+        '--verbose', '-v',
+        action='store_true',
+        help='Enable verbose logging'
+    )
+
+    args = parser.parse_args()
+
+    setup_logging(args.verbose)
+    start_metrics(args.metrics)
+    start_rate_budget()
+    output = None
+    if args.format == 'jsonl':
+        output = load_kit_module("kit-output")
+        output.start()
+    logger = logging.getLogger(__name__)
+    run_started = time.time()
+
+    state_file = Path(args.state).expanduser() if args.state else STATE_FILE
+    state = load_state(state_file)
+
+    # Matcher status messages go to stderr; stdout is the album list
+    with redirect_stdout(sys.stderr), stage('collection'):
+        matcher = load_kit_module("rileys-collection-matcher").load_indexed_matcher(rescan=args.rescan)
+    artists = collection_artists(matcher)
+
+    if not args.offline:
+        try:
+            checked = run_checks(matcher, artists, state, state_file, {"timeout": 10}, args.workers,
+                                 args.max_age * 86400, args.limit, args.include_singles)
+        except KeyboardInterrupt:
+            print("\nInterrupted, progress saved; run again to continue", file=sys.stderr)
+            sys.exit(130)
+        logger.info(f"Checked {checked} artists")
+
+    albums = missing_albums(matcher, artists, state)
+    ledger = load_kit_module("kit-ledger").open_ledger()
+    in_hand = {}
+    if not args.requeue:
+        # Albums handed to Deemix by an earlier run are not on disk yet
+        with stage('ledger'):
+            _, in_hand = ledger.filter_new([alb['url'] for alb in albums])
+        albums = [alb for alb in albums if alb['url'] not in in_hand]
+    not_found = sum(1 for artist_key, _, _ in artists if state['artists'].get(artist_key, {}).get('not_found'))
+    unchecked = sum(1 for artist_key, _, _ in artists if artist_key not in state['artists'])
+
+    print(f"Found {len(albums)} missing albums", file=sys.stderr)
+    if in_hand:
+        print(f"Skipped {len(in_hand)} albums already queued, downloading or failed", file=sys.stderr)
+    if not_found:
+        print(f"{not_found} artists not found on Deezer", file=sys.stderr)
+    if unchecked:
+        print(f"{unchecked} artists not checked yet; run again to continue", file=sys.stderr)
+    logger.info(f"{len(albums)} missing albums, {not_found} artists not found, {unchecked} unchecked")
+
+    for alb in albums:
+        if output:
+            output.emit(album_record(alb, run_started))
+        else:
+            print(alb['url'])
+
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Discography Prefetch for DeemixKit
+
+Fetches the complete album lists of Deezer artists into the local catalog
+(kit-catalog), so a discography-resolver run for the same artist within a
+day is answered without the network.
+
+deezer-resolver.py --prefetch starts it as one detached process after
+resolving an album, or once for all artists of a batch. It runs alongside
+the resolver at nice 10, and its requests are batch-class traffic in the
+rate budget, so they queue behind interactive resolves. Artists whose album
+list is still fresh are skipped, so repeated resolves of one artist cost
+nothing.
+
+Usage:
+    python3 prefetch-discography.py 399 1234
+    python3 prefetch-discography.py --nice 10 399
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import os
+import sys
+import logging
+import argparse
+import importlib.util
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable, Iterable
+
+# Configuration
+LOG_DIR = Path.home() / ".local" / "log" / "prefetch-discography"
+LOG_FILE = LOG_DIR / "prefetch-discography.log"
+
+
+def load_kit_module(name: str):
+    """Load a shared module from DeemixKit's scripts/ folder (file names contain dashes)."""
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    module_file = Path(__file__).resolve().parent / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def start_rate_budget(priority: str = 'batch') -> None:
+    """Schedule Deezer requests through the shared rate budget at this priority class (see kit-cache)."""
+    load_kit_module("kit-cache").install_rate_budget(os.environ.get("DEEMIXKIT_PRIORITY") or priority)
+
+
+def setup_logging(verbose: bool = False) -> None:
+    """Set up queued, size-rotated logging to LOG_FILE (once per process, see kit-logging)."""
+    load_kit_module("kit-logging").setup_logging(LOG_FILE, verbose)
+
+
+def start_discography_prefetch(artist_ids: Iterable[int]) -> bool:
+    """
+    Start prefetching artists' album lists in one detached, low-priority process.
+
+    The process outlives the caller, so a resolver can print its result and
+    exit at once. Its requests are batch traffic, behind interactive resolves.
+    Repeated artists are fetched once. Returns False when there is nothing to
+    prefetch or the process cannot be started.
+    """
+    import subprocess
+
+    artist_ids = [str(artist_id) for artist_id in dict.fromkeys(artist_ids)]
+    if not artist_ids:
+        return False
+    try:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), '--nice', '10'] + artist_ids,
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            env=dict(os.environ, DEEMIXKIT_PRIORITY='batch'), start_new_session=True
+        )
+        return True
+    except OSError as e:
+        logging.warning(f"Could not start discography prefetch: {e}")
+        return False
+
+
+def fetch_discography(session, limiter, artist_id: int, config: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Every album of an artist, following Deezer's paging; None if any page fails."""
+    import requests
+
+    deezer_api = load_kit_module("deezer-api")
+    albums = []
+    url = f"{deezer_api.DEEZER_API_BASE}/artist/{artist_id}/albums"
+    params = {'limit': 100}
+    try:
+        while url:
+            limiter.acquire()
+            response = session.get(url, params=params, timeout=config.get("timeout", 10))
+            response.raise_for_status()
+            data = response.json()
+            if 'error' in data:
+                logging.error(f"Deezer error for artist {artist_id}: {data['error'].get('message')}")
+                return None
+            albums.extend(data.get('data', []))
+            url = data.get('next')
+            params = None  # 'next' already carries the paging parameters
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logging.error(f"Error fetching discography of artist {artist_id}: {e}")
+        return None
+    return albums
+
+
+def prefetch(artist_ids: List[int], config: Dict[str, Any], force: bool = False,
+             report: Optional[Callable[[int, Optional[List[Dict[str, Any]]], bool], None]] = None) -> int:
+    """
+    Store the album lists of artists in the local catalog.
+
+    Args:
+        report: Called per artist with (artist_id, albums or None on failure, whether they were fetched)
+
+    Returns:
+        int: Number of artists fetched (fresh ones are skipped unless force)
+    """
+    report = report or (lambda artist_id, albums, fetched: None)
+    deezer_api = load_kit_module("deezer-api")
+    catalog = load_kit_module("kit-catalog").open_catalog()
+    session = deezer_api.create_pooled_session(config, pool_size=1)
+    limiter = deezer_api.RateLimiter()
+
+    fetched = 0
+    for artist_id in artist_ids:
+        stored = None if force else catalog.artist_albums(artist_id)
+        if stored is not None:
+            logging.info(f"Artist {artist_id}: album list is fresh, skipped")
+            report(artist_id, stored, False)
+            continue
+        albums = fetch_discography(session, limiter, artist_id, config)
+        report(artist_id, albums, True)
+        if albums is None:
+            continue
+        catalog.record_discography(artist_id, albums)
+        fetched += 1
+        logging.info(f"Artist {artist_id}: {len(albums)} albums prefetched")
+    catalog.flush()
+    return fetched
+
+
+def jsonl_report() -> Callable[[int, Optional[List[Dict[str, Any]]], bool], None]:
+    """A prefetch() report callback that writes one JSONL record per artist (see kit-output)."""
+    output = load_kit_module("kit-output")
+    output.start()
+    clock = [output.Result(None, type='artist')]
+
+    def report(artist_id: int, albums: Optional[List[Dict[str, Any]]], fetched: bool) -> None:
+        # One clock per artist, restarted once its record is written
+        result = clock[0]
+        result.input = str(artist_id)
+        fields = {'url': f"https://www.deezer.com/artist/{artist_id}", 'id': artist_id, 'cached': not fetched}
+        if albums is None:
+            result.emit(error="Could not fetch discography", **fields)
+        else:
+            result.emit(albums=len(albums), **fields)
+        clock[0] = output.Result(None, type='artist')
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fetch Deezer artist discographies into the local catalog",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s 399 1234
+  %(prog)s --force 399      # Refetch even if the stored list is fresh
+  %(prog)s --format jsonl 399 1234  # One JSON record per artist
+        """
+    )
+
+    parser.add_argument('artist_ids', nargs='+', type=int, help='Deezer artist ids')
+    parser.add_argument('--force', action='store_true', help='Refetch album lists that are still fresh')
+    parser.add_argument('--nice', type=int, default=0, help='Lower the CPU priority by this much (default: 0)')
+    parser.add_argument('--format', choices=['text', 'jsonl'], default='text',
+                        help='Output format: nothing but the log, or one JSON record per artist on stdout')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
+
+    args = parser.parse_args()
+
+    setup_logging(args.verbose)
+    start_rate_budget()
+    if args.nice and hasattr(os, 'nice'):
+        os.nice(args.nice)
+
+    report = jsonl_report() if args.format == 'jsonl' else None
+    fetched = prefetch(args.artist_ids, {"timeout": 10}, force=args.force, report=report)
+    logging.info(f"Prefetched {fetched} of {len(args.artist_ids)} discographies")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,11 +8,46 @@ against Spotify album data to identify albums already in the collection.
 
 import os
 import re
+import gc
+import sys
 import json
+import mmap
+import time
+import struct
+import threading
+from collections.abc import Mapping
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Dict, List, Set, Tuple
 import unicodedata
 
+# Persisted index shared by every tool that skips already-owned albums
+INDEX_FILE = Path.home() / ".config" / "deemixkit" / "collection-index.json"
+INDEX_VERSION = 2
+
+AUDIO_EXTENSIONS = {'.mp3', '.flac', '.m4a', '.aac', '.ogg', '.wma', '.wav', '.ape', '.opus'}
+
+# Inputs at least this long are matched in worker processes by filter_existing_albums
+PARALLEL_MIN_ALBUMS = 200
+
+# Binary snapshot of the same index, memory-mapped for instant startup
+SNAPSHOT_FILE = Path.home() / ".config" / "deemixkit" / "collection-index.snap"
+SNAPSHOT_MAGIC = b'DMKSNAP1'
+SNAPSHOT_VERSION = 1
+
+# Header: magic, version, artist count, album count, section offsets, collection path (string ref)
+SNAPSHOT_HEADER = struct.Struct('<8sIIIQQQII')
+# Artist entry: key (string ref), first album entry, album count
+SNAPSHOT_ARTIST = struct.Struct('<IIII')
+# Album entry: key, artist, album, year, genre, parent, folder (string refs)
+SNAPSHOT_ALBUM = struct.Struct('<' + 'II' * 7)
+
+
+def _metrics_stage(name: str):
+    """Time name as a kit-metrics stage when the running tool collects metrics (kit-metrics is loaded)."""
+    metrics = sys.modules.get('kit_metrics')
+    return metrics.stage(name) if metrics else nullcontext()
+
 
 def load_collection_path() -> Path:
     """Load audio library path from credentials.json or use default."""
@@ -32,23 +67,414 @@ def load_collection_path() -> Path:
     return default_path
 
 
+def bounded_levenshtein(str1: str, str2: str, max_distance: int) -> int:
+    """
+    Levenshtein distance between two strings, computed only as far as max_distance.
+
+    Only the diagonal band of width max_distance around the main diagonal can
+    hold a path of that cost (Ukkonen), so each row fills just that band, two
+    rows are kept, and the loop stops as soon as a whole row exceeds the limit.
+
+    Returns:
+        int: The distance, or max_distance + 1 when it is larger than max_distance
+    """
+    if len(str1) < len(str2):
+        str1, str2 = str2, str1
+    len1, len2 = len(str1), len(str2)
+    over = max_distance + 1
+    if len1 - len2 > max_distance:
+        return over
+    
+    # Common prefixes and suffixes never change the distance
+    start = 0
+    while start < len2 and str1[start] == str2[start]:
+        start += 1
+    end1, end2 = len1, len2
+    while end2 > start and str1[end1 - 1] == str2[end2 - 1]:
+        end1 -= 1
+        end2 -= 1
+    str1, str2 = str1[start:end1], str2[start:end2]
+    len1, len2 = len(str1), len(str2)
+    if len2 == 0:
+        return len1 if len1 <= max_distance else over
+    
+    previous = [j if j <= max_distance else over for j in range(len2 + 1)]
+    for i in range(1, len1 + 1):
+        char = str1[i - 1]
+        low = max(1, i - max_distance)
+        high = min(len2, i + max_distance)
+        current = [over] * (len2 + 1)
+        if low == 1:
+            current[0] = i if i <= max_distance else over
+        row_min = over
+        for j in range(low, high + 1):
+            value = previous[j - 1] if char == str2[j - 1] else previous[j - 1] + 1
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if value > over:
+                value = over
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return over
+        previous = current
+    
+    return previous[len2]
+
+
+_levenshtein_backend = None
+
+
+def levenshtein_within(str1: str, str2: str, max_distance: int) -> int:
+    """
+    Same contract as bounded_levenshtein, using rapidfuzz or python-Levenshtein when installed.
+
+    The C libraries are imported on first use so loading the matcher stays cheap.
+    """
+    global _levenshtein_backend
+    if _levenshtein_backend is None:
+        try:
+            from rapidfuzz.distance import Levenshtein
+            _levenshtein_backend = lambda a, b, k: Levenshtein.distance(a, b, score_cutoff=k)
+        except ImportError:
+            try:
+                import Levenshtein
+                _levenshtein_backend = lambda a, b, k: min(Levenshtein.distance(a, b), k + 1)
+            except ImportError:
+                _levenshtein_backend = bounded_levenshtein
+    return _levenshtein_backend(str1, str2, max_distance)
+
+
+class AlbumRecord:
+    """
+    One indexed album, kept small because large libraries hold hundreds of thousands.
+    
+    Artist, year, genre and parent folder strings are interned so every album
+    of an artist shares one copy, and the path is stored relative to the
+    collection root as (parent folder, album folder).
+    """
+    
+    __slots__ = ('artist', 'album', 'year', 'genre', 'parent', 'folder')
+    
+    def __init__(self, artist: str, album: str, year: str, genre: str, parent: str, folder: str):
+        self.artist = sys.intern(artist)
+        self.album = album
+        self.year = sys.intern(year)
+        self.genre = sys.intern(genre)
+        self.parent = sys.intern(parent)
+        self.folder = folder
+    
+    def to_dict(self, collection_path: Path) -> Dict:
+        """Expand to the album info dict returned by get_album_info()."""
+        return {
+            'artist': self.artist,
+            'album': self.album,
+            'year': self.year,
+            'path': os.path.join(str(collection_path), self.parent, self.folder),
+            'genre': self.genre
+        }
+
+
+def write_snapshot(collection_cache: Mapping, collection_path: Path, snapshot_file: Path):
+    """
+    Write the index as a binary snapshot that SnapshotIndex can mmap.
+    
+    Layout: header, artist entries sorted by UTF-8 key, album entries sorted by
+    UTF-8 key within each artist, then a string table. Entries are fixed size
+    and strings are (offset, length) references into the table, so a lookup
+    is a binary search that touches only the pages it reads.
+    """
+    blob = bytearray()
+    refs = {}
+    
+    def ref(text: str) -> Tuple[int, int]:
+        if text not in refs:
+            data = text.encode('utf-8')
+            refs[text] = (len(blob), len(data))
+            blob.extend(data)
+        return refs[text]
+    
+    artist_entries = bytearray()
+    album_entries = bytearray()
+    album_count = 0
+    artist_keys = sorted(collection_cache.keys(), key=lambda key: key.encode('utf-8'))
+    
+    for artist_key in artist_keys:
+        albums = collection_cache[artist_key]
+        album_keys = sorted(albums.keys(), key=lambda key: key.encode('utf-8'))
+        artist_entries += SNAPSHOT_ARTIST.pack(*ref(artist_key), album_count, len(album_keys))
+        for album_key in album_keys:
+            record = albums[album_key]
+            album_entries += SNAPSHOT_ALBUM.pack(
+                *ref(album_key), *ref(record.artist), *ref(record.album), *ref(record.year),
+                *ref(record.genre), *ref(record.parent), *ref(record.folder)
+            )
+        album_count += len(album_keys)
+    
+    path_ref = ref(str(collection_path))
+    artists_offset = SNAPSHOT_HEADER.size
+    albums_offset = artists_offset + len(artist_entries)
+    strings_offset = albums_offset + len(album_entries)
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(artist_keys), album_count,
+                                  artists_offset, albums_offset, strings_offset, *path_ref)
+    
+    snapshot_file = Path(snapshot_file)
+    snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = snapshot_file.with_suffix('.tmp')
+    with open(tmp_file, 'wb') as f:
+        f.write(header)
+        f.write(artist_entries)
+        f.write(album_entries)
+        f.write(blob)
+    tmp_file.replace(snapshot_file)
+
+
+class SnapshotIndex(Mapping):
+    """
+    Read-only {normalized_artist: {normalized_album: AlbumRecord}} view of a snapshot.
+    
+    Opening costs one header read; exact lookups binary-search the mmapped
+    entries. Artist keys are decoded in full only the first time something
+    iterates over them (fuzzy matching does).
+    """
+    
+    def __init__(self, snapshot_file: Path):
+        with open(snapshot_file, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if len(self._map) < SNAPSHOT_HEADER.size:
+            raise ValueError("Snapshot is truncated")
+        (magic, version, self.artist_count, self.album_count, self._artists, self._albums,
+         self._strings, path_offset, path_length) = SNAPSHOT_HEADER.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("Not a collection snapshot or unsupported version")
+        
+        self.collection_path = self._string(path_offset, path_length)
+        self._artist_keys = None
+    
+    def _bytes(self, offset: int, length: int) -> bytes:
+        start = self._strings + offset
+        return self._map[start:start + length]
+    
+    def _string(self, offset: int, length: int) -> str:
+        return self._bytes(offset, length).decode('utf-8')
+    
+    def _artist_entry(self, index: int) -> Tuple[int, int, int, int]:
+        return SNAPSHOT_ARTIST.unpack_from(self._map, self._artists + index * SNAPSHOT_ARTIST.size)
+    
+    def _album_entry(self, index: int) -> Tuple[int, ...]:
+        return SNAPSHOT_ALBUM.unpack_from(self._map, self._albums + index * SNAPSHOT_ALBUM.size)
+    
+    def _search(self, key: str, entry, first: int, count: int) -> int:
+        """Binary search entries [first, first + count) by key. Returns the entry index or -1."""
+        target = key.encode('utf-8')
+        low, high = first, first + count
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, key_length = entry(middle)[:2]
+            candidate = self._bytes(key_offset, key_length)
+            if candidate < target:
+                low = middle + 1
+            elif candidate > target:
+                high = middle
+            else:
+                return middle
+        return -1
+    
+    def record(self, index: int) -> AlbumRecord:
+        """Build the AlbumRecord for album entry index."""
+        fields = self._album_entry(index)
+        return AlbumRecord(*(self._string(fields[i], fields[i + 1]) for i in range(2, 14, 2)))
+    
+    def __getitem__(self, artist_key: str) -> 'SnapshotAlbums':
+        index = self._search(artist_key, self._artist_entry, 0, self.artist_count)
+        if index < 0:
+            raise KeyError(artist_key)
+        _, _, first, count = self._artist_entry(index)
+        return SnapshotAlbums(self, first, count)
+    
+    def __iter__(self):
+        if self._artist_keys is None:
+            self._artist_keys = [self._string(*self._artist_entry(i)[:2]) for i in range(self.artist_count)]
+        return iter(self._artist_keys)
+    
+    def __len__(self) -> int:
+        return self.artist_count
+
+
+class SnapshotAlbums(Mapping):
+    """Read-only {normalized_album: AlbumRecord} view of one artist in a SnapshotIndex."""
+    
+    def __init__(self, snapshot: SnapshotIndex, first: int, count: int):
+        self._snapshot = snapshot
+        self._first = first
+        self._count = count
+    
+    def __getitem__(self, album_key: str) -> AlbumRecord:
+        index = self._snapshot._search(album_key, self._snapshot._album_entry, self._first, self._count)
+        if index < 0:
+            raise KeyError(album_key)
+        return self._snapshot.record(index)
+    
+    def __iter__(self):
+        for index in range(self._first, self._first + self._count):
+            yield self._snapshot._string(*self._snapshot._album_entry(index)[:2])
+    
+    def __len__(self) -> int:
+        return self._count
+
+
 class CollectionMatcher:
     """Handles matching Spotify albums against local music collection."""
     
-    def __init__(self, collection_path: str = None):
+    def __init__(self, collection_path: str = None, index_file: str = None, rescan: bool = False,
+                 snapshot_file: str = None):
         """
         Initialize the collection matcher.
         
         Args:
             collection_path: Path to the local music collection (optional, loads from config if not provided)
+            index_file: Persisted index to load instead of scanning (written after a scan if missing)
+            rescan: Scan the collection even if the persisted index exists
+            snapshot_file: Binary snapshot to mmap instead of loading index_file (written after a scan or load)
         """
         if collection_path is None:
             collection_path = str(load_collection_path())
         self.collection_path = Path(collection_path)
         self.collection_cache = {}
-        self._build_collection_index()
+        self.index_file = Path(index_file) if index_file else None
+        self.snapshot_file = Path(snapshot_file) if snapshot_file else None
+        # Guards collection_cache while a CollectionWatcher applies changes
+        self.lock = threading.RLock()
+        self._folder_keys = None
+        self._blocks = None
+        
+        # A rescan of an unmounted collection would find nothing, keep the saved index instead
+        if rescan and not self.collection_path.exists():
+            print(f"Collection not mounted at {self.collection_path}, using saved index")
+            rescan = False
+        
+        if self.snapshot_file and not rescan:
+            with _metrics_stage('collection_snapshot_load'):
+                loaded = self._load_snapshot()
+            if loaded:
+                return
+        
+        if self.index_file and not rescan:
+            with _metrics_stage('collection_index_load'):
+                loaded = self._load_index()
+            if loaded:
+                if self.snapshot_file:
+                    self.save_snapshot()
+                return
+        
+        with _metrics_stage('collection_scan'):
+            self._build_collection_index()
+        
+        if self.collection_cache:
+            if self.index_file:
+                self.save_index()
+            if self.snapshot_file:
+                self.save_snapshot()
+    
+    def _load_snapshot(self) -> bool:
+        """
+        Map the binary snapshot if it exists and belongs to this collection.
+        
+        Returns:
+            bool: True if the snapshot was loaded
+        """
+        if not self.snapshot_file.exists():
+            return False
+        
+        try:
+            snapshot = SnapshotIndex(self.snapshot_file)
+        except (ValueError, OSError, struct.error) as e:
+            print(f"Warning: Could not load collection snapshot: {e}")
+            return False
+        
+        if snapshot.collection_path != str(self.collection_path):
+            return False
+        
+        self.collection_cache = snapshot
+        print(f"Mapped collection snapshot from {self.snapshot_file} ({len(snapshot)} artists)")
+        return True
+    
+    def save_snapshot(self):
+        """Write the in-memory index to the binary snapshot file."""
+        with self.lock:
+            write_snapshot(self.collection_cache, self.collection_path, self.snapshot_file)
+    
+    def _load_index(self) -> bool:
+        """
+        Load the persisted index if it exists and belongs to this collection.
+        
+        Returns:
+            bool: True if the index was loaded
+        """
+        if not self.index_file.exists():
+            return False
+        
+        try:
+            with open(self.index_file, 'r') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Warning: Could not load collection index: {e}")
+            return False
+        
+        if data.get('version') != INDEX_VERSION or data.get('collection_path') != str(self.collection_path):
+            return False
+        
+        strings = data.get('strings', [])
+        self.collection_cache = {
+            artist_key: {
+                album_key: AlbumRecord(strings[artist], album, year, strings[genre], strings[parent], folder)
+                for album_key, (artist, album, year, genre, parent, folder) in albums.items()
+            }
+            for artist_key, albums in data.get('albums', {}).items()
+        }
+        print(f"Loaded collection index from {self.index_file} ({len(self.collection_cache)} artists)")
+        return True
     
-    def _normalize_text(self, text: str) -> str:
+    def save_index(self):
+        """
+        Write the in-memory index to the persisted index file.
+        
+        Artist, genre and parent folder strings go into a shared string table
+        and albums reference them by position, mirroring AlbumRecord.
+        """
+        strings = {}
+        
+        def ref(text: str) -> int:
+            return strings.setdefault(text, len(strings))
+        
+        with self.lock:
+            albums = {
+                artist_key: {
+                    album_key: [ref(record.artist), record.album, record.year,
+                                ref(record.genre), ref(record.parent), record.folder]
+                    for album_key, record in artist_albums.items()
+                }
+                for artist_key, artist_albums in self.collection_cache.items()
+            }
+        
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.index_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'collection_path': str(self.collection_path),
+                'built_at': time.time(),
+                'strings': list(strings),
+                'albums': albums
+            }, f)
+        tmp_file.replace(self.index_file)
+    
+    @staticmethod
+    def _normalize_text(text: str) -> str:
         """
         Normalize text for comparison by:
         - Converting to lowercase
@@ -58,6 +484,8 @@ class CollectionMatcher:
         - Removing extra whitespace
         - Removing common words that might differ (the, a, an)
         
+        Static, so batch tools can apply the same rules without loading an index.
+        
         Args:
             text: Input text
             
@@ -182,7 +610,7 @@ class CollectionMatcher:
         """
         Scan the music collection and build an index of artists and albums.
         Scans both folder names AND audio files for maximum matching accuracy.
-        Structure: {normalized_artist: {normalized_album: (original_artist, original_album, path)}}
+        Structure: {normalized_artist: {normalized_album: AlbumRecord}}
         """
         print(f"Scanning music collection at: {self.collection_path}")
         
@@ -191,7 +619,6 @@ class CollectionMatcher:
             return
         
         album_count = 0
-        audio_extensions = {'.mp3', '.flac', '.m4a', '.aac', '.ogg', '.wma', '.wav', '.ape', '.opus'}
         
         # Iterate through genre folders
         for genre_dir in self.collection_path.iterdir():
@@ -220,6 +647,7 @@ class CollectionMatcher:
                     
                     artist_name = artist_dir.name
                     normalized_artist = self._normalize_text(artist_name)
+                    parent = os.path.join(genre_dir.name, alpha_dir.name, artist_name)
                     
                     if normalized_artist not in self.collection_cache:
                         self.collection_cache[normalized_artist] = {}
@@ -232,51 +660,149 @@ class CollectionMatcher:
                         if album_dir.name.startswith('.'):
                             continue
                         
-                        # Extract album info from folder name
-                        year, album_name = self._extract_album_info_from_folder(album_dir.name)
-                        normalized_album = self._normalize_text(album_name)
-                        
-                        # Store folder-based info in cache
-                        self.collection_cache[normalized_artist][normalized_album] = {
-                            'artist': artist_name,
-                            'album': album_name,
-                            'year': year,
-                            'path': str(album_dir),
-                            'genre': genre_dir.name
-                        }
-                        
+                        self._index_album_folder(album_dir, artist_name, normalized_artist, genre_dir.name, parent)
                         album_count += 1
-                        
-                        # ALSO scan audio files in this album folder for additional matching
-                        # This catches albums where the folder name doesn't match perfectly
-                        for audio_file in album_dir.iterdir():
-                            if audio_file.is_file() and audio_file.suffix.lower() in audio_extensions:
-                                # Try to extract artist and album from filename
-                                # Common patterns: "Artist - Album - Track.mp3", "Artist - Track.mp3", etc.
-                                file_artist, file_album = self._extract_info_from_filename(audio_file.stem, artist_name, album_name)
-                                
-                                if file_artist and file_album:
-                                    norm_file_artist = self._normalize_text(file_artist)
-                                    norm_file_album = self._normalize_text(file_album)
-                                    
-                                    # Add this as an additional entry if different from folder
-                                    if norm_file_artist not in self.collection_cache:
-                                        self.collection_cache[norm_file_artist] = {}
-                                    
-                                    if norm_file_album not in self.collection_cache[norm_file_artist]:
-                                        self.collection_cache[norm_file_artist][norm_file_album] = {
-                                            'artist': file_artist,
-                                            'album': file_album,
-                                            'year': year,
-                                            'path': str(album_dir),
-                                            'genre': genre_dir.name
-                                        }
-                                
-                                # Only need to check one file per album
-                                break
         
         print(f"Found {album_count} albums in collection from {len(self.collection_cache)} artists")
     
+    def _index_album_folder(self, album_dir: Path, artist_name: str, normalized_artist: str,
+                            genre: str, parent: str) -> List[Tuple[str, str]]:
+        """
+        Index one album folder by its name and by its first audio file.
+        
+        Returns:
+            List[Tuple[str, str]]: (normalized_artist, normalized_album) keys written
+        """
+        # Extract album info from folder name
+        year, album_name = self._extract_album_info_from_folder(album_dir.name)
+        normalized_album = self._normalize_text(album_name)
+        
+        # Store folder-based info in cache
+        self.collection_cache[normalized_artist][normalized_album] = AlbumRecord(
+            artist_name, album_name, year, genre, parent, album_dir.name
+        )
+        keys = [(normalized_artist, normalized_album)]
+        
+        # ALSO scan audio files in this album folder for additional matching
+        # This catches albums where the folder name doesn't match perfectly
+        for audio_file in album_dir.iterdir():
+            if audio_file.is_file() and audio_file.suffix.lower() in AUDIO_EXTENSIONS:
+                # Try to extract artist and album from filename
+                # Common patterns: "Artist - Album - Track.mp3", "Artist - Track.mp3", etc.
+                file_artist, file_album = self._extract_info_from_filename(audio_file.stem, artist_name, album_name)
+                
+                if file_artist and file_album:
+                    norm_file_artist = self._normalize_text(file_artist)
+                    norm_file_album = self._normalize_text(file_album)
+                    
+                    # Add this as an additional entry if different from folder
+                    if norm_file_artist not in self.collection_cache:
+                        self.collection_cache[norm_file_artist] = {}
+                    
+                    if norm_file_album not in self.collection_cache[norm_file_artist]:
+                        self.collection_cache[norm_file_artist][norm_file_album] = AlbumRecord(
+                            file_artist, file_album, year, genre, parent, album_dir.name
+                        )
+                        keys.append((norm_file_artist, norm_file_album))
+                
+                # Only need to check one file per album
+                break
+        
+        return keys
+    
+    def _ensure_mutable(self):
+        """Turn a mapped snapshot into plain dicts and build the folder -> keys map used for removals."""
+        if not isinstance(self.collection_cache, dict):
+            self.collection_cache = {
+                artist_key: dict(albums.items()) for artist_key, albums in self.collection_cache.items()
+            }
+        
+        if self._folder_keys is None:
+            self._folder_keys = {}
+            for artist_key, albums in self.collection_cache.items():
+                for album_key, record in albums.items():
+                    folders = self._folder_keys.setdefault(record.parent, {})
+                    folders.setdefault(record.folder, []).append((artist_key, album_key))
+    
+    def _remove_subtree(self, relative_path: str) -> int:
+        """Drop every album indexed from folders at or below relative_path. Returns albums removed."""
+        depth = len(Path(relative_path).parts)
+        if depth >= 4:
+            parent, folder = os.path.split(relative_path)
+            folders = {folder: self._folder_keys.get(parent, {}).pop(folder, [])}
+            targets = [(parent, folders)]
+        elif depth == 3:
+            targets = [(relative_path, self._folder_keys.pop(relative_path, {}))]
+        else:
+            prefix = relative_path + os.sep if relative_path else ''
+            parents = [parent for parent in self._folder_keys if parent.startswith(prefix)]
+            targets = [(parent, self._folder_keys.pop(parent)) for parent in parents]
+        
+        removed = 0
+        for parent, folders in targets:
+            for folder, keys in folders.items():
+                for artist_key, album_key in keys:
+                    albums = self.collection_cache.get(artist_key, {})
+                    record = albums.get(album_key)
+                    # Another folder may have claimed the same key since
+                    if record is not None and record.parent == parent and record.folder == folder:
+                        del albums[album_key]
+                        removed += 1
+                        if not albums:
+                            del self.collection_cache[artist_key]
+        return removed
+    
+    def _index_subtree(self, relative_path: str) -> int:
+        """Index every album folder at or below relative_path. Returns album folders indexed."""
+        parts = Path(relative_path).parts
+        if any(part.startswith('.') for part in parts):
+            return 0
+        
+        # Walk down to album level: genre/alpha/artist/album
+        album_dirs = [self.collection_path / relative_path]
+        for _ in range(4 - len(parts)):
+            album_dirs = [child for folder in album_dirs for child in folder.iterdir()
+                          if child.is_dir() and not child.name.startswith('.')]
+        
+        indexed = 0
+        for album_dir in album_dirs:
+            genre, alpha, artist_name = album_dir.relative_to(self.collection_path).parts[:3]
+            normalized_artist = self._normalize_text(artist_name)
+            parent = os.path.join(genre, alpha, artist_name)
+            self.collection_cache.setdefault(normalized_artist, {})
+            keys = self._index_album_folder(album_dir, artist_name, normalized_artist, genre, parent)
+            self._folder_keys.setdefault(parent, {})[album_dir.name] = keys
+            indexed += 1
+        return indexed
+    
+    def refresh_paths(self, relative_paths: List[str]) -> Tuple[int, int]:
+        """
+        Re-index the given folders (relative to the collection root) in place.
+        
+        Each path may be a genre, alphabet, artist or album folder that was
+        created, renamed or deleted; everything indexed below it is dropped
+        and whatever exists there now is indexed again. An empty path stands
+        for the whole collection.
+        
+        Returns:
+            Tuple[int, int]: (albums removed, album folders indexed)
+        """
+        with self.lock:
+            self._ensure_mutable()
+            self._blocks = None
+            removed = indexed = 0
+            done = []
+            for relative_path in sorted(set(relative_paths), key=lambda path: len(Path(path).parts)):
+                # A refreshed ancestor already covered this path
+                if any(relative_path == path or relative_path.startswith(path + os.sep) or not path
+                       for path in done):
+                    continue
+                done.append(relative_path)
+                removed += self._remove_subtree(relative_path)
+                if (self.collection_path / relative_path).is_dir():
+                    indexed += self._index_subtree(relative_path)
+            return removed, indexed
+    
     def _fuzzy_match(self, str1: str, str2: str, threshold: float = 0.85) -> bool:
         """
         Check if two strings are similar enough using fuzzy matching.
@@ -313,28 +839,18 @@ class CollectionMatcher:
         if abs(len1 - len2) > max(len1, len2) * 0.3:
             return False
         
-        # Create distance matrix
-        d = [[0] * (len2 + 1) for _ in range(len1 + 1)]
-        
-        for i in range(len1 + 1):
-            d[i][0] = i
-        for j in range(len2 + 1):
-            d[0][j] = j
-        
-        for i in range(1, len1 + 1):
-            for j in range(1, len2 + 1):
-                cost = 0 if str1[i-1] == str2[j-1] else 1
-                d[i][j] = min(
-                    d[i-1][j] + 1,      # deletion
-                    d[i][j-1] + 1,      # insertion
-                    d[i-1][j-1] + cost  # substitution
-                )
-        
-        distance = d[len1][len2]
+        # Largest distance that still reaches the threshold; only that much
+        # of the edit distance ever needs computing
         max_len = max(len1, len2)
-        similarity = 1 - (distance / max_len)
+        max_distance = int((1 - threshold) * max_len)
+        while max_distance >= 0 and 1 - (max_distance / max_len) < threshold:
+            max_distance -= 1
+        while 1 - ((max_distance + 1) / max_len) >= threshold:
+            max_distance += 1
+        if max_distance < 0:
+            return False
         
-        return similarity >= threshold
+        return levenshtein_within(str1, str2, max_distance) <= max_distance
     
     def is_album_in_collection(self, artist_name: str, album_name: str, year: str = None) -> bool:
         """
@@ -344,7 +860,7 @@ class CollectionMatcher:
         Args:
             artist_name: Name of the artist
             album_name: Name of the album
-            year: Optional release year for additional matching
+            year: Optional release year; fuzzy album matches more than a year off are skipped
             
         Returns:
             bool: True if album is in collection, False otherwise
@@ -352,6 +868,15 @@ class CollectionMatcher:
         normalized_artist = self._normalize_text(artist_name)
         normalized_album = self._normalize_text(album_name)
         
+        match = re.match(r'\d{4}', str(year)) if year else None
+        release_year = int(match.group(0)) if match else None
+        
+        with self.lock:
+            return self._match_normalized(normalized_artist, normalized_album, release_year)
+    
+    def _match_normalized(self, normalized_artist: str, normalized_album: str,
+                          release_year: int = None) -> bool:
+        """Exact, then fuzzy, lookup of already-normalized names."""
         # Check exact artist match
         if normalized_artist in self.collection_cache:
             # Check exact album match
@@ -359,24 +884,74 @@ class CollectionMatcher:
                 return True
             
             # Try fuzzy match on album names for this exact artist
-            for cached_album in self.collection_cache[normalized_artist].keys():
+            for cached_album in self._album_candidates(normalized_artist, normalized_album, release_year):
                 if self._fuzzy_match(normalized_album, cached_album, threshold=0.85):
                     return True
         
         # Try fuzzy artist match  
-        for cached_artist in self.collection_cache.keys():
-            if self._fuzzy_match(normalized_artist, cached_artist, threshold=0.90):
-                # Found similar artist, check for exact album match
-                if normalized_album in self.collection_cache[cached_artist]:
-                    return True
-                
-                # Try fuzzy album match too
-                for cached_album in self.collection_cache[cached_artist].keys():
-                    if self._fuzzy_match(normalized_album, cached_album, threshold=0.85):
+        artists_by_length, _ = self._blocking_index()
+        for length in self._candidate_lengths(normalized_artist):
+            for cached_artist in artists_by_length.get(length, ()):
+                if self._fuzzy_match(normalized_artist, cached_artist, threshold=0.90):
+                    # Found similar artist, check for exact album match
+                    if normalized_album in self.collection_cache[cached_artist]:
                         return True
+                    
+                    # Try fuzzy album match too
+                    for cached_album in self._album_candidates(cached_artist, normalized_album, release_year):
+                        if self._fuzzy_match(normalized_album, cached_album, threshold=0.85):
+                            return True
         
         return False
     
+    @staticmethod
+    def _candidate_lengths(text: str) -> range:
+        """
+        Lengths that _fuzzy_match can accept against text.
+        
+        Both of its paths reject pairs whose shorter string is under 70% of the
+        longer one; the range is widened by one on each side so float rounding
+        can never exclude a pair that _fuzzy_match would accept.
+        """
+        length = len(text)
+        return range(max(1, int(length * 0.7) - 1), int(length / 0.7) + 2)
+    
+    def _blocking_index(self) -> Tuple[Dict[int, List[str]], Dict[str, Dict[int, List[str]]]]:
+        """
+        Artist keys by length, and each artist's album keys by length.
+        
+        Built on the first fuzzy lookup and dropped when the index changes.
+        """
+        if self._blocks is None:
+            artists_by_length = {}
+            albums_by_length = {}
+            for artist_key, albums in self.collection_cache.items():
+                artists_by_length.setdefault(len(artist_key), []).append(artist_key)
+                buckets = albums_by_length[artist_key] = {}
+                for album_key in albums:
+                    buckets.setdefault(len(album_key), []).append(album_key)
+            self._blocks = (artists_by_length, albums_by_length)
+        return self._blocks
+    
+    def _album_candidates(self, artist_key: str, normalized_album: str, release_year: int = None):
+        """
+        Album keys of artist_key worth fuzzy-matching against normalized_album.
+        
+        Only lengths _fuzzy_match can accept are considered. With a release year,
+        albums more than a year apart are skipped too (albums without a year
+        in their folder name are always kept).
+        """
+        _, albums_by_length = self._blocking_index()
+        buckets = albums_by_length.get(artist_key, {})
+        albums = self.collection_cache[artist_key]
+        for length in self._candidate_lengths(normalized_album):
+            for album_key in buckets.get(length, ()):
+                if release_year is not None:
+                    year = albums[album_key].year
+                    if year.isdigit() and abs(int(year) - release_year) > 1:
+                        continue
+                yield album_key
+    
     def get_album_info(self, artist_name: str, album_name: str) -> Dict:
         """
         Get information about an album in the collection.
@@ -391,37 +966,87 @@ class CollectionMatcher:
         normalized_artist = self._normalize_text(artist_name)
         normalized_album = self._normalize_text(album_name)
         
-        if normalized_artist in self.collection_cache:
-            if normalized_album in self.collection_cache[normalized_artist]:
-                return self.collection_cache[normalized_artist][normalized_album]
+        with self.lock:
+            if normalized_artist in self.collection_cache:
+                if normalized_album in self.collection_cache[normalized_artist]:
+                    return self.collection_cache[normalized_artist][normalized_album].to_dict(self.collection_path)
         
         return None
     
-    def filter_existing_albums(self, albums_data: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    def filter_existing_albums(self, albums_data: List[Dict], workers: int = None) -> Tuple[List[Dict], List[Dict]]:
         """
         Filter a list of album data, separating existing and new albums.
         
+        Large inputs are split into chunks and matched in forked worker
+        processes. The workers share the index with this process copy-on-write
+        (a snapshot-backed index is the same mmap), so nothing is pickled but
+        the names being looked up and one bool per album.
+        
         Args:
             albums_data: List of album dictionaries with 'artist' and 'album' keys
+            workers: Worker processes for inputs of PARALLEL_MIN_ALBUMS or more
+                     (default: one per CPU, 1 matches everything in this process)
             
         Returns:
-            Tuple[List[Dict], List[Dict]]: (new_albums, existing_albums)
+            Tuple[List[Dict], List[Dict]]: (new_albums, existing_albums), in input order
         """
+        queries = [(album_data.get('artist', ''), album_data.get('album', ''), album_data.get('year', ''))
+                   for album_data in albums_data]
+        
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(queries) // 50 or 1)
+        
+        with _metrics_stage('collection_match'):
+            if workers > 1 and len(queries) >= PARALLEL_MIN_ALBUMS and _can_fork():
+                found = self._match_in_workers(queries, workers)
+            else:
+                found = [self.is_album_in_collection(artist, album, year) for artist, album, year in queries]
+        
+        metrics = sys.modules.get('kit_metrics')
+        if metrics:
+            metrics.incr('collection_match_albums', len(found))
+            metrics.incr('collection_match_owned', sum(found))
+        
         new_albums = []
         existing_albums = []
         
-        for album_data in albums_data:
-            artist = album_data.get('artist', '')
-            album = album_data.get('album', '')
-            year = album_data.get('year', '')
-            
-            if self.is_album_in_collection(artist, album, year):
+        for album_data, exists in zip(albums_data, found):
+            if exists:
                 existing_albums.append(album_data)
             else:
                 new_albums.append(album_data)
         
         return new_albums, existing_albums
     
+    def _match_in_workers(self, queries: List[Tuple[str, str, str]], workers: int) -> List[bool]:
+        """Run is_album_in_collection over queries in a pool of forked workers, keeping order."""
+        import multiprocessing
+        global _worker_matcher
+        
+        # Small chunks keep workers evenly busy when some names need the fuzzy pass
+        chunk_size = max(1, len(queries) // (workers * 8))
+        chunks = [queries[i:i + chunk_size] for i in range(0, len(queries), chunk_size)]
+        
+        with self.lock:
+            # Build shared lookup structures once, before the fork, rather than in every worker
+            self._blocking_index()
+            _worker_matcher = self
+            # Keep the workers' garbage collector from touching (and so copying) the index pages
+            gc.freeze()
+            try:
+                pool = multiprocessing.get_context('fork').Pool(workers, initializer=_init_filter_worker)
+            finally:
+                gc.unfreeze()
+        
+        try:
+            with pool:
+                results = pool.map(_match_chunk, chunks)
+        finally:
+            _worker_matcher = None
+        
+        return [exists for chunk in results for exists in chunk]
+    
     def get_collection_stats(self) -> Dict:
         """
         Get statistics about the collection.
@@ -429,15 +1054,16 @@ class CollectionMatcher:
         Returns:
             Dict: Statistics including artist count, album count, etc.
         """
-        total_albums = sum(len(albums) for albums in self.collection_cache.values())
-        total_artists = len(self.collection_cache)
-        
-        # Count albums by genre
-        genre_counts = {}
-        for artist_albums in self.collection_cache.values():
-            for album_info in artist_albums.values():
-                genre = album_info.get('genre', 'Unknown')
-                genre_counts[genre] = genre_counts.get(genre, 0) + 1
+        with self.lock:
+            total_albums = sum(len(albums) for albums in self.collection_cache.values())
+            total_artists = len(self.collection_cache)
+            
+            # Count albums by genre
+            genre_counts = {}
+            for artist_albums in self.collection_cache.values():
+                for record in artist_albums.values():
+                    genre = record.genre or 'Unknown'
+                    genre_counts[genre] = genre_counts.get(genre, 0) + 1
         
         return {
             'total_artists': total_artists,
@@ -446,6 +1072,36 @@ class CollectionMatcher:
         }
 
 
+# The parent's matcher, inherited by forked filter_existing_albums workers
+_worker_matcher = None
+
+
+def _can_fork() -> bool:
+    """Whether worker processes can inherit the index by forking."""
+    import multiprocessing
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def _init_filter_worker():
+    """Give the inherited matcher a fresh lock; one held by a parent thread at fork time would never be released."""
+    _worker_matcher.lock = threading.RLock()
+
+
+def _match_chunk(queries: List[Tuple[str, str, str]]) -> List[bool]:
+    return [_worker_matcher.is_album_in_collection(artist, album, year) for artist, album, year in queries]
+
+
+def load_indexed_matcher(rescan: bool = False) -> CollectionMatcher:
+    """
+    Get a matcher backed by the persisted index, so skipping owned albums costs no rescan.
+    
+    The mmapped snapshot is used when present, the JSON index otherwise. The
+    collection is only scanned when both are missing or rescan is True, and
+    the saved index keeps working while the collection's drive is unmounted.
+    """
+    return CollectionMatcher(index_file=str(INDEX_FILE), snapshot_file=str(SNAPSHOT_FILE), rescan=rescan)
+
+
 # Standalone test function
 def test_matcher():
     """Test the collection matcher with sample data."""
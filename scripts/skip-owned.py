@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Skip Owned - Drop albums that are already in the local collection
+
+Reads "Artist - Album" lines (the batch file format) from a file or stdin and
+prints only the lines for albums the CollectionMatcher does not find in the
+collection. Uses the matcher's persisted index, so it does not rescan the
+library on every run.
+
+Usage:
+    python3 skip-owned.py albums.txt > missing.txt
+    cat albums.txt | python3 skip-owned.py --rescan
+    python3 skip-owned.py --format jsonl albums.txt | python3 ../deezer/deezer-resolver.py --format jsonl
+
+Version: 1.0.0
+Created: October 2026
+"""
+
+import re
+import sys
+import argparse
+import importlib.util
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+def load_kit_module(name: str):
+    """Load a shared module from DeemixKit's scripts/ folder (file names contain dashes)."""
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    module_file = Path(__file__).resolve().parent / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_line(line: str) -> Optional[Tuple[str, str]]:
+    """
+    Split a batch line into (artist, album) using the same separators as batch-downloader.sh.
+
+    A JSONL record (kit-output) gives its artist and title instead.
+    """
+    if line.startswith('{'):
+        record = load_kit_module("kit-output").parse_record(line)
+        if record is not None:
+            return (record['artist'], record['title']) if record.get('artist') and record.get('title') else None
+    for pattern in (r'^(.+)\s+-\s+(.+)$', r'^(.+):\s+(.+)$', r'^(\S+)\s+(.+)$'):
+        match = re.match(pattern, line)
+        if match:
+            return match.group(1).strip(), match.group(2).strip()
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Drop 'Artist - Album' lines for albums already in your collection",
+        epilog="Example: python3 skip-owned.py albums.txt > missing.txt"
+    )
+    parser.add_argument('file', nargs='?', help='Input file (default: stdin)')
+    parser.add_argument('--rescan', action='store_true', help='Rescan the collection and refresh the index')
+    parser.add_argument('--verbose', '-v', action='store_true', help='List skipped albums')
+    parser.add_argument('--format', choices=['text', 'jsonl'], default='text',
+                        help='Output format: the kept lines, or one JSON record per kept album (comments dropped)')
+
+    args = parser.parse_args()
+    output = load_kit_module("kit-output") if args.format == 'jsonl' else None
+
+    if args.file:
+        with open(args.file, 'r') as f:
+            lines = f.read().splitlines()
+    else:
+        lines = sys.stdin.read().splitlines()
+
+    # Matcher status messages go to stderr; stdout is the filtered list
+    with redirect_stdout(sys.stderr):
+        matcher = load_kit_module("rileys-collection-matcher").load_indexed_matcher(rescan=args.rescan)
+
+    skipped = 0
+    for line in lines:
+        stripped = line.strip()
+        parsed = parse_line(stripped) if stripped and not stripped.startswith('#') else None
+
+        if parsed and matcher.is_album_in_collection(*parsed):
+            skipped += 1
+            if args.verbose:
+                print(f"  ✓ Owned: {parsed[0]} - {parsed[1]}", file=sys.stderr)
+            continue
+
+        if output:
+            if stripped and not stripped.startswith('#'):
+                output.emit_line(stripped, *(parsed or ()))
+        else:
+            print(line)
+
+    print(f"Skipped {skipped} albums already in collection", file=sys.stderr)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,26 +10,22 @@ Author: cursor
 Created: December 23rd, 2025
 """
 
+import os
 import sys
 import json
 import logging
 import argparse
+import importlib.util
 import urllib.parse
 import re
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Optional, Dict, Any
-import requests
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
+from typing import Optional, Dict, Any, TYPE_CHECKING
 
-# Try to import clipboard functionality
-try:
-    import pyperclip
-    CLIPBOARD_AVAILABLE = True
-except ImportError:
-    CLIPBOARD_AVAILABLE = False
-    # Fallback for macOS using pbcopy
-    import subprocess
+# requests and the clipboard helpers are imported where they are used, so
+# --help and the interactive prompt come up without loading them
+if TYPE_CHECKING:
+    import requests
 
 
 # Configuration
@@ -39,29 +35,54 @@ CREDENTIALS_FILE = Path.home() / ".config" / "deemixkit" / "credentials.json"
 LOG_DIR = Path.home() / ".local" / "log" / "spotify-resolver"
 LOG_FILE = LOG_DIR / "spotify-resolver.log"
 
-# Spotify URLs and API endpoints
+# Spotify URLs and API endpoints (API bases can point at a local stand-in server)
+SPOTIFY_API_BASE = os.environ.get("DEEMIXKIT_SPOTIFY_API", "https://api.spotify.com")
+SPOTIFY_ACCOUNTS_BASE = os.environ.get("DEEMIXKIT_SPOTIFY_ACCOUNTS", "https://accounts.spotify.com")
 SPOTIFY_ALBUM_BASE = "https://open.spotify.com/album/"
-SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
-SPOTIFY_SEARCH_URL = "https://api.spotify.com/v1/search"
+SPOTIFY_TOKEN_URL = f"{SPOTIFY_ACCOUNTS_BASE}/api/token"
+SPOTIFY_SEARCH_URL = f"{SPOTIFY_API_BASE}/v1/search"
 
 
-def setup_logging(verbose: bool = False) -> None:
-    """Set up logging configuration."""
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
+def load_kit_module(name: str):
+    """Load a shared module from DeemixKit's scripts/ folder (file names contain dashes)."""
+    module_name = name.replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    module_file = Path(__file__).resolve().parent.parent / "scripts" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(module_name, module_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
 
-    level = logging.DEBUG if verbose else logging.INFO
-    format_str = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
-    handlers = [logging.FileHandler(LOG_FILE)]
-    # Only log to stderr in verbose mode
-    if verbose:
-        handlers.append(logging.StreamHandler(sys.stderr))
+def start_metrics(metrics_file: Optional[str]) -> None:
+    """Collect per-stage timings and HTTP counters, written to metrics_file at exit (see kit-metrics)."""
+    if metrics_file:
+        load_kit_module("kit-metrics").start(metrics_file, tool="spotify-resolver")
 
-    logging.basicConfig(
-        level=level,
-        format=format_str,
-        handlers=handlers
-    )
+
+def start_profile(profile_file: Optional[str]) -> None:
+    """Profile the run; a per-stage breakdown and profiler data go to profile_file at exit (see kit-profile)."""
+    if profile_file:
+        load_kit_module("kit-metrics").start(tool="spotify-resolver")
+        load_kit_module("kit-profile").start(profile_file, tool="spotify-resolver")
+
+
+def start_rate_budget(priority: str = 'interactive') -> None:
+    """Schedule Deezer requests through the shared rate budget at this priority class (see kit-cache)."""
+    load_kit_module("kit-cache").install_rate_budget(os.environ.get("DEEMIXKIT_PRIORITY") or priority)
+
+
+def stage(name: str):
+    """Time a phase of the run for --metrics and --profile; does nothing when both are off."""
+    metrics = sys.modules.get('kit_metrics')
+    return metrics.stage(name) if metrics else nullcontext()
+
+
+def setup_logging(verbose: bool = False) -> None:
+    """Set up queued, size-rotated logging to LOG_FILE (once per process, see kit-logging)."""
+    load_kit_module("kit-logging").setup_logging(LOG_FILE, verbose)
 
 
 def load_config(config_file: Optional[Path] = None) -> Dict[str, Any]:
@@ -102,9 +123,16 @@ def load_config(config_file: Optional[Path] = None) -> Dict[str, Any]:
     return default_config
 
 
-def get_spotify_token(session: requests.Session, client_id: str, client_secret: str) -> Optional[str]:
-    """Get Spotify access token using Client Credentials flow."""
+def get_spotify_token(session: "requests.Session", client_id: str, client_secret: str) -> Optional[str]:
+    """Get Spotify access token using Client Credentials flow (reused from the kit-cache backend while valid)."""
     import base64
+    import requests
+
+    kit_cache = load_kit_module("kit-cache")
+    cached_token = kit_cache.get_token('spotify', client_id)
+    if cached_token:
+        logging.debug("Using cached Spotify access token")
+        return cached_token
 
     try:
         logging.debug("Requesting Spotify access token...")
@@ -135,6 +163,7 @@ def get_spotify_token(session: requests.Session, client_id: str, client_secret:
 
         if access_token:
             logging.debug("Successfully obtained access token")
+            kit_cache.put_token('spotify', client_id, token_data)
             return access_token
         else:
             logging.error("No access token in response")
@@ -152,15 +181,26 @@ def get_spotify_token(session: requests.Session, client_id: str, client_secret:
         return None
 
 
+def load_pyperclip():
+    """Import pyperclip on first use. Returns None if it is not installed."""
+    try:
+        import pyperclip
+        return pyperclip
+    except ImportError:
+        return None
+
+
 def save_to_clipboard(text: str) -> bool:
     """Copy text to clipboard. Returns True if successful."""
     try:
-        if CLIPBOARD_AVAILABLE:
+        pyperclip = load_pyperclip()
+        if pyperclip is not None:
             pyperclip.copy(text)
             logging.debug(f"Copied to clipboard using pyperclip: {text[:50]}...")
             return True
         else:
             # macOS fallback using pbcopy
+            import subprocess
             process = subprocess.Popen(
                 ['pbcopy'],
                 stdin=subprocess.PIPE,
@@ -179,8 +219,12 @@ def save_to_clipboard(text: str) -> bool:
         return False
 
 
-def create_session(config: Dict[str, Any]) -> requests.Session:
+def create_session(config: Dict[str, Any]) -> "requests.Session":
     """Create a requests session with retry strategy."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from requests.packages.urllib3.util.retry import Retry
+
     session = requests.Session()
 
     retry_strategy = Retry(
@@ -203,10 +247,12 @@ def create_session(config: Dict[str, Any]) -> requests.Session:
     return session
 
 
-def search_spotify_album(session: requests.Session, query: str, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+def search_spotify_album(session: "requests.Session", query: str, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Search Spotify for an album using the official Web API.
     """
+    import requests
+
     client_id = config.get("client_id")
     client_secret = config.get("client_secret")
 
@@ -216,7 +262,8 @@ def search_spotify_album(session: requests.Session, query: str, config: Dict[str
         return None
 
     # Get access token
-    access_token = get_spotify_token(session, client_id, client_secret)
+    with stage('token'):
+        access_token = get_spotify_token(session, client_id, client_secret)
     if not access_token:
         logging.error("Failed to obtain Spotify access token")
         return None
@@ -278,6 +325,23 @@ def build_album_url(album_id: str) -> str:
     return f"{SPOTIFY_ALBUM_BASE}{album_id}"
 
 
+def query_from_line(line: str) -> str:
+    """Search query for a 'Band - Album' line, a JSONL record with artist and title, or free text."""
+    record = load_kit_module("kit-output").parse_record(line) if line.startswith('{') else None
+    if record and record.get('title'):
+        if record.get('artist'):
+            return f"artist:{record['artist']} album:{record['title']}"
+        return record['title']
+    if record:
+        line = record.get('input') or ''
+
+    # Try to parse "Band - Album" format
+    if " - " in line:
+        parts = line.split(" - ", 1)
+        return f"artist:{parts[0].strip()} album:{parts[1].strip()}"
+    return line
+
+
 def parse_input(args: argparse.Namespace) -> str:
     """Parse input from arguments or prompt user."""
     if args.band and args.album:
@@ -294,12 +358,7 @@ def parse_input(args: argparse.Namespace) -> str:
                 logging.error("No input provided")
                 sys.exit(1)
 
-            # Try to parse "Band - Album" format
-            if " - " in user_input:
-                parts = user_input.split(" - ", 1)
-                return f"artist:{parts[0].strip()} album:{parts[1].strip()}"
-            else:
-                return user_input
+            return query_from_line(user_input)
         else:
             # Read from stdin (for piping)
             user_input = sys.stdin.read().strip()
@@ -309,6 +368,32 @@ def parse_input(args: argparse.Namespace) -> str:
             return user_input
 
 
+def resolve_lines(lines, session: "requests.Session", config: Dict[str, Any]) -> int:
+    """
+    Resolve each line and write one JSONL record per line (see kit-output).
+
+    Returns:
+        int: Exit code, 1 when any album was not found
+    """
+    output = load_kit_module("kit-output")
+    failed = 0
+    for line in lines:
+        # A record from an earlier tool keeps its original input
+        result = output.Result((output.parse_record(line) or {}).get('input') or line, provider='spotify')
+        with stage('search'):
+            album = search_spotify_album(session, query_from_line(line), config)
+        if not album or not album.get('id'):
+            logging.error(f"Album not found: {line}")
+            result.emit(error="Album not found on Spotify")
+            failed += 1
+            continue
+
+        album_url = build_album_url(album['id'])
+        artists = [artist.get('name', 'Unknown') for artist in album.get('artists', [])]
+        result.emit(url=album_url, id=album['id'], artist=', '.join(artists), title=album.get('name'))
+    return 1 if failed else 0
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -320,6 +405,7 @@ Examples:
   %(prog)s --query "artist:Metallica album:Master of Puppets"
   echo "Metallica - Master of Puppets" | %(prog)s
   %(prog)s  # Interactive mode
+  %(prog)s --format jsonl < albums.txt  # One JSON record per line of albums.txt
         """
     )
 
@@ -345,6 +431,24 @@ Examples:
         action='store_true',
         help='Print URL instead of copying to clipboard'
     )
+    parser.add_argument(
+        '--format',
+        choices=['text', 'jsonl'],
+        default='text',
+        help='Output format: text, or jsonl for one JSON record per album on stdout (piped stdin: one album per line)'
+    )
+    parser.add_argument(
+        '--metrics',
+        metavar='FILE',
+        default=os.environ.get('DEEMIXKIT_METRICS'),
+        help='Write per-stage timings and HTTP metrics to FILE at exit (.prom: Prometheus textfile, else JSON)'
+    )
+    parser.add_argument(
+        '--profile',
+        metavar='FILE',
+        default=os.environ.get('DEEMIXKIT_PROFILE'),
+        help='Profile the run and write a per-stage time breakdown to FILE (plus .prof and .folded profiler data)'
+    )
     parser.add_argument(
         '--config',
         type=str,
@@ -359,6 +463,11 @@ Examples:
 
     # Setup logging
     setup_logging(args.verbose)
+    start_metrics(args.metrics)
+    start_profile(args.profile)
+    start_rate_budget()
+    if args.format == 'jsonl':
+        load_kit_module("kit-output").start()
     logger = logging.getLogger(__name__)
 
     logger.info("=" * 60)
@@ -371,6 +480,14 @@ Examples:
     print("=" * 44)
 
     try:
+        if args.format == 'jsonl':
+            # A piped batch is resolved line by line in this one process
+            if (args.band and args.album) or args.query or sys.stdin.isatty():
+                lines = [parse_input(args)]
+            else:
+                lines = load_kit_module("kit-output").input_lines(sys.stdin)
+            sys.exit(resolve_lines(lines, create_session(config), config))
+
         # Parse input
         query = parse_input(args)
         logger.info(f"Search query: {query}")
@@ -380,7 +497,8 @@ Examples:
 
         # Search Spotify
         print("Searching Spotify API...")
-        album = search_spotify_album(session, query, config)
+        with stage('search'):
+            album = search_spotify_album(session, query, config)
 
         if not album:
             logger.error("Album not found")
@@ -410,9 +528,13 @@ Examples:
             print(f"\n{album_url}")
         else:
             print("Copying URL to clipboard...")
-            if save_to_clipboard(album_url):
+            with stage('clipboard'):
+                copied = save_to_clipboard(album_url)
+            if copied:
                 print(f"\n{album_url}")
                 logger.info("Successfully copied URL to clipboard")
+                # Playlist and discography runs skip it until it is downloaded (see kit-ledger)
+                load_kit_module("kit-ledger").open_ledger().mark([album_url], 'queued', source='spotify-resolver')
             else:
                 print(f"Failed to copy to clipboard")
                 print(f"\n{album_url}")